@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+
+"""
+Load-test the pipeline end to end against local stub APIs.
+
+Starts the Dev.to, Perplexity and LLM stubs from benchmarks.stub_servers,
+writes a config.yaml that points the pipeline at them and runs it over a
+synthetic corpus. Reports per-stage latency percentiles, throughput, peak
+RSS and file-system I/O, appends the results to a JSON-lines file and
+compares them with the previous run of the same scenario.
+
+The public version of the research and writer agents leaves out the calls
+to the real APIs; install_clients gives them stand-ins that send the
+equivalent requests to the stubs. The publisher uses its own Dev.to client.
+
+Usage:
+    python -m benchmarks.bench_pipeline --articles 1000 --mode streaming
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import yaml
+
+from benchmarks.stub_servers import StubServers, StubSettings
+from src.agents.sources import SourceAdapter, register_source
+from src.pipeline import Pipeline
+from src.utils.http import HttpResponse
+from src.utils.rate_limit import host_of
+from src.utils.tracing import Span, tracer
+
+class BenchSource(SourceAdapter):
+    """Articles listed by the Dev.to stub, extracted from their pages."""
+
+    label = 'Dev.to (stub)'
+
+    def __init__(self, agent: Any, config: Dict[str, Any]):
+        super().__init__(agent, config)
+        self.host = host_of(config['base_url'])
+
+    async def fetch(self) -> List[Dict[str, Any]]:
+        base_url = self.config['base_url']
+        per_page = self.config.get('per_page', 1000)
+        listing = []
+        page = 1
+        while len(listing) < self.config['max_articles']:
+            response = await self.agent.request('GET', f"{base_url}/articles?page={page}&per_page={per_page}")
+            entries = _checked(response).json()
+            if not entries:
+                break
+            listing.extend(entries)
+            page += 1
+
+        async def fetch_article(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            extracted = await self.extract(entry['url'])
+            if extracted is None:
+                return None
+            return {
+                'title': entry['title'],
+                'url': entry['url'],
+                'tags': entry['tag_list'],
+                'content': extracted.text,
+                'word_count': extracted.word_count
+            }
+
+        return await self.agent.map_concurrent(
+            fetch_article,
+            listing[:self.config['max_articles']],
+            error_message="Error fetching article"
+        )
+
+def _checked(response: HttpResponse) -> HttpResponse:
+    """Raise for an error response, like the API clients would."""
+    if not response.ok:
+        raise RuntimeError(f"HTTP {response.status} from {response.url}")
+    return response
+
+async def _complete(agent: Any, llm_url: str, prompt: str) -> str:
+    """Send a chat completion request to the LLM stub."""
+    response = await agent.request(
+        'POST',
+        f"{llm_url}/v1/chat/completions",
+        json={'model': agent.model_params.get('name'), 'messages': [{'role': 'user', 'content': prompt}]}
+    )
+    return _checked(response).json()['choices'][0]['message']['content']
+
+def install_clients(pipeline: Pipeline, llm_url: str):
+    """Replace the research and writer API calls with requests to the stub servers.
+
+    Each stand-in goes through the agent's rate limited request method and
+    raises on error responses, as the agents' API clients would.
+
+    Args:
+        pipeline: Pipeline to instrument
+        llm_url: Base URL of the LLM stub
+    """
+    researcher, writer = pipeline.researcher, pipeline.writer
+
+    async def fetch_research(topic: str) -> List[Dict[str, Any]]:
+        response = await researcher.request(
+            'POST',
+            f"{researcher.base_url}/chat/completions",
+            api_key=researcher.api_key,
+            json={'model': 'sonar', 'messages': [{'role': 'user', 'content': f"Research: {topic}"}]}
+        )
+        data = _checked(response).json()
+        return [{'summary': data['choices'][0]['message']['content'], 'sources': data.get('citations', [])}]
+
+    async def generate_article(research_data: Any) -> str:
+        async def generate() -> str:
+            return await _complete(writer, llm_url, f"Write an article from this research: {research_data}")
+        return await writer.cached_generation('generate_article', research_data, generate)
+
+    async def apply_writing_style(content: str) -> str:
+        async def generate() -> str:
+            return await _complete(writer, llm_url, f"Rewrite in a {writer.style} style: {content}")
+        return await writer.cached_generation('apply_writing_style', content, generate)
+
+    async def adjust_content_tone(content: str) -> str:
+        async def generate() -> str:
+            return await _complete(writer, llm_url, f"Adjust to a {writer.tone} tone: {content}")
+        return await writer.cached_generation('adjust_content_tone', content, generate)
+
+    researcher.fetch_research = fetch_research
+    writer.generate_article = generate_article
+    writer.apply_writing_style = apply_writing_style
+    writer.adjust_content_tone = adjust_content_tone
+
+def build_config(base_path: Path, urls: Dict[str, str], args: argparse.Namespace, run_dir: Path) -> Dict[str, Any]:
+    """Derive the benchmark configuration from a pipeline configuration.
+
+    Agent settings such as concurrency and caching are kept; upstream URLs
+    point at the stubs, and the filter lets every article through so each
+    one exercises every stage.
+
+    Args:
+        base_path: Configuration the benchmark starts from
+        urls: Base URL of each stub API
+        args: Command line arguments
+        run_dir: Directory of this run
+
+    Returns:
+        Configuration dictionary
+    """
+    with open(base_path) as f:
+        config = yaml.safe_load(f)
+
+    api = config.setdefault('api', {})
+    api['devto'] = {**(api.get('devto') or {}), 'base_url': urls['devto'], 'api_key': 'bench', 'user_id': 'bench'}
+    api['perplexity'] = {**(api.get('perplexity') or {}), 'base_url': urls['perplexity'], 'token': 'bench'}
+    api['llm'] = {'base_url': urls['llm']}
+
+    scraper = config.setdefault('scraper', {}) or {}
+    scraper.update({
+        'sources': [{
+            'name': 'bench',
+            'base_url': urls['devto'],
+            'max_articles': args.articles,
+            'timeout': 24 * 3600,
+            'retry_attempts': 1
+        }],
+        'incremental': False,
+        'max_concurrency': args.scrape_concurrency
+    })
+    filter_config = config.setdefault('filter', {}) or {}
+    filter_config['min_relevance_score'] = 0.0
+    filter_config['min_word_count'] = min(filter_config.get('min_word_count', 500), args.words // 2)
+
+    if not args.rate_limits:
+        for section in list(api.values()) + [config.get(name) or {} for name in
+                                             ('scraper', 'filter', 'research', 'writer', 'publisher')]:
+            section.pop('rate_limit', None)
+            section.pop('burst', None)
+
+    config.setdefault('pipeline', {})['mode'] = args.mode
+    config.setdefault('storage', {})['backend'] = args.storage
+    monitoring = config.setdefault('monitoring', {})
+    monitoring['log_level'] = args.log_level
+    monitoring['logging'] = {**(monitoring.get('logging') or {}), 'file': str(run_dir / 'app.log')}
+    monitoring['prometheus'] = {'enabled': False}
+    monitoring['tracing'] = {'enabled': True}
+    return config
+
+def io_counters() -> Dict[str, int]:
+    """Read the process's cumulative I/O counters.
+
+    Returns:
+        Bytes read and written through system calls and from storage on
+        Linux; block counts from getrusage elsewhere
+    """
+    try:
+        with open('/proc/self/io') as f:
+            return {key: int(value) for key, value in (line.split(': ') for line in f)}
+    except OSError:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {'read_blocks': usage.ru_inblock, 'write_blocks': usage.ru_oublock}
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def directory_size(path: Path) -> int:
+    """Total size of the files under a directory."""
+    return sum(entry.stat().st_size for entry in path.rglob('*') if entry.is_file())
+
+def git_commit() -> Optional[str]:
+    """Commit the benchmark runs against, if run from a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_pipeline(config_path: Path, data_dir: Path, llm_url: str) -> Dict[str, Any]:
+    """Run the pipeline once and measure it.
+
+    Args:
+        config_path: Benchmark configuration file
+        data_dir: Data directory of the run
+        llm_url: Base URL of the LLM stub
+
+    Returns:
+        Measurements of the run
+    """
+    latencies: Dict[str, List[float]] = defaultdict(list)
+
+    def observe(span: Span):
+        if span.name == 'item':
+            latencies[span.agent].append(span.duration)
+
+    tracer.add_observer(observe)
+    try:
+        pipeline = Pipeline(str(config_path), data_dir)
+        install_clients(pipeline, llm_url)
+        io_before = io_counters()
+        start = time.perf_counter()
+        published = await pipeline.run()
+        wall = time.perf_counter() - start
+        io_after = io_counters()
+    finally:
+        tracer.remove_observer(observe)
+
+    stages = {}
+    for agent, durations in latencies.items():
+        milliseconds = np.array(durations) * 1000
+        p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+        stages[agent] = {
+            'items': len(durations),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'items_per_second': round(len(durations) / wall, 2)
+        }
+    return {
+        'wall_seconds': round(wall, 3),
+        'published': len(published),
+        'articles_per_second': round(len(published) / wall, 2),
+        'stages': stages,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'io': {key: io_after[key] - io_before.get(key, 0) for key in io_after},
+        'data_bytes': directory_size(data_dir)
+    }
+
+def previous_result(results_path: Path, scenario: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Find the latest stored result of the same scenario.
+
+    Args:
+        results_path: JSON-lines results file
+        scenario: Parameters identifying the scenario
+
+    Returns:
+        Stored result, or None if the scenario was not run before
+    """
+    if not results_path.exists():
+        return None
+    previous = None
+    with open(results_path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get('scenario') == scenario:
+                previous = result
+    return previous
+
+def _change(current: float, before: float) -> str:
+    if not before:
+        return ''
+    return f" ({(current - before) / before:+.1%})"
+
+def report(result: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+    """Print a run's measurements, with changes against the previous run."""
+    before = previous or {}
+    print(f"\nPublished {result['published']} articles in {result['wall_seconds']:.2f}s: "
+          f"{result['articles_per_second']:.2f} articles/s"
+          f"{_change(result['articles_per_second'], before.get('articles_per_second'))}")
+    print(f"\n{'stage':<16}{'items':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'items/s':>10}  p95 change")
+    for agent, stage in result['stages'].items():
+        old = before.get('stages', {}).get(agent, {})
+        print(f"{agent:<16}{stage['items']:>8}{stage['p50_ms']:>10.1f}{stage['p95_ms']:>10.1f}"
+              f"{stage['p99_ms']:>10.1f}{stage['items_per_second']:>10.1f}  {_change(stage['p95_ms'], old.get('p95_ms')).strip()}")
+    print(f"\nPeak RSS: {result['peak_rss_mb']:.1f} MiB{_change(result['peak_rss_mb'], before.get('peak_rss_mb'))}")
+    print("I/O: " + ', '.join(f"{key} {value:,}" for key, value in result['io'].items()))
+    print(f"Data written: {result['data_bytes']:,} bytes")
+    print("Stub requests: " + '; '.join(
+        f"{api} " + ', '.join(f"{key} {value}" for key, value in counts.items())
+        for api, counts in result['stub_requests'].items()
+    ))
+    if previous is not None:
+        print(f"\nCompared with {previous['timestamp']} (commit {previous.get('commit')})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=1000, help="Articles in the synthetic corpus (10 to 100000)")
+    parser.add_argument('--words', type=int, default=1500, help="Words per article")
+    parser.add_argument('--response-words', type=int, default=800, help="Words per research answer and generated text")
+    parser.add_argument('--mode', choices=['batch', 'streaming'], default='streaming', help="Pipeline mode")
+    parser.add_argument('--latency', type=float, default=0.02, help="Mean stub response delay in seconds")
+    parser.add_argument('--jitter', type=float, default=0.5, help="Relative spread of the response delay")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of API requests failing with 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Share of API requests answered with 429")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument('--scrape-concurrency', type=int, default=16, help="Article pages fetched at once")
+    parser.add_argument('--storage', choices=['files', 'jsonl', 'sqlite'], default='files', help="Storage backend")
+    parser.add_argument('--rate-limits', action='store_true', help="Keep the configured rate limits")
+    parser.add_argument('--config', type=Path, default=Path('config/config.example.yaml'),
+                        help="Configuration the benchmark configuration is derived from")
+    parser.add_argument('--results', type=Path, default=Path('benchmarks/results/pipeline.jsonl'),
+                        help="JSON-lines file the results are appended to")
+    parser.add_argument('--label', default='', help="Note stored with the results")
+    parser.add_argument('--log-level', default='WARNING', help="Pipeline log level")
+    parser.add_argument('--keep', action='store_true', help="Keep the run's data directory")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed of the corpus and the stubs")
+    args = parser.parse_args()
+    if not 10 <= args.articles <= 100000:
+        parser.error("--articles must be between 10 and 100000")
+
+    settings = StubSettings(
+        articles=args.articles,
+        words=args.words,
+        response_words=args.response_words,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    scenario = {
+        'articles': args.articles,
+        'words': args.words,
+        'response_words': args.response_words,
+        'mode': args.mode,
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'retry_after': args.retry_after,
+        'storage': args.storage,
+        'rate_limits': args.rate_limits
+    }
+    register_source('bench', BenchSource)
+
+    run_dir = Path(tempfile.mkdtemp(prefix='bench-pipeline-'))
+    servers = StubServers(settings)
+    try:
+        try:
+            urls = servers.start()
+        except OSError:
+            # Without extra loopback addresses the stubs share one rate limit bucket
+            print("Could not bind 127.0.0.2-4, serving every stub on 127.0.0.1")
+            servers = StubServers(settings, {api: '127.0.0.1' for api in servers.hosts})
+            urls = servers.start()
+        config_path = run_dir / 'config.yaml'
+        config_path.write_text(yaml.safe_dump(build_config(args.config, urls, args, run_dir)))
+        print(f"{args.articles} articles, {args.mode} mode, stubs at {', '.join(urls.values())}")
+        measurements = asyncio.run(run_pipeline(config_path, run_dir / 'data', urls['llm']))
+    finally:
+        servers.stop()
+        if not args.keep:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    result = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'label': args.label,
+        'scenario': scenario,
+        **measurements,
+        'stub_requests': servers.stats
+    }
+    previous = previous_result(args.results, scenario)
+    report(result, previous)
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.results, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+    if args.keep:
+        print(f"Run directory kept at {run_dir}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+"""
+Benchmark article serialization and storage round trips.
+
+Compares the standard library json path the agents used to persist
+records with the serialization backends available in this environment,
+then times full save/load round trips through each storage backend.
+
+Usage:
+    python -m benchmarks.bench_serialization --articles 500
+"""
+
+import argparse
+import json
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from src.utils import serialization
+from src.utils.storage import STORAGE_BACKENDS
+
+def make_article(index: int, words: int, rng: random.Random) -> Dict[str, Any]:
+    """Build a synthetic article shaped like the pipeline's records.
+
+    Args:
+        index: Article number
+        words: Number of words of content
+        rng: Random generator
+
+    Returns:
+        Article dictionary with research data attached
+    """
+    vocabulary = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(2000)]
+    content = ' '.join(rng.choice(vocabulary) for _ in range(words))
+    return {
+        'title': f"Article {index}",
+        'url': f"https://dev.to/example/article-{index}",
+        'content': content,
+        'relevance_score': rng.random(),
+        'tags': rng.sample(vocabulary, 5),
+        'research_data': {
+            'topic': f"Article {index}",
+            'sources': [
+                {'url': f"https://example.com/{index}/{i}", 'title': f"Source {i}", 'score': rng.random()}
+                for i in range(10)
+            ],
+            'summary': ' '.join(rng.choice(vocabulary) for _ in range(words // 10))
+        }
+    }
+
+def time_round_trip(
+    articles: List[Dict[str, Any]],
+    encode: Callable[[Any], Any],
+    decode: Callable[[Any], Any]
+) -> Dict[str, float]:
+    """Time encoding and decoding every article.
+
+    Args:
+        articles: Articles to serialize
+        encode: Encoder
+        decode: Decoder
+
+    Returns:
+        Encode and decode milliseconds and the mean payload size
+    """
+    start = time.perf_counter()
+    payloads = [encode(article) for article in articles]
+    encoded = time.perf_counter()
+    for payload in payloads:
+        decode(payload)
+    decoded = time.perf_counter()
+    return {
+        'encode_ms': (encoded - start) * 1000,
+        'decode_ms': (decoded - encoded) * 1000,
+        'bytes': sum(len(payload) for payload in payloads) / len(payloads)
+    }
+
+def time_storage(articles: List[Dict[str, Any]], backend: str, format: str) -> Dict[str, float]:
+    """Time saving, flushing and reloading every article through a storage backend.
+
+    Args:
+        articles: Articles to store
+        backend: Name in STORAGE_BACKENDS
+        format: Record format
+
+    Returns:
+        Save and load milliseconds
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = STORAGE_BACKENDS[backend](Path(data_dir), 100, format)
+        start = time.perf_counter()
+        for article in articles:
+            storage.save('drafts', article['title'], article)
+        storage.flush()
+        saved = time.perf_counter()
+        for article in articles:
+            storage.load('drafts', article['title'])
+        loaded = time.perf_counter()
+        storage.close()
+    return {'save_ms': (saved - start) * 1000, 'load_ms': (loaded - saved) * 1000}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=500, help="Number of synthetic articles")
+    parser.add_argument('--words', type=int, default=1500, help="Words of content per article")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    articles = [make_article(i, args.words, rng) for i in range(args.articles)]
+
+    print(f"JSON backend: {serialization.JSON_BACKEND}, msgpack backend: {serialization.MSGPACK_BACKEND}")
+    print(f"{args.articles} articles of {args.words} words\n")
+
+    codecs = {
+        'stdlib json (indent=2)': (lambda obj: json.dumps(obj, indent=2), json.loads),
+        'stdlib json (compact)': (json.dumps, json.loads),
+        f"{serialization.JSON_BACKEND} (indent=2)": (
+            lambda obj: serialization.dumps(obj, indent=True), serialization.loads
+        ),
+        f"{serialization.JSON_BACKEND} (compact)": (serialization.dumps, serialization.loads)
+    }
+    if serialization.MSGPACK_BACKEND is not None:
+        codecs[f"{serialization.MSGPACK_BACKEND} msgpack"] = (serialization.pack, serialization.unpack)
+
+    print(f"{'codec':<28}{'encode ms':>12}{'decode ms':>12}{'bytes/rec':>12}")
+    for name, (encode, decode) in codecs.items():
+        result = time_round_trip(articles, encode, decode)
+        print(f"{name:<28}{result['encode_ms']:>12.1f}{result['decode_ms']:>12.1f}{result['bytes']:>12.0f}")
+
+    print(f"\n{'storage':<28}{'save ms':>12}{'load ms':>12}")
+    formats = ['json'] + (['msgpack'] if serialization.MSGPACK_BACKEND is not None else [])
+    for backend in STORAGE_BACKENDS:
+        for format in formats:
+            if backend == 'jsonl' and format != 'json':
+                continue
+            result = time_storage(articles, backend, format)
+            print(f"{backend + ' / ' + format:<28}{result['save_ms']:>12.1f}{result['load_ms']:>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""
+Benchmark text cleaning and normalization.
+
+Compares the regex-based clean_text the agents used to call with the
+current implementation, which takes a bytes.translate path for ASCII
+text, and times normalize_text on whole documents against
+normalize_stream over chunks of them.
+
+Usage:
+    python -m benchmarks.bench_text --documents 200 --words 5000
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+from typing import Callable, List
+
+from src.utils.text import clean_text, normalize_stream, normalize_text
+
+# Punctuation and whitespace mixed into the words
+_NOISE = list(',.;:!?()"\'-\t\n')
+
+# Characters that take documents off the ASCII fast path
+_NON_ASCII_NOISE = ['é', 'Ü', 'ﬁ', '’', '—', '\xa0']
+
+def regex_clean_text(text: str) -> str:
+    """The previous clean_text: lower-case, regex substitution, strip.
+
+    Args:
+        text: Text to clean
+
+    Returns:
+        Cleaned text
+    """
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    return text.strip()
+
+def make_document(words: int, rng: random.Random, non_ascii: bool = False) -> str:
+    """Build a synthetic article body with punctuation and mixed case.
+
+    Args:
+        words: Number of words
+        rng: Random generator
+        non_ascii: Whether to mix in accented letters and typographic punctuation
+
+    Returns:
+        Document text
+    """
+    noise = _NOISE + _NON_ASCII_NOISE if non_ascii else _NOISE
+    parts = []
+    for _ in range(words):
+        word = ''.join(rng.choices(string.ascii_letters, k=rng.randint(2, 10)))
+        if rng.random() < 0.2:
+            word += rng.choice(noise)
+        parts.append(word)
+    return ' '.join(parts)
+
+def time_calls(documents: List[str], func: Callable[[str], object], repeat: int) -> float:
+    """Time a function over every document, keeping the best repetition.
+
+    Args:
+        documents: Documents to process
+        func: Function to time
+        repeat: Number of repetitions
+
+    Returns:
+        Milliseconds of the fastest repetition
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            func(document)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=200, help="Number of synthetic documents")
+    parser.add_argument('--words', type=int, default=5000, help="Words per document")
+    parser.add_argument('--non-ascii', type=float, default=0.2, help="Share of documents with non-ASCII text")
+    parser.add_argument('--chunk-size', type=int, default=16384, help="Characters per streamed chunk")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetitions, best one reported")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [
+        make_document(args.words, rng, rng.random() < args.non_ascii)
+        for _ in range(args.documents)
+    ]
+    for document in documents:
+        assert clean_text(document) == regex_clean_text(document)
+
+    def stream(document: str) -> str:
+        chunks = (document[i:i + args.chunk_size] for i in range(0, len(document), args.chunk_size))
+        return ' '.join(normalize_stream(chunks))
+
+    characters = sum(len(document) for document in documents)
+    print(
+        f"{args.documents} documents of {args.words} words ({characters / 1e6:.1f}M characters), "
+        f"{args.non_ascii:.0%} with non-ASCII text\n"
+    )
+    print(f"{'implementation':<34}{'ms':>10}{'MB/s':>10}")
+    for name, func in {
+        'clean_text (regex)': regex_clean_text,
+        'clean_text': clean_text,
+        'clean_text + split/join (regex)': lambda text: ' '.join(regex_clean_text(text).split()),
+        'normalize_text (NFKC)': normalize_text,
+        'normalize_text (no NFKC)': lambda text: normalize_text(text, None),
+        'normalize_stream (NFKC)': stream
+    }.items():
+        elapsed = time_calls(documents, func, args.repeat)
+        print(f"{name:<34}{elapsed:>10.1f}{characters / 1e3 / elapsed:>10.1f}")
+
+if __name__ == '__main__':
+    main()
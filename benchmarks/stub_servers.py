@@ -0,0 +1,272 @@
+"""
+Local stand-ins for the Dev.to, Perplexity and LLM APIs used by the benchmarks.
+
+Each API is served by an aiohttp application on its own loopback address,
+so the pipeline's per-host rate limits and connection pools treat them as
+separate upstreams. Responses are synthetic but deterministic. Every
+request is delayed, and API calls (research, generation and publishing,
+not the public listing and article pages) can be failed with a 500 or
+throttled with a 429.
+
+The servers run in a child process so their CPU and memory use stay out
+of the pipeline's measurements:
+
+    with StubServers(StubSettings(articles=1000)) as urls:
+        ...  # urls['devto'], urls['perplexity'], urls['llm']
+"""
+
+import asyncio
+import multiprocessing
+import random
+import string
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from aiohttp import web
+
+# Loopback addresses of the three APIs; Linux routes all of 127.0.0.0/8 to lo
+DEFAULT_HOSTS = {'devto': '127.0.0.2', 'perplexity': '127.0.0.3', 'llm': '127.0.0.4'}
+
+# Keywords mixed into the synthetic articles so the filter finds them relevant
+TOPIC_WORDS = ['technology', 'programming', 'ai', 'machine learning', 'python', 'async']
+
+class StubSettings(NamedTuple):
+    """Behaviour of the stub APIs."""
+
+    # Articles listed by the Dev.to stub
+    articles: int = 1000
+    # Words in each article body
+    words: int = 1500
+    # Words in each research answer and each generated text
+    response_words: int = 800
+    # Mean response delay in seconds, and its relative jitter
+    latency: float = 0.02
+    jitter: float = 0.5
+    # Share of requests answered with 500 and with 429
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    # Retry-After seconds sent with a 429
+    retry_after: float = 1.0
+    seed: int = 1
+
+def _vocabulary(seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(5000)]
+
+class _Stub:
+    """Request handlers of all three APIs and their counters."""
+
+    def __init__(self, settings: StubSettings):
+        self.settings = settings
+        self.vocabulary = _vocabulary(settings.seed)
+        self.rng = random.Random(settings.seed)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.published: List[Dict[str, Any]] = []
+        self.devto_url = ''
+
+    def _text(self, seed: Any, words: int) -> str:
+        rng = random.Random(f"{self.settings.seed}-{seed}")
+        parts = rng.choices(self.vocabulary, k=words)
+        for position in rng.sample(range(words), min(words, max(1, words // 50))):
+            parts[position] = rng.choice(TOPIC_WORDS)
+        return ' '.join(parts)
+
+    async def _respond(self, api: str, faults: bool = True) -> Optional[web.Response]:
+        """Apply latency and injected failures.
+
+        Args:
+            api: API the request was sent to
+            faults: Whether the request may be failed or throttled
+
+        Returns:
+            Failure response, or None to answer normally
+        """
+        settings = self.settings
+        counts = self.stats.setdefault(api, {'requests': 0, 'errors': 0, 'throttled': 0})
+        counts['requests'] += 1
+        if settings.latency > 0:
+            spread = settings.latency * settings.jitter
+            await asyncio.sleep(max(0.0, self.rng.uniform(settings.latency - spread, settings.latency + spread)))
+        roll = self.rng.random() if faults else 1.0
+        if roll < settings.throttle_rate:
+            counts['throttled'] += 1
+            return web.json_response(
+                {'error': 'rate limit exceeded'},
+                status=429,
+                headers={'Retry-After': f"{settings.retry_after:g}"}
+            )
+        if roll < settings.throttle_rate + settings.error_rate:
+            counts['errors'] += 1
+            return web.json_response({'error': 'internal error'}, status=500)
+        return None
+
+    async def list_articles(self, request: web.Request) -> web.Response:
+        failure = await self._respond('devto', faults=False)
+        if failure is not None:
+            return failure
+        page = max(1, int(request.query.get('page', 1)))
+        per_page = max(1, int(request.query.get('per_page', 30)))
+        first = (page - 1) * per_page
+        return web.json_response([
+            {
+                'id': index,
+                'title': f"{self._text(('title', index), 5).title()} {index}",
+                'url': f"{self.devto_url}/articles/{index}",
+                'tag_list': ['programming', 'python']
+            }
+            for index in range(first, min(first + per_page, self.settings.articles))
+        ])
+
+    async def article_page(self, request: web.Request) -> web.Response:
+        failure = await self._respond('devto', faults=False)
+        if failure is not None:
+            return failure
+        index = int(request.match_info['index'])
+        if index >= self.settings.articles:
+            raise web.HTTPNotFound()
+        words = self._text(('body', index), self.settings.words).split()
+        paragraphs = ''.join(f"<p>{' '.join(words[i:i + 80])}.</p>" for i in range(0, len(words), 80))
+        html = (
+            "<!DOCTYPE html><html><head><title>Article</title>"
+            "<script>window.analytics = {};</script></head><body>"
+            "<nav><a href='/'>Home</a><a href='/top'>Top</a></nav>"
+            f"<article><h1>Article {index}</h1>{paragraphs}</article>"
+            "<footer>Footer links</footer></body></html>"
+        )
+        return web.Response(text=html, content_type='text/html')
+
+    async def publish(self, request: web.Request) -> web.Response:
+        failure = await self._respond('devto')
+        if failure is not None:
+            return failure
+        body = await request.json()
+        article = body.get('article', {})
+        published = self.stats['devto'].setdefault('published', 0) + 1
+        self.stats['devto']['published'] = published
+        record = {
+            'id': published,
+            'title': article.get('title'),
+            'url': f"{self.devto_url}/posts/{published}",
+            'published': bool(article.get('published'))
+        }
+        self.published.append(record)
+        return web.json_response(record, status=201)
+
+    async def my_articles(self, request: web.Request) -> web.Response:
+        failure = await self._respond('devto')
+        if failure is not None:
+            return failure
+        per_page = max(1, int(request.query.get('per_page', 30)))
+        return web.json_response(self.published[::-1][:per_page])
+
+    async def research(self, request: web.Request) -> web.Response:
+        failure = await self._respond('perplexity')
+        if failure is not None:
+            return failure
+        body = await request.json()
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        return web.json_response({
+            'choices': [{'message': {'role': 'assistant', 'content': self._text(prompt, self.settings.response_words)}}],
+            'citations': [f"https://example.com/source/{i}" for i in range(5)]
+        })
+
+    async def complete(self, request: web.Request) -> web.Response:
+        failure = await self._respond('llm')
+        if failure is not None:
+            return failure
+        body = await request.json()
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        return web.json_response({
+            'choices': [{'message': {'role': 'assistant', 'content': self._text(prompt, self.settings.response_words)}}]
+        })
+
+async def _serve(settings: StubSettings, hosts: Dict[str, str], connection: Any):
+    stub = _Stub(settings)
+    apps = {
+        'devto': [
+            web.get('/api/articles', stub.list_articles),
+            web.post('/api/articles', stub.publish),
+            web.get('/api/articles/me/all', stub.my_articles),
+            web.get('/articles/{index}', stub.article_page)
+        ],
+        'perplexity': [web.post('/chat/completions', stub.research)],
+        'llm': [web.post('/v1/chat/completions', stub.complete)]
+    }
+    runners = []
+    urls = {}
+    try:
+        for api, routes in apps.items():
+            app = web.Application(client_max_size=16 * 1024 * 1024)
+            app.add_routes(routes)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            runners.append(runner)
+            site = web.TCPSite(runner, hosts[api], 0, backlog=1024)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            urls[api] = f"http://{hosts[api]}:{port}"
+        stub.devto_url = urls['devto']
+        urls['devto'] += '/api'
+        connection.send(urls)
+        # Serve until the parent asks for the request counts
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        connection.send(stub.stats)
+    except OSError as e:
+        connection.send(e)
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+def _main(settings: StubSettings, hosts: Dict[str, str], connection: Any):
+    asyncio.run(_serve(settings, hosts, connection))
+
+class StubServers:
+    """Runs the stub APIs in a child process for the duration of a with block."""
+
+    def __init__(self, settings: StubSettings, hosts: Optional[Dict[str, str]] = None):
+        """Initialize stub servers.
+
+        Args:
+            settings: Behaviour of the stub APIs
+            hosts: Address of each API; defaults to DEFAULT_HOSTS
+        """
+        self.settings = settings
+        self.hosts = dict(hosts or DEFAULT_HOSTS)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._process: Optional[multiprocessing.Process] = None
+        self._connection = None
+
+    def start(self) -> Dict[str, str]:
+        """Start serving.
+
+        Returns:
+            Base URL of each API
+        """
+        context = multiprocessing.get_context('spawn')
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_main, args=(self.settings, self.hosts, child), daemon=True)
+        self._process.start()
+        urls = self._connection.recv()
+        if isinstance(urls, Exception):
+            self._process.join()
+            raise urls
+        return urls
+
+    def stop(self):
+        """Stop serving and collect the per-API request counts."""
+        if self._process is None:
+            return
+        try:
+            self._connection.send('stop')
+            self.stats = self._connection.recv()
+        except (EOFError, OSError):
+            pass
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+
+    def __enter__(self) -> Dict[str, str]:
+        return self.start()
+
+    def __exit__(self, *exc_info: Any):
+        self.stop()
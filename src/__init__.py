@@ -1,10 +1,11 @@
-"""Package initialization."""
-
-from src.agents.base import BaseAgent
-from src.agents.scraper import ScraperAgent
-from src.agents.filter import FilterAgent
-from src.agents.research import ResearchAgent
-from src.agents.writer import WriterAgent
-from src.agents.publisher import PublisherAgent
-
+"""Package initialization."""
+
+from src.agents.base import BaseAgent
+from src.agents.scraper import ScraperAgent
+from src.agents.filter import FilterAgent
+from src.agents.research import ResearchAgent
+from src.agents.writer import WriterAgent
+from src.agents.publisher import PublisherAgent
+from src.models import Article
+
 __version__ = "0.1.0"
\ No newline at end of file
@@ -1,17 +1,17 @@
-"""Agent package initialization."""
-
-from src.agents.base import BaseAgent
-from src.agents.scraper import ScraperAgent
-from src.agents.filter import FilterAgent
-from src.agents.research import ResearchAgent
-from src.agents.writer import WriterAgent
-from src.agents.publisher import PublisherAgent
-
-__all__ = [
-    'BaseAgent',
-    'ScraperAgent',
-    'FilterAgent',
-    'ResearchAgent',
-    'WriterAgent',
-    'PublisherAgent'
+"""Agent package initialization."""
+
+from src.agents.base import BaseAgent
+from src.agents.scraper import ScraperAgent
+from src.agents.filter import FilterAgent
+from src.agents.research import ResearchAgent
+from src.agents.writer import WriterAgent
+from src.agents.publisher import PublisherAgent
+
+__all__ = [
+    'BaseAgent',
+    'ScraperAgent',
+    'FilterAgent',
+    'ResearchAgent',
+    'WriterAgent',
+    'PublisherAgent'
 ]
\ No newline at end of file
@@ -1,89 +1,259 @@
-"""
-Base Agent class providing common functionality for all agents.
-"""
-
-from abc import ABC, abstractmethod
-from pathlib import Path
-import asyncio
-import json
-import logging
-from typing import Any, Dict, List, Optional
-
-from src.utils.config import Config
-from src.utils.monitoring import monitor
-
-class BaseAgent(ABC):
-    """Base class for all agents in the pipeline."""
-
-    def __init__(self, config: Dict[str, Any], data_dir: Optional[Path] = None):
-        """Initialize base agent with configuration.
-        
-        Args:
-            config: Agent-specific configuration dictionary
-            data_dir: Optional path to data directory
-        """
-        self.config = config
-        self.data_dir = data_dir or Path("data")
-        self.logger = logging.getLogger(self.__class__.__name__)
-
-    @abstractmethod
-    async def process(self, input_data: Any) -> Any:
-        """Process input data and return results.
-        
-        Args:
-            input_data: Input data to process
-            
-        Returns:
-            Processed data
-        """
-        pass
-
-    async def rate_limit(self):
-        """Implement rate limiting."""
-        await asyncio.sleep(1)  # Default 1 request per second
-
-    def save_data(self, data: Any, filename: str, subdir: str):
-        """Save data to JSON file.
-        
-        Args:
-            data: Data to save
-            filename: Name of file
-            subdir: Subdirectory under data_dir
-        """
-        save_path = self.data_dir / subdir
-        save_path.mkdir(parents=True, exist_ok=True)
-        
-        file_path = save_path / f"{filename}.json"
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-
-    def load_data(self, filename: str, subdir: str) -> Any:
-        """Load data from JSON file.
-        
-        Args:
-            filename: Name of file
-            subdir: Subdirectory under data_dir
-            
-        Returns:
-            Loaded data
-        """
-        file_path = self.data_dir / subdir / f"{filename}.json"
-        with open(file_path) as f:
-            return json.load(f)
-
-    @monitor
-    async def execute(self, input_data: Any) -> Any:
-        """Execute agent processing with monitoring.
-        
-        Args:
-            input_data: Input data to process
-            
-        Returns:
-            Processed data
-        """
-        try:
-            await self.rate_limit()
-            return await self.process(input_data)
-        except Exception as e:
-            self.logger.error(f"Error in {self.__class__.__name__}: {str(e)}")
+"""
+Base Agent class providing common functionality for all agents.
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.utils.config import Config
+from src.utils.monitoring import ITEMS_IN_FLIGHT, ThrottledLogger, monitor
+from src.utils.http import HttpResponse, SessionManager
+from src.utils.rate_limit import host_of, rate_limiter
+from src.utils.storage import FileStorage, StorageBackend
+from src.utils.tracing import tracer
+
+class ItemOutcomes:
+    """Per-item outcomes of the map_concurrent calls made under track_items.
+    
+    Failed items are kept apart from items a stage rejected by returning
+    None, so a caller can retry failures instead of treating them as drops.
+    """
+    
+    __slots__ = ('failed', 'sources')
+    
+    def __init__(self):
+        """Initialize empty outcomes."""
+        # Items whose call raised
+        self.failed: List[Any] = []
+        # Item each result was produced from, keyed by id() of the result
+        self.sources: Dict[int, Any] = {}
+        
+    def source_of(self, result: Any) -> Any:
+        """Get the item a result was produced from.
+        
+        Args:
+            result: Result returned by an agent
+            
+        Returns:
+            The item, or the result itself if it was not produced by
+            map_concurrent, as for agents returning their input articles
+        """
+        return self.sources.get(id(result), result)
+
+_item_outcomes: ContextVar[Optional[ItemOutcomes]] = ContextVar('item_outcomes', default=None)
+
+@contextmanager
+def track_items() -> Iterator[ItemOutcomes]:
+    """Collect per-item outcomes of the map_concurrent calls made in the block.
+    
+    Yields:
+        Outcomes filled in as the calls complete
+    """
+    outcomes = ItemOutcomes()
+    token = _item_outcomes.set(outcomes)
+    try:
+        yield outcomes
+    finally:
+        _item_outcomes.reset(token)
+
+class BaseAgent(ABC):
+    """Base class for all agents in the pipeline."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        data_dir: Optional[Path] = None,
+        session: Optional[SessionManager] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        """Initialize base agent with configuration.
+        
+        Args:
+            config: Agent-specific configuration dictionary
+            data_dir: Optional path to data directory
+            session: Optional shared HTTP session manager. Agents created
+                without one own a private session, closed by close().
+            storage: Optional shared storage backend. Agents created without
+                one own a FileStorage under data_dir, closed by close().
+        """
+        self.config = config
+        self.data_dir = data_dir or Path("data")
+        self._owns_session = session is None
+        self.session = session or SessionManager(config.get('http', {}))
+        self._owns_storage = storage is None
+        self.storage = storage or FileStorage(self.data_dir)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # Rate-limited, lazily formatted logging for per-article messages
+        self.article_log = ThrottledLogger(self.logger)
+        self.max_concurrency = max(1, int(config.get('max_concurrency', 1)))
+        self.ordered_results = config.get('ordered_results', True)
+        self.api = config.get('api', {}) or {}
+        self.requests_per_minute = config.get('rate_limit')
+        self.burst = config.get('burst')
+
+    @abstractmethod
+    async def process(self, input_data: Any) -> Any:
+        """Process input data and return results.
+        
+        Args:
+            input_data: Input data to process
+            
+        Returns:
+            Processed data
+        """
+        pass
+
+    async def map_concurrent(
+        self,
+        func: Callable[[Any], Awaitable[Any]],
+        items: Iterable[Any],
+        error_message: str = "Error processing item",
+        ordered: Optional[bool] = None
+    ) -> List[Any]:
+        """Apply an async function to items with bounded concurrency.
+        
+        At most max_concurrency calls run at once. An item whose call raises
+        is logged and skipped, as is an item whose call returns None, so one
+        bad article never fails the whole batch; under track_items, failed
+        items are reported separately from the skipped ones. Each call is
+        traced as an 'item' span, sampled for profiling when slow.
+        
+        Args:
+            func: Coroutine function processing a single item
+            items: Items to process
+            error_message: Log message prefix for failed items
+            ordered: Keep results in input order; when False, results are
+                collected in completion order. Defaults to ordered_results.
+                
+        Returns:
+            List of non-None results
+        """
+        if ordered is None:
+            ordered = self.ordered_results
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        in_flight = ITEMS_IN_FLIGHT.labels(agent=self.__class__.__name__)
+        outcomes = _item_outcomes.get()
+        
+        async def run(item: Any) -> Any:
+            async with semaphore:
+                in_flight.inc()
+                try:
+                    with tracer.span('item', profile=True, title=getattr(item, 'title', None)):
+                        result = await func(item)
+                except Exception as e:
+                    self.logger.error(f"{error_message}: {str(e)}")
+                    if outcomes is not None:
+                        outcomes.failed.append(item)
+                    return None
+                finally:
+                    in_flight.dec()
+                if outcomes is not None and result is not None:
+                    outcomes.sources[id(result)] = item
+                return result
+        
+        tasks = [asyncio.ensure_future(run(item)) for item in items]
+        try:
+            if ordered:
+                results = await asyncio.gather(*tasks)
+            else:
+                results = [await task for task in asyncio.as_completed(tasks)]
+        finally:
+            for task in tasks:
+                task.cancel()
+        return [result for result in results if result is not None]
+
+    async def rate_limit(self, host: str, api_key: Optional[str] = None) -> float:
+        """Wait for a request slot on an upstream host.
+        
+        Buckets are shared by all agents and keyed by host and API key.
+        Hosts configured under 'api' use their own limits; other hosts fall
+        back to this agent's 'rate_limit' (requests per minute) and 'burst'.
+        
+        Args:
+            host: Upstream host name
+            api_key: Optional API key the request is made with
+            
+        Returns:
+            Seconds spent waiting
+        """
+        return await rate_limiter.acquire(
+            host,
+            api_key,
+            self.requests_per_minute,
+            self.burst
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        api_key: Optional[str] = None,
+        **kwargs
+    ) -> HttpResponse:
+        """Send a rate limited request over the shared session.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            api_key: Optional API key, selects the rate limit bucket
+            **kwargs: Extra arguments such as headers, params or json
+            
+        Returns:
+            Fully read response
+        """
+        await self.rate_limit(host_of(url), api_key)
+        return await self.session.request(method, url, **kwargs)
+
+    async def close(self):
+        """Release resources owned by the agent."""
+        if self._owns_session:
+            await self.session.close()
+        if self._owns_storage:
+            await asyncio.to_thread(self.storage.close)
+
+    def save_data(self, data: Any, filename: str, subdir: str):
+        """Save data to the storage backend.
+        
+        The record is serialized immediately and written by the backend's
+        background writer, so the event loop does not wait on disk I/O.
+        
+        Args:
+            data: Data to save
+            filename: Record key, the file name for the default layout
+            subdir: Subdirectory under data_dir
+        """
+        self.storage.save(subdir, filename, data)
+
+    def load_data(self, filename: str, subdir: str) -> Any:
+        """Load data from the storage backend.
+        
+        Args:
+            filename: Record key, the file name for the default layout
+            subdir: Subdirectory under data_dir
+            
+        Returns:
+            Loaded data
+        """
+        return self.storage.load(subdir, filename)
+
+    @monitor
+    async def execute(self, input_data: Any) -> Any:
+        """Execute agent processing with monitoring.
+        
+        Args:
+            input_data: Input data to process
+            
+        Returns:
+            Processed data
+        """
+        try:
+            return await self.process(input_data)
+        except Exception as e:
+            self.logger.error(f"Error in {self.__class__.__name__}: {str(e)}")
             raise
\ No newline at end of file
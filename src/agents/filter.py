@@ -1,104 +1,500 @@
-"""
-Content filtering agent for analyzing and filtering scraped content.
-"""
-
-import asyncio
-from typing import Any, Dict, List
-from pathlib import Path
-
-from src.agents.base import BaseAgent
-from src.utils.text import calculate_relevance
-
-class FilterAgent(BaseAgent):
-    """Agent for filtering and analyzing content."""
-
-    def __init__(self, config: Dict[str, Any], data_dir: Path = None):
-        """Initialize filter agent.
-        
-        Args:
-            config: Filter configuration dictionary
-            data_dir: Optional path to data directory
-        """
-        super().__init__(config, data_dir)
-        self.min_relevance_score = config.get('min_relevance_score', 0.7)
-        self.min_word_count = config.get('min_word_count', 500)
-
-    async def calculate_content_score(self, content: Dict[str, Any]) -> float:
-        """Calculate relevance score for content.
-        
-        Args:
-            content: Content dictionary to score
-            
-        Returns:
-            Relevance score between 0 and 1
-        """
-        # Implementation details removed for public version
-        return 0.0
-
-    async def check_word_count(self, content: Dict[str, Any]) -> bool:
-        """Check if content meets minimum word count.
-        
-        Args:
-            content: Content dictionary to check
-            
-        Returns:
-            True if word count is sufficient
-        """
-        word_count = len(content.get('content', '').split())
-        return word_count >= self.min_word_count
-
-    async def is_spam(self, content: Dict[str, Any]) -> bool:
-        """Check if content is spam.
-        
-        Args:
-            content: Content dictionary to check
-            
-        Returns:
-            True if content is spam
-        """
-        # Implementation details removed for public version
-        return False
-
-    async def save_filtered_content(self, articles: List[Dict[str, Any]]):
-        """Save filtered content.
-        
-        Args:
-            articles: List of filtered articles to save
-        """
-        for article in articles:
-            filename = article['title'].lower().replace(' ', '_')
-            self.save_data(article, filename, 'filtered_content')
-
-    async def process(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process and filter input articles.
-        
-        Args:
-            articles: List of articles to filter
-            
-        Returns:
-            List of filtered articles
-        """
-        filtered_articles = []
-        
-        for article in articles:
-            try:
-                if not await self.check_word_count(article):
-                    self.logger.info(f"Article '{article.get('title')}' too short")
-                    continue
-                    
-                if await self.is_spam(article):
-                    self.logger.info(f"Article '{article.get('title')}' flagged as spam")
-                    continue
-                    
-                score = await self.calculate_content_score(article)
-                if score < self.min_relevance_score:
-                    self.logger.info(f"Article '{article.get('title')}' below relevance threshold")
-                    continue
-                    
-                filtered_articles.append(article)
-                    
-            except Exception as e:
-                self.logger.error(f"Error filtering article: {str(e)}")
-                
-        await self.save_filtered_content(filtered_articles)
-        return filtered_articles
\ No newline at end of file
+"""
+Content filtering agent for analyzing and filtering scraped content.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+
+import numpy as np
+
+from src.agents.base import BaseAgent
+from src.models import Article
+from src.utils.cascade import CascadeCheck, FilterCascade
+from src.utils.dedup import MinHashIndex, minhash_signature
+from src.utils.executor import executor
+from src.utils.http import SessionManager
+from src.utils.matcher import MatchResult, PhraseMatcher
+from src.utils.rate_limit import host_of
+from src.utils.text import KeywordRelevance, check_plagiarism, scan_document
+from src.utils.storage import StorageBackend
+
+# Phrases typical of promotional spam, used when 'spam_markers' is not configured
+DEFAULT_SPAM_MARKERS = [
+    'buy now',
+    'click here',
+    'limited time offer',
+    'act now',
+    'free money',
+    'work from home',
+    'casino',
+    'earn $',
+    '100% free',
+    'risk-free'
+]
+
+# Cascade checks run when 'checks' is not configured, with their estimated costs
+DEFAULT_CHECKS = [
+    {'name': 'word_count', 'cost': 1},
+    {'name': 'excluded_domain', 'cost': 4},
+    {'name': 'spam', 'cost': 4},
+    {'name': 'relevance', 'cost': 8}
+]
+
+# Checks reading the phrase scan, which is done for the whole batch before the first of them
+_SCANNING_CHECKS = ('excluded_domain', 'spam', 'relevance')
+
+# Log message for articles each check rejects
+_REJECTION_MESSAGES = {
+    'word_count': "too short",
+    'excluded_domain': "from excluded domain",
+    'spam': "flagged as spam",
+    'relevance': "below relevance threshold",
+    'plagiarism': "flagged as plagiarized"
+}
+
+class FilterAgent(BaseAgent):
+    """Agent for filtering and analyzing content."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        data_dir: Path = None,
+        session: Optional[SessionManager] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        """Initialize filter agent.
+        
+        Args:
+            config: Filter configuration dictionary
+            data_dir: Optional path to data directory
+            session: Optional shared HTTP session manager
+            storage: Optional shared storage backend
+        """
+        super().__init__(config, data_dir, session, storage)
+        self.min_relevance_score = config.get('min_relevance_score', 0.4)
+        self.min_word_count = config.get('min_word_count', 500)
+        self.keywords = config.get('keywords', [])
+        self.relevance = KeywordRelevance(
+            self.keywords,
+            self.data_dir / 'index' / 'relevance.json'
+        )
+        self.spam_markers = config.get('spam_markers', DEFAULT_SPAM_MARKERS)
+        self.spam_threshold = config.get('spam_threshold', 2)
+        self.exclude_domains = [domain.lower() for domain in config.get('exclude_domains', [])]
+        self.matcher = PhraseMatcher({
+            'keyword': self.keywords,
+            'spam': self.spam_markers,
+            'domain': self.exclude_domains
+        })
+        # Compiled once here rather than in every worker the matcher is sent to
+        self.matcher.compile()
+        self._scans: Dict[int, MatchResult] = {}
+        self._keyword_counts: Dict[int, np.ndarray] = {}
+        # Whether check statistics or corpus statistics changed since the last save
+        self._state_changed = False
+        self.cascade = FilterCascade(
+            [self._cascade_check(check) for check in config.get('checks', DEFAULT_CHECKS)],
+            adaptive=config.get('adaptive_order', True),
+            stats_path=self.data_dir / 'index' / 'filter_stats.json'
+        )
+        self.max_duplicates = config.get('max_duplicates')
+        self.index_flush_size = config.get('index_flush_size', 100)
+        self.duplicate_index = None
+        if self.max_duplicates:
+            self.duplicate_index = MinHashIndex(
+                self.data_dir / 'index' / 'minhash.jsonl',
+                threshold=self.max_duplicates,
+                num_perm=config.get('minhash_permutations', 128),
+                shingle_size=config.get('shingle_size', 5)
+            )
+
+    def _cascade_check(self, check: Any) -> CascadeCheck:
+        """Build a cascade check from its configuration.
+        
+        Args:
+            check: Check name, or a mapping with 'name' and optional 'cost'
+            
+        Returns:
+            Cascade check bound to this agent
+        """
+        if isinstance(check, str):
+            check = {'name': check}
+        name = check['name']
+        checks = {
+            'word_count': (self.check_word_count, False),
+            'excluded_domain': (self.check_domain, False),
+            'spam': (self.check_spam, False),
+            'relevance': (self.check_relevance, True),
+            'plagiarism': (self.check_plagiarism, True)
+        }
+        if name not in checks:
+            raise ValueError(f"Unknown filter check: {name}")
+        func, batch = checks[name]
+        return CascadeCheck(name, float(check.get('cost', 1)), func, batch)
+
+    async def calculate_content_score(self, article: Article) -> float:
+        """Calculate relevance score for content.
+        
+        Args:
+            article: Article to score
+            
+        Returns:
+            Relevance score between 0 and 1
+        """
+        if article.relevance_score is None:
+            await self.scan_batch([article])
+            counts = self.keyword_counts(article)[None, :]
+            lengths = np.array([self.word_count(article)])
+            article.relevance_score = float(self.relevance.score_matrix(counts, lengths)[0])
+        return article.relevance_score
+
+    def score_batch(self, articles: List[Article]):
+        """Score a whole batch of articles in one vectorized pass.
+        
+        Every article is scanned once with the phrase matcher, reusing the
+        scan of the spam and domain checks, and gets its 'relevance_score'.
+        Articles are scored against the corpus statistics of earlier
+        batches only, so a score does not depend on which other articles
+        reached the check; update_corpus adds the batch afterwards.
+        
+        Args:
+            articles: Articles to score
+        """
+        counts, lengths = self._term_rows(articles)
+        scores = self.relevance.score_matrix(counts, lengths).tolist()
+        for article, score in zip(articles, scores):
+            article.relevance_score = score
+
+    def update_corpus(self, articles: List[Article]):
+        """Add accepted articles to the keyword document frequencies.
+        
+        Only articles that passed every check are added, so the corpus,
+        like each verdict, is the same whatever order the cascade ran in.
+        
+        Args:
+            articles: Accepted articles
+        """
+        if articles:
+            self.relevance.update(*self._term_rows(articles))
+
+    def _term_rows(self, articles: List[Article]) -> Tuple[np.ndarray, np.ndarray]:
+        """Build the term count matrix and document lengths of articles.
+        
+        Args:
+            articles: Articles to count
+            
+        Returns:
+            Tuple of (counts, lengths)
+        """
+        counts = np.array([self.keyword_counts(article) for article in articles]).reshape(
+            len(articles), len(self.keywords)
+        )
+        lengths = np.array([self.word_count(article) for article in articles])
+        return counts, lengths
+
+    def word_count(self, article: Article) -> int:
+        """Get the word count of an article's content.
+        
+        Args:
+            article: Article to count
+            
+        Returns:
+            Word count from extraction, or counted from the content
+        """
+        if article.word_count is None:
+            article.word_count = len((article.content or '').split())
+        return article.word_count
+
+    async def check_word_count(self, article: Article) -> bool:
+        """Check if content meets minimum word count.
+        
+        Args:
+            article: Article to check
+            
+        Returns:
+            True if word count is sufficient
+        """
+        return self.word_count(article) >= self.min_word_count
+
+    async def is_spam(self, article: Article) -> bool:
+        """Check if content is spam.
+        
+        Args:
+            article: Article to check
+            
+        Returns:
+            True if content is spam
+        """
+        return self.scan(article).count('spam') >= self.spam_threshold
+
+    async def is_excluded_domain(self, article: Article) -> bool:
+        """Check if content comes from or links to an excluded domain.
+        
+        Args:
+            article: Article to check
+            
+        Returns:
+            True if the article's host or a domain mentioned in its body
+            is excluded
+        """
+        host = host_of(article.url or '').lower()
+        if any(host == domain or host.endswith(f".{domain}") for domain in self.exclude_domains):
+            return True
+        return self.scan(article).count('domain') > 0
+
+    async def scan_batch(self, articles: List[Article]):
+        """Scan the articles not scanned yet in the analysis executor.
+        
+        The character-by-character matcher scan and the keyword counting
+        are pure Python, so they run in worker processes rather than on
+        the event loop.
+        
+        Args:
+            articles: Articles the next checks will read the scan of
+        """
+        unscanned = [article for article in articles if id(article) not in self._scans]
+        if not unscanned:
+            return
+        results = await executor.map(
+            scan_document,
+            [article.content or '' for article in unscanned],
+            matcher=self.matcher,
+            relevance=self.relevance
+        )
+        for article, (scan, counts) in zip(unscanned, results):
+            self._scans[id(article)] = scan
+            self._keyword_counts[id(article)] = counts
+
+    def scan(self, article: Article) -> MatchResult:
+        """Get the keyword, spam marker and domain matches of content.
+        
+        The scan is kept until the batch is processed, so every check
+        reuses a single pass over the text. Articles not passed to
+        scan_batch first are scanned here, on the calling thread.
+        
+        Args:
+            article: Article to scan
+            
+        Returns:
+            Match result
+        """
+        if id(article) not in self._scans:
+            scan, counts = scan_document(article.content or '', self.matcher, self.relevance)
+            self._scans[id(article)] = scan
+            self._keyword_counts[id(article)] = counts
+        return self._scans[id(article)]
+
+    def keyword_counts(self, article: Article) -> np.ndarray:
+        """Get an article's row of the keyword term count matrix.
+        
+        Args:
+            article: Scanned article
+            
+        Returns:
+            Occurrences of every keyword
+        """
+        self.scan(article)
+        return self._keyword_counts[id(article)]
+
+    async def check_domain(self, article: Article) -> bool:
+        """Cascade check passing articles not tied to an excluded domain."""
+        return not await self.is_excluded_domain(article)
+
+    async def check_spam(self, article: Article) -> bool:
+        """Cascade check passing articles not flagged as spam."""
+        return not await self.is_spam(article)
+
+    async def check_relevance(self, articles: List[Article]) -> List[bool]:
+        """Cascade check scoring the surviving articles in one batch.
+        
+        Args:
+            articles: Articles that passed the earlier checks
+            
+        Returns:
+            Whether each article meets min_relevance_score
+        """
+        self.score_batch(articles)
+        return [article.relevance_score >= self.min_relevance_score for article in articles]
+
+    async def check_plagiarism(self, articles: List[Article]) -> List[bool]:
+        """Cascade check running plagiarism detection on the surviving articles.
+        
+        Args:
+            articles: Articles that passed the earlier checks
+            
+        Returns:
+            Whether each article is free of detected plagiarism
+        """
+        flagged = await executor.map(check_plagiarism, [article.content or '' for article in articles])
+        return [not plagiarized for plagiarized in flagged]
+
+    def find_duplicate(self, article: Article, signature: Optional[List[int]] = None) -> Optional[str]:
+        """Check content against everything accepted before and index it if new.
+        
+        Args:
+            article: Article to check
+            signature: Optional precomputed MinHash signature of the content
+            
+        Returns:
+            Key of the earlier near-duplicate, or None if the content is new
+        """
+        if self.duplicate_index is None:
+            return None
+        key = article.url or article.title
+        return self.duplicate_index.check_and_add(key, article.content or '', signature)
+
+    async def save_filtered_content(self, articles: List[Article]):
+        """Save filtered content and release it until the writer needs it.
+        
+        Args:
+            articles: List of filtered articles to save
+        """
+        for article in articles:
+            filename = article.storage_key()
+            self.save_data(article, filename, 'filtered_content')
+            article.offload(self.storage, 'filtered_content', filename)
+
+    async def run_cascade(self, articles: List[Article]) -> List[Article]:
+        """Run the filter checks stage by stage over a batch.
+        
+        Each check sees only the articles every earlier check passed, in
+        the cascade's current order; batch checks run once over all of
+        them. The survivors are scanned in the analysis executor before the
+        first check that reads the phrase scan. Near-duplicates are checked
+        last, so only articles accepted by every check are added to the
+        duplicate index and, when relevance is checked, to the corpus
+        statistics. Checks judge each article on its own, so the accepted
+        articles do not depend on the order the checks ran in.
+        
+        Errors are not counted as rejections: an article whose check raised
+        is dropped from the batch and reported as failed by map_concurrent,
+        and a batch check that raises fails the whole batch.
+        
+        Args:
+            articles: Articles to check
+            
+        Returns:
+            Articles that passed every check
+            
+        Raises:
+            Exception: Whatever a batch check raised
+        """
+        self._state_changed = True
+        survivors = articles
+        for check in self.cascade.order():
+            if not survivors:
+                break
+            errors = set()
+            if check.name in _SCANNING_CHECKS:
+                await self.scan_batch(survivors)
+            if check.batch:
+                verdicts = await check.func(survivors)
+                passed = [article for article, ok in zip(survivors, verdicts) if ok]
+            else:
+                async def apply(article: Article, func=check.func) -> Optional[Article]:
+                    try:
+                        return article if await func(article) else None
+                    except Exception:
+                        errors.add(id(article))
+                        raise
+                passed = await self.map_concurrent(
+                    apply,
+                    survivors,
+                    error_message=f"Error in {check.name} check",
+                    ordered=True
+                )
+                
+            kept = {id(article) for article in passed}
+            message = _REJECTION_MESSAGES.get(check.name, f"rejected by {check.name}")
+            for article in survivors:
+                if id(article) not in kept and id(article) not in errors:
+                    self.article_log.info("Article '%s' %s", article.title, message)
+            evaluated = len(survivors) - len(errors)
+            self.cascade.record(check.name, evaluated, evaluated - len(passed))
+            survivors = passed
+            
+        signatures = [None] * len(survivors)
+        if self.duplicate_index is not None and survivors:
+            # Signing is the costly part; the index lookups stay sequential
+            signatures = await executor.map(
+                minhash_signature,
+                [article.content or '' for article in survivors],
+                **self.duplicate_index.signature_options
+            )
+            
+        accepted = []
+        for article, signature in zip(survivors, signatures):
+            duplicate = self.find_duplicate(article, signature)
+            if duplicate is not None:
+                self.article_log.info("Article '%s' duplicates '%s'", article.title, duplicate)
+            else:
+                accepted.append(article)
+        if any(check.name == 'relevance' for check in self.cascade.checks):
+            self.update_corpus(accepted)
+        if self.duplicate_index is not None and self.duplicate_index.buffered >= self.index_flush_size:
+            await asyncio.to_thread(self.duplicate_index.flush)
+        return accepted
+
+    async def filter_article(self, article: Article) -> Optional[Article]:
+        """Run all filter checks on a single article.
+        
+        Args:
+            article: Article to check
+            
+        Returns:
+            The article if it passed every check, otherwise None
+        """
+        passed = await self.process_batch([article])
+        return passed[0] if passed else None
+
+    async def process_batch(self, articles: List[Article]) -> List[Article]:
+        """Run the cascade over a batch and release its phrase scans.
+        
+        Args:
+            articles: Articles to check
+            
+        Returns:
+            Articles that passed every check
+        """
+        try:
+            return await self.run_cascade(articles)
+        finally:
+            for article in articles:
+                self._scans.pop(id(article), None)
+                self._keyword_counts.pop(id(article), None)
+
+    async def save_state(self):
+        """Persist check and corpus statistics off the event loop, if they changed.
+        
+        Called once per run by close() rather than per batch, since the
+        streaming pipeline filters one article at a time.
+        """
+        if not self._state_changed:
+            return
+        self._state_changed = False
+        await asyncio.to_thread(self._save_state)
+
+    def _save_state(self):
+        self.cascade.save_stats()
+        self.relevance.save_state()
+
+    async def process(self, articles: List[Dict[str, Any]]) -> List[Article]:
+        """Process and filter input articles.
+        
+        Args:
+            articles: List of articles or article dictionaries to filter
+            
+        Returns:
+            List of filtered articles
+        """
+        filtered_articles = await self.process_batch([Article.of(article) for article in articles])
+        await self.save_filtered_content(filtered_articles)
+        return filtered_articles
+
+    async def close(self):
+        """Save the statistics and index entries gathered during the run, then release resources."""
+        await self.save_state()
+        if self.duplicate_index is not None:
+            await asyncio.to_thread(self.duplicate_index.flush)
+        await super().close()
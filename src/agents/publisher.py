@@ -1,84 +1,447 @@
-"""
-Publisher agent for posting content to Dev.to.
-"""
-
-import asyncio
-from typing import Any, Dict, List
-from pathlib import Path
-
-from src.agents.base import BaseAgent
-
-class PublisherAgent(BaseAgent):
-    """Agent for publishing articles to Dev.to."""
-
-    def __init__(self, config: Dict[str, Any], data_dir: Path = None):
-        """Initialize publisher agent.
-        
-        Args:
-            config: Publisher configuration dictionary
-            data_dir: Optional path to data directory
-        """
-        super().__init__(config, data_dir)
-        self.status = config.get('status', 'draft')
-        self.tags = config.get('tags', [])
-        self.api_key = config.get('api_key')
-        self.max_tags = config.get('max_tags', 4)
-
-    async def publish_to_devto(self, article: Dict[str, Any]) -> Dict[str, Any]:
-        """Publish article to Dev.to.
-        
-        Args:
-            article: Article data to publish
-            
-        Returns:
-            Publishing result data
-        """
-        # Implementation details removed for public version
-        return {}
-
-    async def validate_for_publishing(self, article: Dict[str, Any]) -> bool:
-        """Validate article before publishing.
-        
-        Args:
-            article: Article to validate
-            
-        Returns:
-            True if article is valid for publishing
-        """
-        required_fields = ['title', 'content', 'tags']
-        return all(field in article for field in required_fields)
-
-    async def save_published_info(self, publish_info: Dict[str, Any]):
-        """Save publishing information.
-        
-        Args:
-            publish_info: Publishing data to save
-        """
-        filename = publish_info['title'].lower().replace(' ', '_')
-        self.save_data(publish_info, filename, 'published')
-
-    async def process(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process articles by publishing to Medium.
-        
-        Args:
-            articles: List of articles to publish
-            
-        Returns:
-            List of publishing results
-        """
-        published_articles = []
-        
-        for article in articles:
-            try:
-                if not await self.validate_for_publishing(article):
-                    self.logger.error(f"Article '{article.get('title')}' failed validation")
-                    continue
-                
-                result = await self.publish_to_medium(article)
-                await self.save_published_info(result)
-                published_articles.append(result)
-                    
-            except Exception as e:
-                self.logger.error(f"Error publishing article: {str(e)}")
-                
-        return published_articles
\ No newline at end of file
+"""
+Publisher agent for posting content to Dev.to.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+
+from src.agents.base import BaseAgent
+from src.models import Article
+from src.utils.http import HttpResponse, SessionManager
+from src.utils.outbox import PUBLISHED, OutboxEntry, PublishOutbox, idempotency_key
+from src.utils.storage import StorageBackend
+
+# Article fields kept in the outbox, enough to publish without the pipeline
+_OUTBOX_FIELDS = ('title', 'url', 'tags', 'content')
+
+class PublishError(Exception):
+    """A failed publishing request and whether it is worth retrying."""
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+        in_doubt: bool = False
+    ):
+        """Initialize publishing error.
+        
+        Args:
+            message: Error message
+            retryable: Whether a later attempt may succeed
+            retry_after: Seconds the upstream asked to wait before retrying
+            in_doubt: Whether the request may still have created the article
+        """
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.in_doubt = in_doubt
+
+class PublisherAgent(BaseAgent):
+    """Agent for publishing articles to Dev.to.
+    
+    Articles go through a durable outbox (data/outbox.db) keyed by a hash of
+    their title and content. Publishing an article that is already in the
+    outbox returns its stored result, and a request whose outcome is unknown
+    is followed by a lookup among the user's Dev.to articles before it is
+    sent again, so a retried run never creates duplicate drafts. Outbox
+    queries run in a worker thread so they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        data_dir: Path = None,
+        session: Optional[SessionManager] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        """Initialize publisher agent.
+        
+        Args:
+            config: Publisher configuration dictionary
+            data_dir: Optional path to data directory
+            session: Optional shared HTTP session manager
+            storage: Optional shared storage backend
+        """
+        super().__init__(config, data_dir, session, storage)
+        self.status = config.get('status', 'draft')
+        self.tags = config.get('tags', [])
+        self.api_key = config.get('api_key') or self.api.get('api_key')
+        self.base_url = self.api.get('base_url', 'https://dev.to/api')
+        self.max_tags = config.get('max_tags', 4)
+        self.schedule_at = self.parse_schedule_time(config.get('schedule_time'))
+        self.retry_attempts = max(1, int(config.get('retry_attempts', 5)))
+        self.retry_backoff = config.get('retry_backoff', 1.0)
+        self.max_backoff = config.get('max_backoff', 60.0)
+        self._outbox: Optional[PublishOutbox] = None
+        # Deliveries in progress by idempotency key, shared by concurrent callers
+        self._deliveries: Dict[str, asyncio.Future] = {}
+        # Event loop time until which a 429 paused all publishing requests
+        self._paused_until = 0.0
+
+    @staticmethod
+    def parse_schedule_time(value: Any) -> Optional[float]:
+        """Convert the configured schedule time to a timestamp.
+        
+        Args:
+            value: "YYYY-MM-DD HH:MM" or ISO 8601 time, local unless it
+                carries a UTC offset; None to publish right away
+                
+        Returns:
+            Timestamp, or None when no schedule is configured
+            
+        Raises:
+            ValueError: If the value is not a valid time
+        """
+        if value is None or value == '':
+            return None
+        if isinstance(value, datetime):
+            return value.timestamp()
+        return datetime.fromisoformat(str(value)).timestamp()
+
+    @property
+    def outbox(self) -> PublishOutbox:
+        """Durable queue of articles to publish, opened on first use."""
+        if self._outbox is None:
+            self._outbox = PublishOutbox(self.data_dir / 'outbox.db')
+        return self._outbox
+
+    async def close(self):
+        """Release the HTTP session and the outbox."""
+        await super().close()
+        if self._outbox is not None:
+            await asyncio.to_thread(self._outbox.close)
+            self._outbox = None
+
+    def devto_payload(self, article: Article) -> Dict[str, Any]:
+        """Build the Dev.to API representation of an article.
+        
+        Args:
+            article: Article to publish
+            
+        Returns:
+            Request body for the articles endpoint
+        """
+        return {
+            'article': {
+                'title': article.title,
+                'body_markdown': article.content,
+                'published': self.status == 'public',
+                'tags': list(article.tags or self.tags)[:self.max_tags]
+            }
+        }
+
+    def _raise_for_status(self, response: HttpResponse):
+        """Raise a PublishError for an error response.
+        
+        Throttled and server error responses are retryable; after a server
+        error the article may have been created nonetheless.
+        
+        Args:
+            response: Dev.to API response
+        """
+        if response.ok:
+            return
+        message = f"HTTP {response.status} from Dev.to: {response.text[:200]}"
+        if response.status == 429:
+            raise PublishError(message, retryable=True, retry_after=response.retry_after)
+        if response.status >= 500:
+            raise PublishError(message, retryable=True, in_doubt=True)
+        raise PublishError(message)
+
+    def _result(self, article: Article, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the publishing result from a Dev.to article representation."""
+        return {
+            'title': article.title,
+            'id': data.get('id'),
+            'url': data.get('url'),
+            'published': data.get('published', self.status == 'public')
+        }
+
+    async def publish_to_devto(self, article: Article) -> Dict[str, Any]:
+        """Publish article to Dev.to.
+        
+        Args:
+            article: Article data to publish
+            
+        Returns:
+            Publishing result data
+            
+        Raises:
+            PublishError: If Dev.to rejects or fails the request
+        """
+        response = await self.request(
+            'POST',
+            f"{self.base_url}/articles",
+            self.api_key,
+            headers={'api-key': self.api_key},
+            json=self.devto_payload(article)
+        )
+        self._raise_for_status(response)
+        return self._result(article, response.json())
+
+    async def find_on_devto(self, article: Article) -> Optional[Dict[str, Any]]:
+        """Look for an article among the user's Dev.to articles by title.
+        
+        Only the most recent 1000 articles, drafts included, are searched.
+        
+        Args:
+            article: Article to look for
+            
+        Returns:
+            Publishing result of the matching article, or None if there is none
+            
+        Raises:
+            PublishError: If the lookup fails
+        """
+        response = await self.request(
+            'GET',
+            f"{self.base_url}/articles/me/all",
+            self.api_key,
+            headers={'api-key': self.api_key},
+            params={'per_page': 1000}
+        )
+        self._raise_for_status(response)
+        for data in response.json():
+            if data.get('title') == article.title:
+                return self._result(article, data)
+        return None
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Choose how long to wait before the next attempt.
+        
+        Without a Retry-After value the delay is drawn uniformly up to an
+        exponentially growing bound ("full jitter"), so workers failing
+        together do not retry together. The delay never exceeds
+        max_backoff; deliver() defers longer Retry-After times to a later
+        run instead of waiting.
+        
+        Args:
+            attempt: Number of attempts made so far
+            retry_after: Seconds the upstream asked to wait, if any
+            
+        Returns:
+            Seconds to wait
+        """
+        if retry_after is not None:
+            return min(self.max_backoff, retry_after + random.uniform(0, self.retry_backoff))
+        return random.uniform(0, min(self.max_backoff, self.retry_backoff * 2 ** attempt))
+
+    async def _wait_if_paused(self) -> float:
+        """Wait out a pause requested by a 429 response, unless it is too long.
+        
+        Returns:
+            Seconds left of a pause longer than max_backoff, otherwise 0
+        """
+        loop = asyncio.get_running_loop()
+        while (delay := self._paused_until - loop.time()) > 0:
+            if delay > self.max_backoff:
+                return delay
+            await asyncio.sleep(delay)
+        return 0.0
+
+    async def validate_for_publishing(self, article: Article) -> bool:
+        """Validate article before publishing.
+        
+        Args:
+            article: Article to validate
+            
+        Returns:
+            True if article is valid for publishing
+        """
+        required_fields = ['title', 'content', 'tags']
+        return all(field in article for field in required_fields)
+
+    async def save_published_info(self, publish_info: Dict[str, Any]):
+        """Save publishing information.
+        
+        Args:
+            publish_info: Publishing data to save
+        """
+        filename = publish_info['title'].lower().replace(' ', '_')
+        self.save_data(publish_info, filename, 'published')
+
+    async def deliver(self, entry: OutboxEntry) -> Dict[str, Any]:
+        """Publish an outbox entry, retrying throttled and failed requests.
+        
+        Each attempt waits for the shared rate limiter. A 429 pauses every
+        worker for its Retry-After time; server and network errors are
+        retried with jittered exponential backoff. Progress is recorded in
+        the outbox, so an interrupted run resumes where it stopped.
+        
+        An entry that runs out of attempts, or is asked to wait longer than
+        max_backoff, stays pending with a later retry time for publish_due
+        to pick up. Only entries Dev.to rejects outright are marked failed.
+        
+        Args:
+            entry: Outbox entry to publish
+            
+        Returns:
+            Publishing result
+            
+        Raises:
+            PublishError: If the request is rejected or could not be
+                completed in this run
+        """
+        article = Article.from_dict(entry.article)
+        in_doubt = entry.in_doubt
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.retry_attempts + 1):
+            sent = False
+            try:
+                paused = await self._wait_if_paused()
+                if paused:
+                    raise PublishError(
+                        f"Publishing is paused for {paused:.0f}s after a 429 response",
+                        retryable=True,
+                        retry_after=paused
+                    )
+                result = await self.find_on_devto(article) if in_doubt else None
+                if result is None:
+                    await asyncio.to_thread(self.outbox.begin_attempt, entry.key)
+                    sent = True
+                    result = await self.publish_to_devto(article)
+            except PublishError as e:
+                error = e
+            except Exception as e:
+                # Timeouts and connection errors leave the outcome unknown
+                error = PublishError(str(e), retryable=True, in_doubt=True)
+            else:
+                await asyncio.to_thread(self.outbox.mark_published, entry.key, result)
+                await self.save_published_info(result)
+                return result
+            
+            if sent:
+                in_doubt = error.in_doubt
+            if not error.retryable:
+                await asyncio.to_thread(self.outbox.record_failure, entry.key, str(error), in_doubt)
+                raise error
+            retry_after = error.retry_after or 0.0
+            if attempt < self.retry_attempts and retry_after <= self.max_backoff:
+                delay = self.retry_delay(attempt, error.retry_after)
+                if error.retry_after is not None:
+                    self._paused_until = max(self._paused_until, loop.time() + delay)
+                await asyncio.to_thread(
+                    self.outbox.record_failure, entry.key, str(error), in_doubt, time.time() + delay
+                )
+                self.logger.warning(f"Publishing '{article.title}' failed ({str(error)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            # Leave the entry pending for publish_due in a later run
+            delay = max(retry_after, self.max_backoff)
+            if error.retry_after is not None:
+                self._paused_until = max(self._paused_until, loop.time() + retry_after)
+            await asyncio.to_thread(self.outbox.record_failure, entry.key, str(error), in_doubt, time.time() + delay)
+            self.logger.warning(f"Publishing '{article.title}' failed ({str(error)}), deferred for {delay:.0f}s")
+            raise error
+
+    def enqueue(self, articles: List[Article]) -> List[str]:
+        """Add articles to the outbox in one transaction.
+        
+        Args:
+            articles: Articles to publish
+            
+        Returns:
+            Idempotency key of each article
+        """
+        keys = [idempotency_key(article.title, article.content) for article in articles]
+        self.outbox.enqueue(
+            [
+                (key, {field: article[field] for field in _OUTBOX_FIELDS if field in article})
+                for key, article in zip(keys, articles)
+            ],
+            self.schedule_at or time.time()
+        )
+        return keys
+
+    async def publish_article(self, article: Article) -> Optional[Dict[str, Any]]:
+        """Validate and publish a single article.
+        
+        Articles already published return their stored result without a
+        request. Articles scheduled for later stay in the outbox; the first
+        publish_due call after their schedule or retry time publishes them.
+        
+        Args:
+            article: Article to publish
+            
+        Returns:
+            Publishing result, or None if the article failed validation or
+            is scheduled for later
+            
+        Raises:
+            PublishError: If publishing failed or a failed attempt is
+                waiting to be retried
+        """
+        if not await self.validate_for_publishing(article):
+            self.logger.error(f"Article '{article.title}' failed validation")
+            return None
+        
+        key = idempotency_key(article.title, article.content)
+        entry = await asyncio.to_thread(self.outbox.get, key)
+        if entry is None:
+            await asyncio.to_thread(self.enqueue, [article])
+            entry = await asyncio.to_thread(self.outbox.get, key)
+        if entry.status == PUBLISHED:
+            self.article_log.info("'%s' was already published", article.title)
+            return entry.result
+        if entry.not_before > time.time():
+            retry_time = datetime.fromtimestamp(entry.not_before).isoformat(' ', 'seconds')
+            if entry.attempts:
+                # Still waiting to be retried, not published: fail the article
+                raise PublishError(f"'{article.title}' is waiting to be retried at {retry_time}", retryable=True)
+            self.article_log.info("'%s' is scheduled for %s", article.title, retry_time)
+            return None
+        
+        delivery = self._deliveries.get(key)
+        if delivery is None:
+            delivery = asyncio.ensure_future(self.deliver(entry))
+            self._deliveries[key] = delivery
+            delivery.add_done_callback(lambda _: self._deliveries.pop(key, None))
+        # A copy per caller, so each result maps back to its own article
+        return dict(await asyncio.shield(delivery))
+
+    async def publish_due(self) -> List[Dict[str, Any]]:
+        """Publish outbox entries whose schedule or retry time has come.
+        
+        Picks up articles queued by earlier runs, such as scheduled ones or
+        those left pending by an interruption.
+        
+        Returns:
+            List of publishing results
+        """
+        entries = await asyncio.to_thread(self.outbox.due)
+        if not entries:
+            return []
+        self.logger.info(f"Publishing {len(entries)} queued articles...")
+        return await self.map_concurrent(
+            self.deliver,
+            entries,
+            error_message="Error publishing queued article"
+        )
+
+    async def process(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process articles by publishing to Dev.to.
+        
+        Valid articles are queued in the outbox together, then published by
+        up to max_concurrency concurrent workers.
+        
+        Args:
+            articles: List of articles or article dictionaries to publish
+            
+        Returns:
+            List of publishing results
+        """
+        articles = [Article.of(article) for article in articles]
+        valid = [article for article in articles if await self.validate_for_publishing(article)]
+        if valid:
+            await asyncio.to_thread(self.enqueue, valid)
+        return await self.map_concurrent(
+            self.publish_article,
+            articles,
+            error_message="Error publishing article"
+        )
@@ -1,84 +1,147 @@
-"""
-Research agent for gathering additional information and sources.
-"""
-
-import asyncio
-from typing import Any, Dict, List
-from pathlib import Path
-
-from src.agents.base import BaseAgent
-
-class ResearchAgent(BaseAgent):
-    """Agent for conducting research on topics."""
-
-    def __init__(self, config: Dict[str, Any], data_dir: Path = None):
-        """Initialize research agent.
-        
-        Args:
-            config: Research configuration dictionary
-            data_dir: Optional path to data directory
-        """
-        super().__init__(config, data_dir)
-        self.depth = config.get('depth', 'medium')
-        self.max_sources = config.get('max_sources', 5)
-
-    async def research_topic(self, topic: str) -> List[Dict[str, Any]]:
-        """Research a specific topic.
-        
-        Args:
-            topic: Topic to research
-            
-        Returns:
-            List of research findings
-        """
-        # Implementation details removed for public version
-        return []
-
-    async def validate_source(self, url: str) -> bool:
-        """Validate credibility of a source.
-        
-        Args:
-            url: URL to validate
-            
-        Returns:
-            True if source is credible
-        """
-        # Implementation details removed for public version
-        return True
-
-    async def save_research_results(self, research_data: Dict[str, Any]):
-        """Save research results.
-        
-        Args:
-            research_data: Research data to save
-        """
-        filename = research_data['topic'].lower().replace(' ', '_')
-        self.save_data(research_data, filename, 'research')
-
-    async def process(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process articles by conducting research.
-        
-        Args:
-            articles: List of articles to research
-            
-        Returns:
-            List of articles with research data
-        """
-        researched_articles = []
-        
-        for article in articles:
-            try:
-                research = await self.research_topic(article['title'])
-                article['research_data'] = research
-                
-                await self.save_research_results({
-                    'topic': article['title'],
-                    'research': research
-                })
-                
-                researched_articles.append(article)
-                    
-            except Exception as e:
-                self.logger.error(f"Error researching article: {str(e)}")
-                
-        return researched_articles
\ No newline at end of file
+"""
+Research agent for gathering additional information and sources.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+
+from src.agents.base import BaseAgent
+from src.models import Article
+from src.utils.cache import TieredCache, make_cache_key
+from src.utils.http import SessionManager
+from src.utils.rate_limit import host_of
+from src.utils.text import normalize_text
+from src.utils.storage import StorageBackend
+
+class ResearchAgent(BaseAgent):
+    """Agent for conducting research on topics."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        data_dir: Path = None,
+        session: Optional[SessionManager] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        """Initialize research agent.
+        
+        Args:
+            config: Research configuration dictionary
+            data_dir: Optional path to data directory
+            session: Optional shared HTTP session manager
+            storage: Optional shared storage backend
+        """
+        super().__init__(config, data_dir, session, storage)
+        self.depth = config.get('depth', 'medium')
+        self.max_sources = config.get('max_sources', 5)
+        self.base_url = self.api.get('base_url', 'https://api.perplexity.ai')
+        self.api_key = self.api.get('token')
+        self.cache = TieredCache.from_config(
+            'research',
+            config.get('cache', {}),
+            self.data_dir / 'cache' / 'research'
+        )
+
+    def cache_key(self, topic: str) -> str:
+        """Build the research cache key for a topic.
+        
+        Args:
+            topic: Topic to research
+            
+        Returns:
+            Key covering the normalized topic, depth and source count
+        """
+        return make_cache_key(normalize_text(topic), self.depth, self.max_sources)
+
+    async def research_topic(self, topic: str) -> List[Dict[str, Any]]:
+        """Research a specific topic, answering repeat topics from the cache.
+        
+        Args:
+            topic: Topic to research
+            
+        Returns:
+            List of research findings
+        """
+        key = self.cache_key(topic)
+        research = await self.cache.get(key)
+        if research is not None:
+            return research
+            
+        research = await self.fetch_research(topic)
+        await self.cache.set(key, research)
+        return research
+
+    async def fetch_research(self, topic: str) -> List[Dict[str, Any]]:
+        """Research a specific topic with the Perplexity API.
+        
+        Args:
+            topic: Topic to research
+            
+        Returns:
+            List of research findings
+        """
+        await self.rate_limit(host_of(self.base_url), self.api_key)
+        # Implementation details removed for public version
+        return []
+
+    async def close(self):
+        """Release the HTTP session and cache connections."""
+        await super().close()
+        await self.cache.close()
+
+    async def validate_source(self, url: str) -> bool:
+        """Validate credibility of a source.
+        
+        Args:
+            url: URL to validate
+            
+        Returns:
+            True if source is credible
+        """
+        # Implementation details removed for public version
+        return True
+
+    async def save_research_results(self, research_data: Dict[str, Any], key: Optional[str] = None):
+        """Save research results.
+        
+        Args:
+            research_data: Research data to save
+            key: Record key; defaults to the topic
+        """
+        filename = key or research_data['topic'].lower().replace(' ', '_')
+        self.save_data(research_data, filename, 'research')
+
+    async def research_article(self, article: Article) -> Article:
+        """Research a single article and attach the findings.
+        
+        Args:
+            article: Article to research
+            
+        Returns:
+            Article with research data
+        """
+        research = await self.research_topic(article.title)
+        article.research_data = research
+        
+        await self.save_research_results({
+            'topic': article.title,
+            'research': research
+        }, article.storage_key())
+        
+        return article
+
+    async def process(self, articles: List[Dict[str, Any]]) -> List[Article]:
+        """Process articles by conducting research.
+        
+        Args:
+            articles: List of articles or article dictionaries to research
+            
+        Returns:
+            List of articles with research data
+        """
+        return await self.map_concurrent(
+            self.research_article,
+            [Article.of(article) for article in articles],
+            error_message="Error researching article"
+        )
\ No newline at end of file
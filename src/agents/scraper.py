@@ -1,84 +1,351 @@
-"""
-Web scraping agent for collecting content from various sources.
-"""
-
-import asyncio
-from typing import Any, Dict, List
-from pathlib import Path
-
-from src.agents.base import BaseAgent
-from src.utils.config import Config
-
-class ScraperAgent(BaseAgent):
-    """Agent for scraping content from configured sources."""
-
-    def __init__(self, config: Dict[str, Any], data_dir: Path = None):
-        """Initialize scraper agent.
-        
-        Args:
-            config: Scraper configuration dictionary
-            data_dir: Optional path to data directory
-        """
-        super().__init__(config, data_dir)
-        self.sources = config.get('sources', [])
-        self.max_articles = config.get('max_articles', 10)
-        self.retry_attempts = config.get('retry_attempts', 3)
-
-    async def scrape_devto(self) -> List[Dict[str, Any]]:
-        """Scrape articles from Dev.to.
-        
-        Returns:
-            List of article data dictionaries
-        """
-        self.logger.info("Scraping from Medium")
-        # Implementation details removed for public version
-        return []
-
-    async def scrape_devto(self) -> List[Dict[str, Any]]:
-        """Scrape articles from Dev.to.
-        
-        Returns:
-            List of article data dictionaries
-        """
-        self.logger.info("Scraping from Dev.to")
-        # Implementation details removed for public version
-        return []
-
-    async def save_raw_content(self, articles: List[Dict[str, Any]]):
-        """Save raw scraped content.
-        
-        Args:
-            articles: List of article data to save
-        """
-        for article in articles:
-            filename = article['title'].lower().replace(' ', '_')
-            self.save_data(article, filename, 'raw_content')
-
-    async def process(self, input_data: Any = None) -> List[Dict[str, Any]]:
-        """Process scraping of all configured sources.
-        
-        Args:
-            input_data: Not used for scraper
-            
-        Returns:
-            Combined list of articles from all sources
-        """
-        all_articles = []
-        
-        for source in self.sources:
-            try:
-                if source == 'medium':
-                    articles = await self.scrape_medium()
-                elif source == 'dev.to':
-                    articles = await self.scrape_devto()
-                else:
-                    self.logger.warning(f"Unknown source: {source}")
-                    continue
-                    
-                all_articles.extend(articles[:self.max_articles])
-                await self.save_raw_content(articles[:self.max_articles])
-                    
-            except Exception as e:
-                self.logger.error(f"Error scraping {source}: {str(e)}")
-                
+"""
+Web scraping agent for collecting content from various sources.
+"""
+
+import asyncio
+import codecs
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from pathlib import Path
+
+from src.agents.base import BaseAgent
+from src.agents.sources import SOURCE_ADAPTERS, SourceAdapter
+from src.models import Article
+from src.utils.browser import BrowserPool
+from src.utils.http import HttpResponse, SessionManager
+from src.utils.config import Config
+from src.utils.extract import ContentExtractor, ExtractedContent, extract_content
+from src.utils.rate_limit import host_of
+from src.utils.seen import SeenIndex, content_hash
+from src.utils.storage import StorageBackend
+
+class ScraperAgent(BaseAgent):
+    """Agent for scraping content from configured sources."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        data_dir: Path = None,
+        session: Optional[SessionManager] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        """Initialize scraper agent.
+        
+        Args:
+            config: Scraper configuration dictionary
+            data_dir: Optional path to data directory
+            session: Optional shared HTTP session manager
+            storage: Optional shared storage backend
+        """
+        super().__init__(config, data_dir, session, storage)
+        self.sources = config.get('sources', [])
+        self.max_articles = config.get('max_articles', 10)
+        self.retry_attempts = config.get('retry_attempts', 3)
+        self.retry_backoff = config.get('retry_backoff', 1.0)
+        self.timeout = config.get('timeout', 60)
+        self.incremental = config.get('incremental', True)
+        self._seen: Optional[SeenIndex] = None
+        # Validators of pages fetched in this run, stored by mark_seen or record_pages
+        self._pages: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.browser = BrowserPool(config.get('browser', {}))
+        extract_config = config.get('extract', {}) or {}
+        self.extract_max_words = extract_config.get('max_words')
+        self.extract_chunk_size = extract_config.get('chunk_size', 16384)
+
+    @property
+    def seen(self) -> Optional[SeenIndex]:
+        """Index of fetched pages and scraped articles, opened on first use.
+        
+        None when incremental scraping is disabled.
+        """
+        if self.incremental and self._seen is None:
+            self._seen = SeenIndex(self.data_dir / 'index' / 'seen.db')
+        return self._seen
+
+    async def close(self):
+        """Release the HTTP session, the browser pool and the seen index."""
+        await super().close()
+        await self.browser.close()
+        if self._seen is not None:
+            await asyncio.to_thread(self._seen.close)
+            self._seen = None
+
+    async def fetch_page(self, url: str, **kwargs) -> Optional[HttpResponse]:
+        """Fetch a page with a conditional GET when it was fetched before.
+        
+        Args:
+            url: Page URL
+            **kwargs: Extra request arguments such as headers or params
+            
+        Returns:
+            Response, or None if the page has not changed since the last fetch
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        if self.seen is not None:
+            headers.update(self.seen.conditional_headers(url))
+        response = await self.request('GET', url, headers=headers, **kwargs)
+        if response.status == 304:
+            self.article_log.debug("Not modified: %s", url)
+            return None
+        if response.ok and self.seen is not None:
+            self._pages[url] = (response.header('ETag'), response.header('Last-Modified'))
+        return response
+
+    async def extract_page(self, url: str, **kwargs) -> Optional[ExtractedContent]:
+        """Stream an article page and extract its main text as it arrives.
+        
+        The page is fetched conditionally like fetch_page. Parsing happens
+        chunk by chunk without buffering the page or building a DOM, and
+        the download stops once extract.max_words words were extracted.
+        
+        Args:
+            url: Page URL
+            **kwargs: Extra request arguments such as headers or params
+            
+        Returns:
+            Extracted content, or None if the page has not changed since the
+            last fetch
+            
+        Raises:
+            RuntimeError: If the server answers with an error status
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        if self.seen is not None:
+            headers.update(self.seen.conditional_headers(url))
+        await self.rate_limit(host_of(url))
+        
+        async with self.session.stream(
+            'GET', url, chunk_size=self.extract_chunk_size, headers=headers, **kwargs
+        ) as response:
+            if response.status == 304:
+                self.article_log.debug("Not modified: %s", url)
+                return None
+            if not response.ok:
+                raise RuntimeError(f"HTTP {response.status} fetching {url}")
+                
+            extractor = ContentExtractor(self.extract_max_words)
+            decoder = codecs.getincrementaldecoder(response.charset)(errors='replace')
+            async for chunk in response.chunks:
+                extractor.feed(decoder.decode(chunk))
+                if extractor.done:
+                    break
+            else:
+                extractor.feed(decoder.decode(b'', final=True))
+            if self.seen is not None:
+                self._pages[url] = (response.header('ETag'), response.header('Last-Modified'))
+                
+        return extractor.close()
+
+    def extract_articles(self, articles: List[Article]):
+        """Replace raw HTML bodies returned by sources with their main text.
+        
+        Args:
+            articles: Scraped articles; those with an 'html' entry get
+                'content' and 'word_count' from it
+        """
+        for article in articles:
+            html = article.get('html')
+            if html is None:
+                continue
+            extracted = extract_content(html, self.extract_max_words)
+            article.content = extracted.text
+            article.word_count = extracted.word_count
+            del article['html']
+
+    async def render_page(self, url: str) -> str:
+        """Render a JavaScript-heavy page in a pooled headless browser.
+        
+        The browser is started on the first render, so runs that only
+        scrape static sources never launch it.
+        
+        Args:
+            url: Page URL
+            
+        Returns:
+            Rendered HTML
+        """
+        await self.rate_limit(host_of(url))
+        return await self.browser.render(url)
+
+    def drop_seen(self, articles: List[Article]) -> List[Article]:
+        """Drop articles already scraped with unchanged content.
+        
+        Args:
+            articles: Scraped articles
+            
+        Returns:
+            New and changed articles
+        """
+        if self.seen is None:
+            return articles
+        fresh = [article for article in articles if not self.seen.is_unchanged(*self.seen_entry(article))]
+        if len(fresh) < len(articles):
+            self.logger.info(f"Skipped {len(articles) - len(fresh)} unchanged articles")
+        return fresh
+
+    def seen_entry(self, article: Article) -> Tuple[str, str]:
+        """Identify a scraped article and its content in the seen index.
+        
+        Args:
+            article: Article as scraped
+            
+        Returns:
+            Tuple of (article key, content hash)
+        """
+        return article.url or article.title, content_hash(article.content or '')
+
+    async def mark_seen(self, entries: Iterable[Tuple[str, str]]):
+        """Remember articles so later runs skip them while unchanged.
+        
+        Only articles that reached a terminal state, published or rejected,
+        are marked; the pipeline calls this as its journal records them.
+        The validators of their pages are stored with them, so the pages
+        are fetched conditionally from then on. The index is written in a
+        worker thread.
+        
+        Args:
+            entries: seen_entry() values of the articles
+        """
+        entries = list(entries)
+        if self.seen is None or not entries:
+            return
+        pages = [
+            (key, *self._pages.pop(key))
+            for key, _ in entries
+            if key in self._pages
+        ]
+        await asyncio.to_thread(self._store_seen, entries, pages)
+
+    def _store_seen(
+        self,
+        entries: List[Tuple[str, str]],
+        pages: List[Tuple[str, Optional[str], Optional[str]]]
+    ):
+        """Write seen articles and page validators to the index.
+        
+        Args:
+            entries: (article key, content hash) pairs
+            pages: (url, etag, last_modified) tuples
+        """
+        self.seen.record_articles(entries)
+        self.seen.record_pages(pages)
+
+    async def record_pages(self):
+        """Store the validators of the remaining pages fetched in this run.
+        
+        Called once every article of the run reached a terminal state, as
+        an unchanged listing page is skipped together with its articles.
+        """
+        if self.seen is not None and self._pages:
+            pages = [(url, *validators) for url, validators in self._pages.items()]
+            await asyncio.to_thread(self.seen.record_pages, pages)
+        self._pages.clear()
+
+    def source_settings(self, source: Union[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Resolve a configured source and its effective settings.
+        
+        Args:
+            source: Source name, or a mapping with a 'name' and overrides of
+                'timeout', 'retry_attempts' and 'max_articles'
+            
+        Returns:
+            Tuple of (source name, settings with the agent-level defaults filled in)
+        """
+        if isinstance(source, str):
+            source = {'name': source}
+        settings = {
+            'timeout': self.timeout,
+            'retry_attempts': self.retry_attempts,
+            'max_articles': self.max_articles
+        }
+        settings.update(source)
+        return settings['name'], settings
+
+    async def fetch_with_retries(self, adapter: SourceAdapter, settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch a source, retrying failures with exponential backoff.
+        
+        Args:
+            adapter: Adapter of the source
+            settings: Effective source settings
+            
+        Returns:
+            List of article data dictionaries
+            
+        Raises:
+            Exception: The last error once every attempt has failed
+        """
+        attempts = max(1, int(settings['retry_attempts']))
+        for attempt in range(attempts):
+            try:
+                return await asyncio.wait_for(adapter.fetch(), settings['timeout'])
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"timed out after {settings['timeout']}s")
+            except Exception as e:
+                error = e
+            if attempt + 1 == attempts:
+                raise error
+            delay = self.retry_backoff * 2 ** attempt
+            self.logger.warning(f"Scraping {adapter.label} failed ({str(error)}), retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+
+    async def save_raw_content(self, articles: List[Article]):
+        """Save raw scraped content.
+        
+        Args:
+            articles: List of articles to save
+        """
+        for article in articles:
+            self.save_data(article, article.storage_key(), 'raw_content')
+
+    async def scrape_source(self, source: Union[str, Dict[str, Any]]) -> List[Article]:
+        """Scrape a single configured source and save its raw content.
+        
+        Args:
+            source: Source name or mapping from configuration
+            
+        Returns:
+            List of articles from the source that are new or changed since
+            they were last scraped, capped at its max_articles
+        """
+        name, settings = self.source_settings(source)
+        adapter_class = SOURCE_ADAPTERS.get(name)
+        if adapter_class is None:
+            self.logger.warning(f"Unknown source: {name}")
+            return []
+            
+        articles = await self.fetch_with_retries(adapter_class(self, settings), settings)
+        articles = [Article.of(article) for article in articles]
+        self.extract_articles(articles)
+        articles = self.drop_seen(articles)
+        articles = articles[:settings['max_articles']]
+        for article in articles:
+            if article.source is None:
+                article.source = name
+        await self.save_raw_content(articles)
+        return articles
+
+    async def process(self, input_data: Any = None) -> List[Article]:
+        """Scrape all configured sources concurrently.
+        
+        A source that keeps failing or timing out is logged and skipped
+        without holding up the others.
+        
+        Args:
+            input_data: Not used for scraper
+            
+        Returns:
+            Combined list of articles, in the order the sources are configured
+        """
+        results = await asyncio.gather(
+            *(self.scrape_source(source) for source in self.sources),
+            return_exceptions=True
+        )
+        
+        all_articles = []
+        for source, result in zip(self.sources, results):
+            if isinstance(result, Exception):
+                name, _ = self.source_settings(source)
+                self.logger.error(f"Error scraping {name}: {str(result)}")
+            else:
+                all_articles.extend(result)
+                
         return all_articles
\ No newline at end of file
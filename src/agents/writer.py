@@ -1,100 +1,177 @@
-"""
-Writer agent for creating article content.
-"""
-
-import asyncio
-from typing import Any, Dict, List
-from pathlib import Path
-
-from src.agents.base import BaseAgent
-from src.utils.text import generate_content
-
-class WriterAgent(BaseAgent):
-    """Agent for writing article content."""
-
-    def __init__(self, config: Dict[str, Any], data_dir: Path = None):
-        """Initialize writer agent.
-        
-        Args:
-            config: Writer configuration dictionary
-            data_dir: Optional path to data directory
-        """
-        super().__init__(config, data_dir)
-        self.style = config.get('style', 'professional')
-        self.tone = config.get('tone', 'neutral')
-
-    async def generate_article(self, research_data: Dict[str, Any]) -> str:
-        """Generate article content from research data.
-        
-        Args:
-            research_data: Research data to base article on
-            
-        Returns:
-            Generated article content
-        """
-        # Implementation details removed for public version
-        return ""
-
-    async def apply_writing_style(self, content: str) -> str:
-        """Apply configured writing style to content.
-        
-        Args:
-            content: Raw content to style
-            
-        Returns:
-            Styled content
-        """
-        # Implementation details removed for public version
-        return content
-
-    async def adjust_content_tone(self, content: str) -> str:
-        """Adjust content tone according to configuration.
-        
-        Args:
-            content: Content to adjust
-            
-        Returns:
-            Tone-adjusted content
-        """
-        # Implementation details removed for public version
-        return content
-
-    async def save_draft(self, article: Dict[str, Any]):
-        """Save article draft.
-        
-        Args:
-            article: Article data to save
-        """
-        filename = article['title'].lower().replace(' ', '_')
-        self.save_data(article, filename, 'drafts')
-
-    async def process(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process articles by generating content.
-        
-        Args:
-            articles: List of articles with research data
-            
-        Returns:
-            List of articles with generated content
-        """
-        written_articles = []
-        
-        for article in articles:
-            try:
-                content = await self.generate_article(article['research_data'])
-                content = await self.apply_writing_style(content)
-                content = await self.adjust_content_tone(content)
-                
-                article['content'] = content
-                article['metadata'] = {
-                    'style': self.style,
-                    'tone': self.tone
-                }
-                
-                await self.save_draft(article)
-                written_articles.append(article)
-                    
-            except Exception as e:
-                self.logger.error(f"Error writing article: {str(e)}")
-                
-        return written_articles
\ No newline at end of file
+"""
+Writer agent for creating article content.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pathlib import Path
+
+from src.agents.base import BaseAgent
+from src.models import Article
+from src.utils.http import SessionManager
+from src.utils.cache import ContentStore
+from src.utils.text import generate_content, generation_key
+from src.utils.storage import StorageBackend
+from src.utils.tracing import tracer
+
+class WriterAgent(BaseAgent):
+    """Agent for writing article content."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        data_dir: Path = None,
+        session: Optional[SessionManager] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        """Initialize writer agent.
+        
+        Args:
+            config: Writer configuration dictionary
+            data_dir: Optional path to data directory
+            session: Optional shared HTTP session manager
+            storage: Optional shared storage backend
+        """
+        super().__init__(config, data_dir, session, storage)
+        self.style = config.get('style', 'professional')
+        self.tone = config.get('tone', 'neutral')
+        self.model_params = config.get('model', {}) or {}
+        self.generation_cache = ContentStore.from_config(
+            config.get('cache', {}),
+            self.data_dir / 'cache' / 'generation'
+        )
+
+    async def cached_generation(
+        self,
+        step: str,
+        payload: Any,
+        generate: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Run a generation step unless its output is already stored.
+        
+        Outputs are addressed by the step, its input and every setting that
+        affects the result, so reruns and crash recovery reuse them.
+        
+        Args:
+            step: Name of the generation step
+            payload: Input of the step
+            generate: Coroutine function producing the output on a miss
+            
+        Returns:
+            Generated content
+        """
+        with tracer.span(step):
+            if self.generation_cache is None:
+                return await generate()
+                
+            key = generation_key(
+                {'step': step, 'input': payload},
+                style=self.style,
+                tone=self.tone,
+                # Nested, since model parameters may be named like the settings above
+                model=self.model_params
+            )
+            with tracer.span('cache_get'):
+                content = await asyncio.to_thread(self.generation_cache.get, key)
+            if content is not None:
+                return content
+                
+            with tracer.span('generate'):
+                content = await generate()
+            with tracer.span('cache_put'):
+                await asyncio.to_thread(self.generation_cache.put, key, content)
+            return content
+
+    async def generate_article(self, research_data: Dict[str, Any]) -> str:
+        """Generate article content from research data.
+        
+        Args:
+            research_data: Research data to base article on
+            
+        Returns:
+            Generated article content
+        """
+        async def generate() -> str:
+            # Implementation details removed for public version
+            return ""
+            
+        return await self.cached_generation('generate_article', research_data, generate)
+
+    async def apply_writing_style(self, content: str) -> str:
+        """Apply configured writing style to content.
+        
+        Args:
+            content: Raw content to style
+            
+        Returns:
+            Styled content
+        """
+        async def generate() -> str:
+            # Implementation details removed for public version
+            return content
+            
+        return await self.cached_generation('apply_writing_style', content, generate)
+
+    async def adjust_content_tone(self, content: str) -> str:
+        """Adjust content tone according to configuration.
+        
+        Args:
+            content: Content to adjust
+            
+        Returns:
+            Tone-adjusted content
+        """
+        async def generate() -> str:
+            # Implementation details removed for public version
+            return content
+            
+        return await self.cached_generation('adjust_content_tone', content, generate)
+
+    async def save_draft(self, article: Article):
+        """Save article draft and release its research data, which publishing does not need.
+        
+        Args:
+            article: Article data to save
+        """
+        filename = article.storage_key()
+        with tracer.span('save_draft'):
+            self.save_data(article, filename, 'drafts')
+            article.offload(self.storage, 'drafts', filename, ['research_data'])
+
+    async def write_article(self, article: Article) -> Article:
+        """Generate, style and save content for a single article.
+        
+        Args:
+            article: Article with research data
+            
+        Returns:
+            Article with generated content
+        """
+        content = await self.generate_article(article.research_data)
+        content = await self.apply_writing_style(content)
+        content = await self.adjust_content_tone(content)
+        
+        article.content = content
+        article.word_count = len(content.split())
+        article.metadata = {
+            'style': self.style,
+            'tone': self.tone
+        }
+        
+        await self.save_draft(article)
+        return article
+
+    async def process(self, articles: List[Dict[str, Any]]) -> List[Article]:
+        """Process articles by generating content.
+        
+        Args:
+            articles: List of articles or article dictionaries with research data
+            
+        Returns:
+            List of articles with generated content
+        """
+        return await self.map_concurrent(
+            self.write_article,
+            [Article.of(article) for article in articles],
+            error_message="Error writing article"
+        )
\ No newline at end of file
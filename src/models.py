@@ -0,0 +1,253 @@
+"""
+Typed records passed between agents.
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.seen import content_hash
+from src.utils.storage import StorageBackend
+
+class _LazyField:
+    """Slot-backed attribute reloaded from storage after being offloaded."""
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+        self.slot = f"_{name}"
+
+    def __get__(self, article: Optional['Article'], owner: type) -> Any:
+        if article is None:
+            return self
+        if self.name in article._offloaded:
+            article._reload()
+        return getattr(article, self.slot)
+
+    def __set__(self, article: 'Article', value: Any):
+        if self.name in article._offloaded:
+            article._offloaded = tuple(field for field in article._offloaded if field != self.name)
+        setattr(article, self.slot, value)
+
+class Article(MutableMapping):
+    """An article on its way from scraping to publishing.
+
+    Known fields live in slots and are read as attributes. Fields not set
+    are None and are absent from the mapping view, so code written against
+    article dictionaries keeps working; keys outside the known fields are
+    kept in a separate dictionary created on first use.
+
+    The heavy content and research_data fields can be offloaded once the
+    article is saved, releasing their memory until they are next read.
+    """
+
+    # Fields in the order they are serialized
+    FIELDS = (
+        'title',
+        'url',
+        'source',
+        'tags',
+        'word_count',
+        'relevance_score',
+        'metadata',
+        'content',
+        'research_data'
+    )
+    HEAVY_FIELDS = ('content', 'research_data')
+
+    __slots__ = (
+        'title',
+        'url',
+        'source',
+        'tags',
+        'word_count',
+        'relevance_score',
+        'metadata',
+        '_content',
+        '_research_data',
+        '_extra',
+        '_offloaded',
+        '_store'
+    )
+
+    content = _LazyField()
+    research_data = _LazyField()
+
+    def __init__(
+        self,
+        title: str,
+        url: Optional[str] = None,
+        source: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        word_count: Optional[int] = None,
+        relevance_score: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        content: Optional[str] = None,
+        research_data: Any = None,
+        **extra: Any
+    ):
+        """Initialize article.
+
+        Args:
+            title: Article title, which identifies it across stages
+            url: Source URL
+            source: Name of the source it was scraped from
+            tags: Article tags
+            word_count: Word count of the scraped content, set when it was
+                extracted from HTML
+            relevance_score: Keyword relevance score set by the filter
+            metadata: Writing metadata set by the writer
+            content: Article body
+            research_data: Research findings set by the researcher
+            **extra: Any other fields
+        """
+        self.title = title
+        self.url = url
+        self.source = source
+        self.tags = tags
+        self.word_count = word_count
+        self.relevance_score = relevance_score
+        self.metadata = metadata
+        self._content = content
+        self._research_data = research_data
+        self._extra: Optional[Dict[str, Any]] = extra or None
+        self._offloaded: Tuple[str, ...] = ()
+        self._store: Optional[Tuple[StorageBackend, str, str]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Article':
+        """Build an article from a dictionary without copying its values.
+
+        Args:
+            data: Article dictionary, such as a scraped or stored record
+
+        Returns:
+            Article referencing the dictionary's values
+        """
+        return cls(**data)
+
+    @classmethod
+    def of(cls, data: Any) -> 'Article':
+        """Get an article, converting a dictionary if needed.
+
+        Args:
+            data: Article or article dictionary
+
+        Returns:
+            The article itself, or one built from the dictionary
+        """
+        return data if isinstance(data, cls) else cls.from_dict(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the article to a dictionary of its set fields.
+
+        Values are referenced, not copied. Offloaded fields are read back
+        from storage for the result without being kept in memory.
+
+        Returns:
+            Article dictionary
+        """
+        record = self._stored_record() if self._offloaded else {}
+        data = {}
+        for field in self.FIELDS:
+            if field in self._offloaded:
+                value = record.get(field)
+            else:
+                value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def storage_key(self) -> str:
+        """Name the article's saved records.
+
+        The title keeps the name readable; a hash of the URL, or of the
+        content for articles without one, keeps equal titles apart.
+
+        Returns:
+            Record key for the article
+        """
+        slug = self.title.lower().replace(' ', '_')
+        return f"{slug}_{content_hash(self.url or self.content or '')[:12]}"
+
+    def offload(self, storage: StorageBackend, subdir: str, key: str, fields: Iterable[str] = HEAVY_FIELDS):
+        """Release heavy fields that are saved in storage.
+
+        The fields are read back from the record the next time they are
+        accessed. Assigning a field replaces it without reading it back.
+
+        Args:
+            storage: Storage backend holding the saved article
+            subdir: Record group the article was saved under
+            key: Record key the article was saved under
+            fields: Fields to release
+        """
+        if self._offloaded:
+            self._reload()
+        offloaded = []
+        for field in fields:
+            slot = f"_{field}"
+            if getattr(self, slot) is not None:
+                setattr(self, slot, None)
+                offloaded.append(field)
+        if offloaded:
+            self._offloaded = tuple(offloaded)
+            self._store = (storage, subdir, key)
+
+    def _stored_record(self) -> Dict[str, Any]:
+        storage, subdir, key = self._store
+        return storage.load(subdir, key)
+
+    def _reload(self):
+        """Read every offloaded field back from storage."""
+        record = self._stored_record()
+        for field in self._offloaded:
+            setattr(self, f"_{field}", record.get(field))
+        self._offloaded = ()
+        self._store = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self.FIELDS:
+            if key not in self:
+                raise KeyError(key)
+            setattr(self, key, None)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.FIELDS:
+            return key in self._offloaded or getattr(self, key) is not None
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.FIELDS:
+            if field in self:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.title!r}, url={self.url!r})"
@@ -1,98 +1,585 @@
-"""
-Main orchestrator for the Dev.to Automation Pipeline.
-"""
-
-import asyncio
-import logging
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-from src.agents.scraper import ScraperAgent
-from src.agents.filter import FilterAgent
-from src.agents.research import ResearchAgent
-from src.agents.writer import WriterAgent
-from src.agents.publisher import PublisherAgent
-from src.utils.config import Config
-from src.utils.monitoring import setup_logging
-
-class Pipeline:
-    """Main pipeline orchestrator."""
-
-    def __init__(self, config_path: str = "config/config.yaml", data_dir: Optional[Path] = None):
-        """Initialize pipeline.
-        
-        Args:
-            config_path: Path to configuration file
-            data_dir: Optional path to data directory
-        """
-        self.config = Config(config_path)
-        self.data_dir = data_dir or Path("data")
-        setup_logging(self.config.get('log_level', 'INFO'))
-        self.logger = logging.getLogger(__name__)
-        
-        # Initialize agents
-        self.scraper = ScraperAgent(
-            self.config.get_agent_config('scraper'),
-            self.data_dir
-        )
-        self.filter = FilterAgent(
-            self.config.get_agent_config('filter'),
-            self.data_dir
-        )
-        self.researcher = ResearchAgent(
-            self.config.get_agent_config('research'),
-            self.data_dir
-        )
-        self.writer = WriterAgent(
-            self.config.get_agent_config('writer'),
-            self.data_dir
-        )
-        self.publisher = PublisherAgent(
-            self.config.get_agent_config('publisher'),
-            self.data_dir
-        )
-
-    async def run(self):
-        """Execute complete pipeline."""
-        try:
-            # Step 1: Scrape content
-            self.logger.info("Starting content scraping...")
-            articles = await self.scraper.execute(None)
-            
-            if not articles:
-                self.logger.warning("No articles found")
-                return
-                
-            # Step 2: Filter content
-            self.logger.info("Filtering content...")
-            filtered_articles = await self.filter.execute(articles)
-            
-            if not filtered_articles:
-                self.logger.warning("No articles passed filtering")
-                return
-                
-            # Step 3: Research
-            self.logger.info("Conducting research...")
-            researched_articles = await self.researcher.execute(filtered_articles)
-            
-            # Step 4: Write articles
-            self.logger.info("Writing articles...")
-            written_articles = await self.writer.execute(researched_articles)
-            
-            # Step 5: Publish
-            self.logger.info("Publishing articles...")
-            published_articles = await self.publisher.execute(written_articles)
-            
-            self.logger.info(f"Pipeline completed. Published {len(published_articles)} articles.")
-            
-        except Exception as e:
-            self.logger.error(f"Pipeline error: {str(e)}")
-            raise
-
-async def main():
-    """Main entry point."""
-    pipeline = Pipeline()
-    await pipeline.run()
-
-if __name__ == "__main__":
+"""
+Main orchestrator for the Dev.to Automation Pipeline.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agents.base import BaseAgent, ItemOutcomes, track_items
+from src.agents.scraper import ScraperAgent
+from src.agents.filter import FilterAgent
+from src.agents.research import ResearchAgent
+from src.agents.writer import WriterAgent
+from src.agents.publisher import PublisherAgent
+from src.models import Article
+from src.utils.config import Config
+from src.utils.executor import configure_executor, executor
+from src.utils.http import SessionManager
+from src.utils.journal import DONE, DROPPED, StageJournal
+from src.utils.monitoring import QUEUE_DEPTH, MetricsServer, setup_logging
+from src.utils.rate_limit import configure_rate_limits
+from src.utils.storage import create_storage
+from src.utils.tracing import configure_tracing, tracer
+
+# Progress messages logged when a batch enters each stage
+_STAGE_MESSAGES = {
+    'filter': "Filtering content...",
+    'research': "Conducting research...",
+    'writer': "Writing articles...",
+    'publisher': "Publishing articles..."
+}
+
+# Sentinel telling a stage worker that its upstream stage has finished
+_STAGE_DONE = object()
+
+# Record groups holding the articles each stage saved, from which resumed
+# articles are rebuilt; the researcher saves only its findings
+_STAGE_RECORDS = {
+    'scrape': 'raw_content',
+    'filter': 'filtered_content',
+    'research': 'filtered_content',
+    'writer': 'drafts'
+}
+
+class Pipeline:
+    """Main pipeline orchestrator."""
+
+    def __init__(self, config_path: str = "config/config.yaml", data_dir: Optional[Path] = None):
+        """Initialize pipeline.
+        
+        Args:
+            config_path: Path to configuration file
+            data_dir: Optional path to data directory
+        """
+        self.config = Config(config_path)
+        self.data_dir = data_dir or Path("data")
+        monitoring_config = self.config.get('monitoring', {}) or {}
+        setup_logging(
+            monitoring_config.get('log_level', self.config.get('log_level', 'INFO')),
+            monitoring_config.get('logging')
+        )
+        self.logger = logging.getLogger(__name__)
+        
+        configure_rate_limits(self.config.get('api', {}))
+        configure_executor(self.config.get('executor', {}))
+        configure_tracing(monitoring_config.get('tracing'))
+        self.session = SessionManager(self.config.get('http', {}))
+        self.storage = create_storage(self.config.get('storage', {}), self.data_dir)
+        
+        # Initialize agents
+        self.scraper = ScraperAgent(
+            self.config.get_agent_config('scraper'),
+            self.data_dir,
+            self.session,
+            self.storage
+        )
+        self.filter = FilterAgent(
+            self.config.get_agent_config('filter'),
+            self.data_dir,
+            self.session,
+            self.storage
+        )
+        self.researcher = ResearchAgent(
+            self._agent_config('research', 'perplexity'),
+            self.data_dir,
+            self.session,
+            self.storage
+        )
+        self.writer = WriterAgent(
+            self.config.get_agent_config('writer'),
+            self.data_dir,
+            self.session,
+            self.storage
+        )
+        self.publisher = PublisherAgent(
+            self._agent_config('publisher', 'devto'),
+            self.data_dir,
+            self.session,
+            self.storage
+        )
+        
+        # Downstream stages in execution order; the scraper feeds the first one
+        self.stages = [
+            ('filter', self.filter),
+            ('research', self.researcher),
+            ('writer', self.writer),
+            ('publisher', self.publisher)
+        ]
+        
+        pipeline_config = self.config.get('pipeline', {}) or {}
+        self.mode = pipeline_config.get('mode', 'batch')
+        self.queue_size = pipeline_config.get('queue_size', 10)
+        self.stage_concurrency = pipeline_config.get('concurrency', {}) or {}
+        self.resume = pipeline_config.get('resume', True)
+        self.max_resume_attempts = pipeline_config.get('max_resume_attempts', 3)
+        self.journal_batch_size = pipeline_config.get('journal_batch_size', 50)
+        self.journal: Optional[StageJournal] = None
+        # Seen index entries of the run's scraped articles by position, marked once they are terminal
+        self._seen_entries: Dict[int, Tuple[str, str]] = {}
+        
+        prometheus_config = monitoring_config.get('prometheus', {}) or {}
+        self.metrics_server: Optional[MetricsServer] = None
+        if prometheus_config.get('enabled', False):
+            self.metrics_server = MetricsServer(
+                prometheus_config.get('port', 9090),
+                prometheus_config.get('host', '0.0.0.0')
+            )
+
+    def _agent_config(self, agent_name: str, api_name: str) -> Dict[str, Any]:
+        """Build an agent's configuration including its upstream API settings.
+        
+        Args:
+            agent_name: Name of agent
+            api_name: Name of the API under the 'api' section
+            
+        Returns:
+            Agent configuration dictionary with an 'api' entry
+        """
+        agent_config = dict(self.config.get_agent_config(agent_name))
+        agent_config.setdefault('api', self.config.get_api_config(api_name))
+        return agent_config
+
+    async def run(self, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Execute complete pipeline.
+        
+        Args:
+            mode: Execution mode, either 'batch' or 'streaming'. Defaults to
+                the 'pipeline.mode' configuration value.
+                
+        Returns:
+            List of publishing results
+        """
+        mode = mode or self.mode
+        if mode not in ('batch', 'streaming'):
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+        try:
+            if self.metrics_server is not None:
+                await self.metrics_server.start()
+            # Articles queued by earlier runs whose schedule or retry time has come
+            await self.publisher.publish_due()
+            if mode == 'streaming':
+                return await self.run_streaming()
+            return await self.run_batch()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Shut down agents and shared resources such as pooled HTTP connections."""
+        for agent in [self.scraper] + [agent for _, agent in self.stages]:
+            await agent.close()
+        await self.session.close()
+        try:
+            # Raises if saved records could not be written; clean up the rest first
+            await asyncio.to_thread(self.storage.close)
+            if self.journal is not None:
+                # Only once the records its entries refer to are written
+                await asyncio.to_thread(self.journal.flush)
+        finally:
+            # Joins the process workers, so it runs off the event loop
+            await asyncio.to_thread(executor.shutdown)
+            await asyncio.to_thread(tracer.save)
+            if self.metrics_server is not None:
+                await self.metrics_server.stop()
+            if self.journal is not None:
+                await asyncio.to_thread(self.journal.close)
+                self.journal = None
+
+    async def run_batch(self) -> List[Dict[str, Any]]:
+        """Execute the pipeline one stage at a time over the whole batch.
+        
+        Returns:
+            List of publishing results
+        """
+        try:
+            run_id, pending = await self._start_run()
+            if pending is None:
+                # Step 1: Scrape content
+                self.logger.info("Starting content scraping...")
+                articles = await self.scraper.execute(None)
+                entries = list(enumerate(articles))
+                self._record(run_id, 'scrape', entries)
+                await self._flush_journal()
+                
+                if not articles:
+                    self.logger.warning("No articles found")
+                    await self._end_run(run_id, 0)
+                    return []
+                pending = {}
+            else:
+                self.logger.info("Resuming interrupted run...")
+                entries = []
+                
+            # Steps 2-5: Filter, research, write and publish
+            previous = 'scrape'
+            failures = 0
+            for name, agent in self.stages:
+                entries = sorted(entries + pending.get(previous, []), key=lambda entry: entry[0])
+                previous = name
+                if not entries:
+                    continue
+                    
+                self.logger.info(_STAGE_MESSAGES[name])
+                with track_items() as outcomes:
+                    outputs = await agent.execute([article for _, article in entries])
+                failures += len(outcomes.failed)
+                entries = await self._advance(run_id, name, entries, outputs, outcomes)
+                await self._flush_journal()
+                
+                if name == 'filter' and not entries:
+                    self.logger.warning("No articles passed filtering")
+                    
+            published_articles = await self._published(run_id, entries)
+            await self._end_run(run_id, failures)
+            self.logger.info(f"Pipeline completed. Published {len(published_articles)} articles.")
+            return published_articles
+            
+        except Exception as e:
+            self.logger.error(f"Pipeline error: {str(e)}")
+            raise
+
+    async def run_streaming(self) -> List[Dict[str, Any]]:
+        """Execute the pipeline with stages overlapped through bounded queues.
+        
+        Each article moves to the next stage as soon as the current stage is
+        done with it. Every stage runs 'pipeline.concurrency.<stage>' workers
+        and the bounded queues between stages apply backpressure to the
+        stages upstream of a slow one.
+        
+        Returns:
+            List of publishing results, in the same order as the batch path
+        """
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Tuple[int, Dict[str, Any]]] = []
+        failures = 0
+        run_id, pending = await self._start_run()
+        resumed = pending is not None
+        pending = pending or {}
+        
+        async def put(position: int, entry: Tuple[int, Article]):
+            await queues[position].put(entry)
+            QUEUE_DEPTH.labels(stage=self.stages[position][0]).set(queues[position].qsize())
+        
+        async def produce_source(source: Any, offset: int) -> int:
+            try:
+                # Traced like a batch scrape, which runs under the scraper's execute span
+                with tracer.span(self.scraper.__class__.__name__):
+                    articles = await self.scraper.scrape_source(source)
+            except Exception as e:
+                name, _ = self.scraper.source_settings(source)
+                self.logger.error(f"Error scraping {name}: {str(e)}")
+                return 0
+            for index, article in enumerate(articles, offset):
+                self._record(run_id, 'scrape', [(index, article)])
+                await self._flush_journal(self.journal_batch_size)
+                await put(0, (index, article))
+            return len(articles)
+        
+        async def produce():
+            # Sources are scraped concurrently; each gets a block of positions
+            # as large as its article cap so results keep the configured order
+            producers = []
+            offset = 0
+            for source in self.scraper.sources:
+                producers.append(produce_source(source, offset))
+                offset += self.scraper.source_settings(source)[1]['max_articles']
+            queued = sum(await asyncio.gather(*producers))
+            self.logger.info(f"Scraping completed. Queued {queued} articles.")
+        
+        async def inject(position: int):
+            # Resumed articles re-enter after the last stage they finished
+            previous = self.stages[position - 1][0] if position else 'scrape'
+            for entry in pending.get(previous, []):
+                await put(position, entry)
+        
+        async def work(position: int, name: str, agent: BaseAgent):
+            nonlocal failures
+            inbox = queues[position]
+            is_last = position == len(self.stages) - 1
+            while True:
+                item = await inbox.get()
+                if item is _STAGE_DONE:
+                    return
+                QUEUE_DEPTH.labels(stage=name).set(inbox.qsize())
+                _, article = item
+                try:
+                    with track_items() as outcomes:
+                        outputs = await agent.execute([article])
+                except Exception as e:
+                    self.logger.error(f"Error in {name} stage: {str(e)}")
+                    failures += 1
+                    continue
+                failures += len(outcomes.failed)
+                advanced = await self._advance(run_id, name, [item], outputs, outcomes)
+                await self._flush_journal(self.journal_batch_size)
+                for index, output in advanced:
+                    if is_last:
+                        results.append((index, output))
+                    else:
+                        await put(position + 1, (index, output))
+        
+        injectors = [asyncio.ensure_future(inject(position)) for position in range(len(self.stages))]
+        
+        async def run_stage(position: int, name: str, agent: BaseAgent):
+            workers = max(1, int(self.stage_concurrency.get(name, 1)))
+            await asyncio.gather(*(
+                work(position, name, agent) for _ in range(workers)
+            ))
+            if position + 1 < len(self.stages):
+                await injectors[position + 1]
+                await self._close_stage(queues[position + 1], self.stages[position + 1][0])
+        
+        async def run_producer():
+            try:
+                if resumed:
+                    self.logger.info("Resuming interrupted run...")
+                else:
+                    await produce()
+                await injectors[0]
+            finally:
+                await self._close_stage(queues[0], self.stages[0][0])
+        
+        self.logger.info("Starting streaming pipeline...")
+        try:
+            await asyncio.gather(
+                run_producer(),
+                *(run_stage(position, name, agent)
+                  for position, (name, agent) in enumerate(self.stages))
+            )
+        except Exception as e:
+            for injector in injectors:
+                injector.cancel()
+            self.logger.error(f"Pipeline error: {str(e)}")
+            raise
+            
+        await self._flush_journal()
+        published_articles = await self._published(run_id, results)
+        await self._end_run(run_id, failures)
+        self.logger.info(f"Pipeline completed. Published {len(published_articles)} articles.")
+        return published_articles
+
+    async def _start_run(self) -> Tuple[Optional[int], Optional[Dict[str, List[Tuple[int, Article]]]]]:
+        """Start a journaled run or resume the interrupted one.
+        
+        Returns:
+            Tuple of (run id, articles pending per last finished stage).
+            Pending is None for a fresh run, which has to scrape first.
+        """
+        self._seen_entries.clear()
+        if not self.resume:
+            return None, None
+        if self.journal is None:
+            self.journal = await asyncio.to_thread(
+                StageJournal, self.data_dir / 'journal.db', self.max_resume_attempts
+            )
+        run_id, resumed = await asyncio.to_thread(self.journal.start_run)
+        if not resumed:
+            return run_id, None
+        return run_id, await asyncio.to_thread(self._resume_entries, run_id)
+
+    def _resume_entries(self, run_id: int) -> Dict[str, List[Tuple[int, Article]]]:
+        """Rebuild an interrupted run's unfinished articles from their saved records.
+        
+        Runs in a worker thread, since it reads the journal and storage.
+        
+        Args:
+            run_id: Run id
+            
+        Returns:
+            Articles pending per last finished stage
+        """
+        for position, key in self.journal.completed(run_id, 'scrape'):
+            self._seen_entries[position] = self.scraper.seen_entry(self._load_article('scrape', key))
+        return {
+            stage: [(position, self._load_article(stage, key)) for position, key in entries]
+            for stage, entries in self.journal.pending(run_id, self.stages[-1][0]).items()
+        }
+
+    def _load_article(self, stage: str, key: str) -> Article:
+        """Load an article as a stage left it.
+        
+        Args:
+            stage: Name of the stage the article finished
+            key: Key of the record the stage saved it under
+            
+        Returns:
+            Article read from storage
+        """
+        article = Article.from_dict(self.storage.load(_STAGE_RECORDS[stage], key))
+        if stage == 'research':
+            article.research_data = self.storage.load('research', key)['research']
+        return article
+
+    def _record(
+        self,
+        run_id: Optional[int],
+        stage: str,
+        entries: List[Tuple[int, Any]],
+        status: str = DONE
+    ):
+        """Journal stage completions when resuming is enabled.
+        
+        An article is journaled with the key of the record its stage saved
+        rather than its content; the final stage's results are journaled
+        as they are. Entries are buffered until _flush_journal writes them.
+        
+        Args:
+            run_id: Run id
+            stage: Name of the finished stage
+            entries: (position, article) pairs
+            status: DONE or DROPPED
+        """
+        if stage == 'scrape':
+            for position, article in entries:
+                self._seen_entries[position] = self.scraper.seen_entry(Article.of(article))
+        if self.journal is None:
+            return
+        final = stage == self.stages[-1][0]
+        self.journal.record(run_id, stage, [
+            (
+                position,
+                article['title'],
+                None if status != DONE else article if final else Article.of(article).storage_key()
+            )
+            for position, article in entries
+        ], status)
+
+    async def _flush_journal(self, batch_size: int = 0):
+        """Write buffered journal entries off the event loop.
+        
+        Saved records are written first, so the journal never refers to a
+        record that is missing after a crash.
+        
+        Args:
+            batch_size: Number of entries that may stay buffered
+        """
+        if self.journal is None or self.journal.buffered <= batch_size:
+            return
+        await asyncio.to_thread(self._write_journal)
+
+    def _write_journal(self):
+        self.storage.flush()
+        self.journal.flush()
+
+    async def _advance(
+        self,
+        run_id: Optional[int],
+        stage: str,
+        entries: List[Tuple[int, Article]],
+        outputs: List[Any],
+        outcomes: ItemOutcomes
+    ) -> List[Tuple[int, Any]]:
+        """Journal a stage's outputs and drops and carry positions forward.
+        
+        Outputs are matched to the articles they came from by identity, so
+        articles sharing a title keep their own positions; outputs built
+        from scratch fall back to the first unmatched article with their
+        title. Articles whose processing failed are not journaled for the
+        stage and are retried from their previous stage when the run is
+        resumed. Dropped articles, and those the final stage published,
+        are marked seen for incremental scraping.
+        
+        Args:
+            run_id: Run id
+            stage: Name of the finished stage
+            entries: (position, article) pairs given to the stage
+            outputs: Articles or results the stage returned
+            outcomes: Per-item outcomes collected while the stage ran
+            
+        Returns:
+            (position, output) pairs for the next stage
+        """
+        positions = {id(article): position for position, article in entries}
+        matched = [positions.get(id(outcomes.source_of(output))) for output in outputs]
+        unmatched = [entry for entry in entries if entry[0] not in set(matched)]
+        for index, output in enumerate(outputs):
+            if matched[index] is None:
+                entry = next(
+                    (entry for entry in unmatched if entry[1].get('title') == output.get('title')),
+                    None
+                )
+                if entry is not None:
+                    unmatched.remove(entry)
+                matched[index] = entry[0] if entry is not None else -1
+        advanced = list(zip(matched, outputs))
+        kept = set(matched)
+        failed = {id(article) for article in outcomes.failed}
+        dropped = [
+            entry for entry in entries
+            if entry[0] not in kept and id(entry[1]) not in failed
+        ]
+        self._record(run_id, stage, advanced)
+        self._record(run_id, stage, dropped, DROPPED)
+        terminal = [position for position, _ in dropped]
+        if stage == self.stages[-1][0]:
+            terminal.extend(position for position, _ in advanced)
+        await self.scraper.mark_seen([
+            self._seen_entries.pop(position)
+            for position in terminal
+            if position in self._seen_entries
+        ])
+        return advanced
+
+    async def _published(
+        self,
+        run_id: Optional[int],
+        entries: List[Tuple[int, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Collect a run's publishing results in scrape order.
+        
+        Args:
+            run_id: Run id
+            entries: (position, result) pairs published in this attempt
+            
+        Returns:
+            List of publishing results, including those published before an
+            interruption
+        """
+        if self.journal is not None:
+            entries = await asyncio.to_thread(self.journal.published, run_id, self.stages[-1][0])
+        return [article for _, article in sorted(entries, key=lambda entry: entry[0])]
+
+    async def _end_run(self, run_id: Optional[int], failures: int):
+        """Finish a run, or leave it open when articles failed.
+        
+        Args:
+            run_id: Run id
+            failures: Number of articles that failed in some stage
+        """
+        if failures and self.journal is not None:
+            # Failed articles stay pending in the journal for the next run
+            self.logger.warning(f"{failures} articles failed; run left open to resume")
+        else:
+            if not failures:
+                # Every scraped article is terminal, so unchanged pages may be skipped
+                await self.scraper.record_pages()
+            await self._finish_run(run_id)
+
+    async def _finish_run(self, run_id: Optional[int]):
+        """Mark a journaled run as finished.
+        
+        Args:
+            run_id: Run id
+        """
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.finish_run, run_id)
+
+    async def _close_stage(self, queue: asyncio.Queue, name: str):
+        """Signal every worker of a stage that no more items will arrive.
+        
+        Args:
+            queue: Inbox queue of the stage
+            name: Stage name
+        """
+        workers = max(1, int(self.stage_concurrency.get(name, 1)))
+        for _ in range(workers):
+            await queue.put(_STAGE_DONE)
+
+async def main():
+    """Main entry point."""
+    pipeline = Pipeline()
+    await pipeline.run()
+
+if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,22 +1,32 @@
-"""Utilities package initialization."""
-
-from src.utils.config import Config
-from src.utils.monitoring import monitor, setup_logging
-from src.utils.text import (
-    calculate_relevance,
-    clean_text,
-    extract_keywords,
-    generate_content,
-    check_plagiarism
-)
-
-__all__ = [
-    'Config',
-    'monitor',
-    'setup_logging',
-    'calculate_relevance',
-    'clean_text',
-    'extract_keywords',
-    'generate_content',
-    'check_plagiarism'
+"""Utilities package initialization."""
+
+from src.utils.config import Config
+from src.utils.monitoring import monitor, setup_logging
+from src.utils.text import (
+    KeywordRelevance,
+    calculate_relevance,
+    calculate_relevance_batch,
+    clean_text,
+    extract_keywords,
+    generate_content,
+    generation_key,
+    normalize_stream,
+    normalize_text,
+    check_plagiarism
+)
+
+__all__ = [
+    'Config',
+    'monitor',
+    'setup_logging',
+    'KeywordRelevance',
+    'calculate_relevance',
+    'calculate_relevance_batch',
+    'clean_text',
+    'extract_keywords',
+    'generate_content',
+    'generation_key',
+    'normalize_stream',
+    'normalize_text',
+    'check_plagiarism'
 ]
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Pool of warm headless-browser contexts for JavaScript-rendered pages.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+# Resource types not needed to read an article's text
+DEFAULT_BLOCKED_RESOURCES = ['image', 'font', 'media']
+
+class _PooledContext:
+    """A browser context with the page it serves and its usage count."""
+
+    __slots__ = ('context', 'page', 'uses')
+
+    def __init__(self, context: Any, page: Any):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+class BrowserPool:
+    """Fixed set of warm Playwright browser contexts shared by scraping tasks.
+
+    The browser is launched once and every context keeps a single page that
+    is reused for each render, so a render costs a navigation instead of a
+    browser start. Requests for blocked resource types are aborted, and a
+    context is replaced after serving a set number of pages to bound the
+    memory a long-lived page accumulates. A context that cannot be replaced
+    leaves the pool one smaller; once none is left the browser restarts.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize browser pool.
+
+        Args:
+            config: Browser configuration dictionary
+        """
+        config = config or {}
+        self.size = max(1, int(config.get('pool_size', 2)))
+        self.pages_per_context = max(1, int(config.get('pages_per_context', 50)))
+        self.blocked_resources = set(config.get('blocked_resources', DEFAULT_BLOCKED_RESOURCES))
+        self.browser_type = config.get('browser', 'chromium')
+        self.headless = config.get('headless', True)
+        self.timeout = config.get('timeout', 30)
+        self.wait_until = config.get('wait_until', 'domcontentloaded')
+        self.user_agent = config.get('user_agent')
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._playwright = None
+        self._browser = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._contexts: List[_PooledContext] = []
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        """Whether the browser is running."""
+        return self._browser is not None
+
+    async def start(self):
+        """Launch the browser and warm up the contexts, once."""
+        async with self._start_lock:
+            if self.started:
+                return
+            if async_playwright is None:
+                raise ImportError("playwright is required to render JavaScript pages")
+            self._playwright = await async_playwright().start()
+            launcher = getattr(self._playwright, self.browser_type)
+            try:
+                self._browser = await launcher.launch(headless=self.headless)
+            except BaseException:
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(await self._new_context())
+            self.logger.info(f"Started {self.size} {self.browser_type} contexts")
+
+    async def _new_context(self) -> _PooledContext:
+        """Create a context that aborts blocked resource requests.
+
+        Returns:
+            Pooled context with an open page
+        """
+        options = {'user_agent': self.user_agent} if self.user_agent else {}
+        context = await self._browser.new_context(**options)
+        try:
+            context.set_default_timeout(self.timeout * 1000)
+            if self.blocked_resources:
+                await context.route('**/*', self._route)
+            pooled = _PooledContext(context, await context.new_page())
+        except BaseException:
+            await context.close()
+            raise
+        self._contexts.append(pooled)
+        return pooled
+
+    async def _route(self, route: Any):
+        if route.request.resource_type in self.blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _recycle(self, pooled: _PooledContext) -> _PooledContext:
+        """Replace a context that served its page quota or broke.
+
+        Args:
+            pooled: Context to retire
+
+        Returns:
+            Fresh pooled context
+        """
+        self._contexts.remove(pooled)
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser context: {str(e)}")
+        return await self._new_context()
+
+    async def _release(self, pooled: _PooledContext, healthy: bool):
+        """Return a borrowed context to the pool, replacing it if needed.
+
+        Args:
+            pooled: Context the page was borrowed from
+            healthy: Whether the page was used without an error
+        """
+        if healthy and pooled.uses < self.pages_per_context:
+            self._idle.put_nowait(pooled)
+            return
+        try:
+            self._idle.put_nowait(await self._recycle(pooled))
+        except Exception as e:
+            self.logger.warning(
+                f"Could not replace browser context, {len(self._contexts)} left: {str(e)}"
+            )
+            if not self._contexts:
+                await self._restart()
+
+    async def _restart(self):
+        """Relaunch the browser after the pool lost every context.
+
+        Tasks already waiting for a page get the new contexts, or an error
+        if the browser cannot be started.
+        """
+        idle = self._idle
+        await self.close()
+        try:
+            await self.start()
+        except BaseException:
+            idle.put_nowait(None)
+            raise
+        while not self._idle.empty():
+            idle.put_nowait(self._idle.get_nowait())
+        self._idle = idle
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Borrow a warm page, waiting while every context is busy.
+
+        Yields:
+            Playwright page
+
+        Raises:
+            RuntimeError: If the browser was lost and could not be restarted
+        """
+        await self.start()
+        idle = self._idle
+        pooled = await idle.get()
+        if pooled is None:
+            # Pass the failed restart on to the next waiting task
+            idle.put_nowait(None)
+            raise RuntimeError("Browser pool lost its browser and could not restart it")
+        healthy = False
+        try:
+            yield pooled.page
+            healthy = True
+        finally:
+            pooled.uses += 1
+            await self._release(pooled, healthy)
+
+    async def render(self, url: str) -> str:
+        """Load a page, run its scripts and return the resulting HTML.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Rendered HTML
+        """
+        async with self.page() as page:
+            await page.goto(url, wait_until=self.wait_until)
+            return await page.content()
+
+    async def close(self):
+        """Close every context, the browser and Playwright."""
+        async with self._start_lock:
+            for pooled in self._contexts:
+                try:
+                    await pooled.context.close()
+                except Exception as e:
+                    self.logger.warning(f"Error closing browser context: {str(e)}")
+            self._contexts = []
+            self._idle = None
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
@@ -0,0 +1,533 @@
+"""
+Tiered result caching with TTLs and size-bounded eviction.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.monitoring import record_cache_lookup
+from src.utils.serialization import dumps, loads
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts.
+
+    Args:
+        *parts: Values identifying the cached result
+
+    Returns:
+        Hex digest of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class LRUCache:
+    """In-memory cache evicting the least recently used entry."""
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = None):
+        """Initialize in-memory cache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl: Seconds an entry stays valid, None for no expiry
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = await self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        """Get a cached value with its expiry time.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (expiry time or None, value) pair, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            expires_at: Expiry time; defaults to now plus the cache's TTL
+        """
+        if expires_at is None:
+            expires_at = time.time() + self.ttl if self.ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def close(self):
+        """Release resources held by the cache."""
+
+class DiskCache:
+    """On-disk cache storing one JSON file per entry."""
+
+    def __init__(self, directory: Path, max_entries: int = 10000, ttl: Optional[float] = None):
+        """Initialize on-disk cache.
+
+        Args:
+            directory: Directory holding the cache files
+            max_entries: Maximum number of files kept
+            ttl: Seconds an entry stays valid, None for no expiry
+        """
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._index: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, float]:
+        """Scan the cache directory once for entries and access times.
+
+        Returns:
+            Mapping of key to last access time
+        """
+        if self._index is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._index = {
+                entry.name[:-5]: entry.stat().st_mtime
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith('.json')
+            }
+        return self._index
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        with self._lock:
+            return self._read_locked(key)
+
+    def _write(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock:
+            self._write_locked(key, value, expires_at)
+
+    def _read_locked(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        index = self._load_index()
+        if key not in index:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = loads(f.read())
+        except (OSError, ValueError):
+            index.pop(key, None)
+            return None
+        if entry.get('expires_at') is not None and entry['expires_at'] < time.time():
+            self._remove(key)
+            return None
+        now = time.time()
+        os.utime(path, (now, now))
+        index[key] = now
+        return entry.get('expires_at'), entry['value']
+
+    def _write_locked(self, key: str, value: Any, expires_at: Optional[float]):
+        index = self._load_index()
+        if expires_at is None:
+            expires_at = time.time() + self.ttl if self.ttl else None
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps({'expires_at': expires_at, 'value': value}))
+        os.replace(tmp_path, path)
+        index[key] = time.time()
+
+        if len(index) > self.max_entries:
+            overflow = len(index) - self.max_entries
+            for stale_key, _ in sorted(index.items(), key=lambda item: item[1])[:overflow]:
+                self._remove(stale_key)
+
+    def _remove(self, key: str):
+        self._load_index().pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = await self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        """Get a cached value with its expiry time.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (expiry time or None, value) pair, or None if missing or expired
+        """
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """Store a value, evicting the least recently used files if full.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+            expires_at: Expiry time; defaults to now plus the cache's TTL
+        """
+        await asyncio.to_thread(self._write, key, value, expires_at)
+
+    async def close(self):
+        """Release resources held by the cache."""
+
+class RedisCache:
+    """Redis-backed cache shared between hosts and runs."""
+
+    def __init__(self, url: str, ttl: Optional[float] = None, prefix: str = 'cache'):
+        """Initialize Redis cache.
+
+        Args:
+            url: Redis connection URL
+            ttl: Seconds an entry stays valid, None for no expiry
+            prefix: Key prefix separating caches in a shared database
+        """
+        if aioredis is None:
+            raise ImportError("redis is required for the Redis cache tier")
+        self.client = aioredis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing, expired or Redis is unavailable
+        """
+        entry = await self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        """Get a cached value with its expiry time.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (expiry time or None, value) pair, or None if missing, expired or
+            Redis is unavailable
+        """
+        name = f"{self.prefix}:{key}"
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                payload, remaining_ms = await pipe.get(name).pttl(name).execute()
+        except Exception as e:
+            self.logger.warning(f"Redis cache read failed: {str(e)}")
+            return None
+        if payload is None:
+            return None
+        # PTTL is -1 for keys without expiry
+        expires_at = time.time() + remaining_ms / 1000 if remaining_ms >= 0 else None
+        return expires_at, loads(payload)
+
+    async def set(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """Store a value; Redis evicts according to its own memory policy.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+            expires_at: Expiry time; defaults to now plus the cache's TTL
+        """
+        if expires_at is not None:
+            expiry = {'px': max(1, int((expires_at - time.time()) * 1000))}
+        else:
+            expiry = {'ex': int(self.ttl) if self.ttl else None}
+        try:
+            await self.client.set(f"{self.prefix}:{key}", dumps(value), **expiry)
+        except Exception as e:
+            self.logger.warning(f"Redis cache write failed: {str(e)}")
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        await self.client.aclose()
+
+class TieredCache:
+    """Cache reading through fast tiers first and back-filling them on hits.
+
+    Back-filled entries keep the expiry time of the tier they were found
+    in, so a value never outlives the TTL it was first stored with.
+    """
+
+    def __init__(self, name: str, tiers: List[Any]):
+        """Initialize tiered cache.
+
+        Args:
+            name: Cache name used in metrics
+            tiers: Cache tiers ordered from fastest to slowest
+        """
+        self.name = name
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any], directory: Path) -> 'TieredCache':
+        """Build a cache from configuration.
+
+        Args:
+            name: Cache name used in metrics and Redis keys
+            config: Cache configuration dictionary
+            directory: Directory for the on-disk tier
+
+        Returns:
+            Configured cache; without tiers when caching is disabled
+        """
+        config = config or {}
+        if not config.get('enabled', True):
+            return cls(name, [])
+
+        ttl = config.get('ttl')
+        tiers = [LRUCache(config.get('max_entries', 1000), ttl)]
+        if config.get('disk', True):
+            tiers.append(DiskCache(directory, config.get('disk_max_entries', 10000), ttl))
+        if config.get('redis_url'):
+            tiers.append(RedisCache(config['redis_url'], ttl, prefix=name))
+        return cls(name, tiers)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value from the fastest tier holding it.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        for position, tier in enumerate(self.tiers):
+            entry = await tier.get_entry(key)
+            if entry is not None:
+                expires_at, value = entry
+                for faster_tier in self.tiers[:position]:
+                    await faster_tier.set(key, value, expires_at)
+                self.hits += 1
+                record_cache_lookup(self.name, True, self.hit_ratio)
+                return value
+
+        self.misses += 1
+        record_cache_lookup(self.name, False, self.hit_ratio)
+        return None
+
+    async def set(self, key: str, value: Any):
+        """Store a value in every tier.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+        """
+        for tier in self.tiers:
+            await tier.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache counters.
+
+        Returns:
+            Dictionary with hits, misses and hit ratio
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hit_ratio}
+
+    async def close(self):
+        """Release resources held by the cache tiers."""
+        for tier in self.tiers:
+            await tier.close()
+
+class ContentStore:
+    """Content-addressed store for generated text with a total size limit.
+
+    Entries are zlib-compressed files sharded by the first two characters of
+    their key. When the store grows beyond max_bytes, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024, compression_level: int = 6):
+        """Initialize content store.
+
+        Args:
+            directory: Directory holding the store
+            max_bytes: Maximum total size of stored entries
+            compression_level: zlib compression level
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self._index: Optional[Dict[str, List[float]]] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], directory: Path) -> Optional['ContentStore']:
+        """Build a content store from configuration.
+
+        Args:
+            config: Cache configuration dictionary
+            directory: Directory holding the store
+
+        Returns:
+            Configured store, or None when caching is disabled
+        """
+        config = config or {}
+        if not config.get('enabled', True):
+            return None
+        return cls(
+            directory,
+            config.get('max_bytes', 256 * 1024 * 1024),
+            config.get('compression_level', 6)
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered from the store."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _load_index(self) -> Dict[str, List[float]]:
+        """Scan the store once for entry sizes and access times.
+
+        Returns:
+            Mapping of key to [size, last access time]
+        """
+        if self._index is None:
+            self._index = {}
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path in self.directory.glob('*/*.z'):
+                stat = path.stat()
+                self._index[path.stem] = [stat.st_size, stat.st_mtime]
+            self._size = sum(size for size, _ in self._index.values())
+        return self._index
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.z"
+
+    def get(self, key: str) -> Optional[str]:
+        """Get stored content.
+
+        Args:
+            key: Content key
+
+        Returns:
+            Stored text, or None if missing
+        """
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                record_cache_lookup('generation', False, self.hit_ratio)
+                return None
+            path = self._path(key)
+            try:
+                content = zlib.decompress(path.read_bytes()).decode('utf-8')
+            except (OSError, zlib.error):
+                self._remove(key)
+                self.misses += 1
+                record_cache_lookup('generation', False, self.hit_ratio)
+                return None
+            now = time.time()
+            os.utime(path, (now, now))
+            index[key][1] = now
+            self.hits += 1
+            record_cache_lookup('generation', True, self.hit_ratio)
+            return content
+
+    def put(self, key: str, content: str):
+        """Store content, evicting least recently used entries if over size.
+
+        Args:
+            key: Content key
+            content: Text to store
+        """
+        payload = zlib.compress(content.encode('utf-8'), self.compression_level)
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+
+            if key in index:
+                self._size -= index[key][0]
+            index[key] = [len(payload), time.time()]
+            self._size += len(payload)
+
+            if self._size > self.max_bytes:
+                for stale_key, _ in sorted(index.items(), key=lambda item: item[1][1]):
+                    if self._size <= self.max_bytes or stale_key == key:
+                        break
+                    self._remove(stale_key)
+
+    def _remove(self, key: str):
+        entry = self._load_index().pop(key, None)
+        if entry is not None:
+            self._size -= entry[0]
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Report store counters.
+
+        Returns:
+            Dictionary with hits, misses, entries and total bytes
+        """
+        with self._lock:
+            entries = len(self._load_index())
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': self._size}
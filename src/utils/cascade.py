@@ -0,0 +1,125 @@
+"""
+Cost-ordered check cascades that adapt to observed rejection rates.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.serialization import dumps, loads
+
+class CascadeCheck:
+    """A check in a cascade with its estimated cost and observed selectivity."""
+
+    __slots__ = ('name', 'cost', 'batch', 'func', 'evaluated', 'rejected')
+
+    def __init__(self, name: str, cost: float, func: Callable[..., Any], batch: bool = False):
+        """Initialize check.
+
+        Args:
+            name: Check name
+            cost: Estimated relative cost of running the check on one item
+            func: Coroutine function; per-item checks take an item and return
+                whether it passes, batch checks take a list of items and
+                return one verdict per item
+            batch: Whether the check runs once over all remaining items
+        """
+        self.name = name
+        self.cost = cost
+        self.func = func
+        self.batch = batch
+        self.evaluated = 0
+        self.rejected = 0
+
+    @property
+    def rejection_rate(self) -> float:
+        """Share of items the check rejects, smoothed towards 1/2 while unobserved."""
+        return (self.rejected + 1) / (self.evaluated + 2)
+
+    @property
+    def rank(self) -> float:
+        """Expected cost per rejection; lower runs earlier."""
+        return self.cost / self.rejection_rate
+
+class FilterCascade:
+    """Ordered set of checks that each item must pass.
+
+    Checks run from the lowest expected cost per rejection: the configured
+    cost divided by the rejection rate observed so far. Cheap, selective
+    checks therefore run first and reject most items before an expensive
+    check sees them. Counts persist across runs when a path is given.
+    """
+
+    def __init__(self, checks: List[CascadeCheck], adaptive: bool = True, stats_path: Optional[Path] = None):
+        """Initialize cascade.
+
+        Args:
+            checks: Checks in configured order
+            adaptive: Order by observed selectivity; when False, order by cost only
+            stats_path: Optional JSON file persisting per-check counts
+        """
+        self.checks = checks
+        self.adaptive = adaptive
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._load_stats()
+
+    def _load_stats(self):
+        if self.stats_path is None or not self.stats_path.exists():
+            return
+        try:
+            stats = loads(self.stats_path.read_bytes())
+        except ValueError:
+            self.logger.warning(f"Ignoring unreadable cascade statistics in {self.stats_path}")
+            return
+        for check in self.checks:
+            counts = stats.get(check.name, {})
+            check.evaluated = counts.get('evaluated', 0)
+            check.rejected = counts.get('rejected', 0)
+
+    def save_stats(self):
+        """Persist per-check counts."""
+        if self.stats_path is None:
+            return
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats_path.write_bytes(dumps(self.stats(), indent=True))
+
+    def order(self) -> List[CascadeCheck]:
+        """Get the checks in execution order.
+
+        Returns:
+            Checks sorted by rank, or by cost when not adaptive
+        """
+        key = (lambda check: check.rank) if self.adaptive else (lambda check: check.cost)
+        return sorted(self.checks, key=key)
+
+    def record(self, name: str, evaluated: int, rejected: int):
+        """Count the outcome of running a check.
+
+        Args:
+            name: Check name
+            evaluated: Items the check ran on
+            rejected: Items it rejected
+        """
+        for check in self.checks:
+            if check.name == name:
+                check.evaluated += evaluated
+                check.rejected += rejected
+                return
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Report per-check counts and rejection rates.
+
+        Returns:
+            Mapping of check name to its counts, rejection rate and rank
+        """
+        return {
+            check.name: {
+                'cost': check.cost,
+                'evaluated': check.evaluated,
+                'rejected': check.rejected,
+                'rejection_rate': round(check.rejection_rate, 4),
+                'rank': round(check.rank, 4)
+            }
+            for check in self.checks
+        }
@@ -0,0 +1,276 @@
+"""
+Near-duplicate detection with MinHash signatures and locality-sensitive hashing.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.utils.text import clean_text
+
+# Hash permutations are computed modulo a Mersenne prime larger than any shingle hash
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def shingle(text: str, size: int = 5) -> Set[str]:
+    """Split text into overlapping word n-grams.
+
+    Args:
+        text: Text to shingle
+        size: Number of words per shingle
+
+    Returns:
+        Set of shingles; short texts yield a single shingle
+    """
+    words = clean_text(text).split()
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _shingle_hash(value: str) -> int:
+    """Hash a shingle to 32 bits, stable across processes.
+
+    Args:
+        value: Shingle text
+
+    Returns:
+        32-bit hash
+    """
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=4).digest(), 'little')
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Choose LSH bands and rows whose S-curve is steepest at the threshold.
+
+    Args:
+        threshold: Jaccard similarity above which items count as duplicates
+        num_perm: Number of MinHash permutations
+
+    Returns:
+        Tuple of (bands, rows per band)
+    """
+    best = (num_perm, 1)
+    best_distance = float('inf')
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        # Similarity at which a pair becomes a candidate with probability 1/2
+        distance = abs((1 / bands) ** (1 / rows) - threshold)
+        if distance < best_distance:
+            best, best_distance = (bands, rows), distance
+    return best
+
+def minhash_signature(text: str, permutations: List[Tuple[int, int]], shingle_size: int = 5) -> List[int]:
+    """Compute the MinHash signature of a text.
+
+    A top-level function so it can run in a worker process.
+
+    Args:
+        text: Text to sign
+        permutations: (a, b) parameters of the hash permutations
+        shingle_size: Number of words per shingle
+
+    Returns:
+        List of one minimum hash value per permutation
+    """
+    hashes = [_shingle_hash(value) for value in shingle(text, shingle_size)]
+    if not hashes:
+        return [_MAX_HASH] * len(permutations)
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in permutations
+    ]
+
+class MinHashIndex:
+    """Persistent MinHash LSH index answering near-duplicate queries.
+
+    Signatures of added items are buffered and appended to a JSON-lines
+    file by flush(), which callers run off the event loop; the LSH buckets
+    are rebuilt from the file on start-up, so the index survives restarts
+    and updates incrementally.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """Initialize index.
+
+        Args:
+            path: Optional JSON-lines file persisting the index
+            threshold: Estimated Jaccard similarity above which items are duplicates
+            num_perm: Number of MinHash permutations
+            shingle_size: Number of words per shingle
+            seed: Seed of the permutation parameters
+        """
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        generator = random.Random(seed)
+        self._permutations = [
+            (generator.randrange(1, _MERSENNE_PRIME), generator.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._signatures: Dict[str, List[int]] = {}
+        self._buckets: List[Dict[int, List[str]]] = [{} for _ in range(self.bands)]
+        self._loaded = False
+        self._unsaved: List[Dict[str, Any]] = []
+        # Guards the buffered entries; the file has a lock of its own so
+        # add() never waits for a write in progress
+        self._unsaved_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+    @property
+    def _header(self) -> Dict[str, int]:
+        return {'num_perm': self.num_perm, 'shingle_size': self.shingle_size, 'seed': self.seed}
+
+    def _load(self):
+        """Rebuild the buckets from the persisted signatures once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+
+        with open(self.path) as f:
+            header = json.loads(f.readline() or '{}')
+            if header != self._header:
+                self.logger.warning(f"Index parameters changed, discarding {self.path}")
+                self.path.unlink()
+                return
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partially written last line after a crash
+                    continue
+                self._insert(entry['key'], entry['signature'])
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._signatures)
+
+    @property
+    def signature_options(self) -> Dict[str, object]:
+        """Keyword arguments of minhash_signature matching this index."""
+        return {'permutations': self._permutations, 'shingle_size': self.shingle_size}
+
+    def signature(self, text: str) -> List[int]:
+        """Compute the MinHash signature of a text.
+
+        Args:
+            text: Text to sign
+
+        Returns:
+            List of num_perm minimum hash values
+        """
+        return minhash_signature(text, **self.signature_options)
+
+    def _band_keys(self, signature: List[int]) -> List[int]:
+        return [
+            hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, key: str, signature: List[int]):
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, signature: List[int]) -> List[Tuple[str, float]]:
+        """Find indexed items similar to a signature.
+
+        Only items sharing at least one LSH bucket are compared, so a query
+        touches a small candidate set instead of the whole index.
+
+        Args:
+            signature: MinHash signature to look up
+
+        Returns:
+            List of (key, estimated similarity) at or above the threshold,
+            most similar first
+        """
+        self._load()
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            other = self._signatures[key]
+            similarity = sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def add(self, key: str, signature: List[int]):
+        """Add an item to the index; it is persisted by the next flush().
+
+        Args:
+            key: Item identifier
+            signature: MinHash signature of the item
+        """
+        self._load()
+        if key in self._signatures:
+            return
+        self._insert(key, signature)
+        if self.path is not None:
+            with self._unsaved_lock:
+                self._unsaved.append({'key': key, 'signature': signature})
+
+    @property
+    def buffered(self) -> int:
+        """Number of added items waiting for flush()."""
+        return len(self._unsaved)
+
+    def flush(self):
+        """Append the items added since the last flush to the index file.
+
+        Items that fail to write are kept for the next flush.
+        """
+        with self._file_lock:
+            with self._unsaved_lock:
+                entries, self._unsaved = self._unsaved, []
+            if not entries:
+                return
+            lines = [json.dumps(entry) + '\n' for entry in entries]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if not self.path.exists():
+                    lines.insert(0, json.dumps(self._header) + '\n')
+                with open(self.path, 'a') as f:
+                    f.write(''.join(lines))
+            except Exception:
+                with self._unsaved_lock:
+                    self._unsaved[:0] = entries
+                raise
+
+    def check_and_add(self, key: str, text: str, signature: Optional[List[int]] = None) -> Optional[str]:
+        """Check a text for near-duplicates and index it if it is new.
+
+        Args:
+            key: Item identifier
+            text: Item text
+            signature: Optional precomputed signature of the text
+
+        Returns:
+            Key of the most similar indexed item, or None if the text is new
+        """
+        if signature is None:
+            signature = self.signature(text)
+        for match_key, _ in self.query(signature):
+            if match_key != key:
+                return match_key
+        self.add(key, signature)
+        return None
@@ -0,0 +1,168 @@
+"""
+Worker pools for CPU-bound text analysis called from async agents.
+"""
+
+import asyncio
+import functools
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+def _run_chunk(func: Callable[..., Any], chunk: List[Any], kwargs: Dict[str, Any]) -> List[Any]:
+    """Apply a function to every item of a chunk inside a worker.
+
+    Args:
+        func: Function to apply
+        chunk: Items to process
+        kwargs: Extra keyword arguments for every call
+
+    Returns:
+        Results in chunk order
+    """
+    return [func(item, **kwargs) for item in chunk]
+
+class AnalysisExecutor:
+    """Process and thread pools that keep CPU-bound work off the event loop.
+
+    Pure-Python analysis holds the GIL and goes to a process pool, in
+    chunks so each worker round trip pickles many items at once. Work that
+    releases the GIL, such as numpy, zlib or hashing, goes to a thread pool
+    without pickling. Inputs below process_threshold items, where a
+    process round trip would cost more than it saves, run as a single
+    thread-pool task, so no call ever blocks the event loop. Pools start on
+    first use.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize executor.
+
+        Args:
+            config: Executor configuration dictionary
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self.configure(config)
+
+    def configure(self, config: Optional[Dict[str, Any]] = None):
+        """Apply configuration, replacing any running pools.
+
+        Args:
+            config: Executor configuration dictionary
+        """
+        config = config or {}
+        self.shutdown()
+        # CPUs this process may run on, which can be fewer than the machine has
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        workers = config.get('workers')
+        self.workers = cpus if workers is None else int(workers)
+        self.threads = int(config.get('threads') or min(32, cpus + 4))
+        self.chunk_size = config.get('chunk_size')
+        self.process_threshold = int(config.get('process_threshold', 8))
+        self.start_method = config.get('start_method', 'spawn')
+
+    def _pool(self, kind: str) -> Optional[Executor]:
+        """Get a pool, starting it if needed.
+
+        Args:
+            kind: 'process' or 'thread'
+
+        Returns:
+            The pool; the thread pool when process workers are disabled
+        """
+        if kind == 'thread':
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.threads, thread_name_prefix='analysis')
+            return self._threads
+        if kind != 'process':
+            raise ValueError(f"Unknown executor kind: {kind}")
+        if self.workers <= 0:
+            return self._pool('thread')
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+        return self._processes
+
+    async def map(
+        self,
+        func: Callable[..., Any],
+        items: Iterable[Any],
+        kind: str = 'process',
+        chunk_size: Optional[int] = None,
+        **kwargs: Any
+    ) -> List[Any]:
+        """Apply a function to many items in a worker pool.
+
+        Args:
+            func: Picklable top-level function taking one item
+            items: Items to process
+            kind: 'process' for GIL-bound work, 'thread' for work releasing the GIL
+            chunk_size: Items per worker task; defaults to spreading the
+                items over four tasks per worker
+            **kwargs: Extra keyword arguments for every call
+
+        Returns:
+            Results in item order
+        """
+        items = list(items)
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        if len(items) < self.process_threshold:
+            return await loop.run_in_executor(self._pool('thread'), _run_chunk, func, items, kwargs)
+
+        pool = self._pool(kind)
+        workers = self.workers if pool is self._processes else self.threads
+        size = chunk_size or self.chunk_size or math.ceil(len(items) / (workers * 4))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _run_chunk, func, chunk, kwargs)
+                for chunk in chunks
+            ))
+        except BrokenProcessPool:
+            self.logger.warning("Process pool broke; running batch in the thread pool")
+            self._processes = None
+            return await loop.run_in_executor(self._pool('thread'), _run_chunk, func, items, kwargs)
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def run(self, func: Callable[..., Any], *args: Any, kind: str = 'thread', **kwargs: Any) -> Any:
+        """Run a single call in a worker pool.
+
+        Args:
+            func: Function to call; must be picklable for the process pool
+            *args: Positional arguments
+            kind: 'thread' or 'process'
+            **kwargs: Keyword arguments
+
+        Returns:
+            Result of the call
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(kind), functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """Stop the pools; they restart on next use."""
+        if self._processes is not None:
+            self._processes.shutdown(cancel_futures=True)
+            self._processes = None
+        if self._threads is not None:
+            self._threads.shutdown(cancel_futures=True)
+            self._threads = None
+
+def configure_executor(config: Optional[Dict[str, Any]]):
+    """Configure the shared executor from the 'executor' config section.
+
+    Args:
+        config: Executor configuration dictionary
+    """
+    executor.configure(config)
+
+# Shared by every agent so the process count stays bounded
+executor = AnalysisExecutor()
@@ -0,0 +1,201 @@
+"""
+Incremental extraction of article text from streamed HTML.
+"""
+
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Elements whose text is boilerplate or not text at all
+SKIP_TAGS = frozenset({
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'select'
+})
+
+# Elements holding the main article body when a page marks it up
+MAIN_TAGS = frozenset({'article', 'main'})
+
+# Elements that start a new line of text
+BLOCK_TAGS = frozenset({
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'section', 'blockquote', 'pre', 'table', 'tr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'figcaption', 'dd', 'dt'
+})
+
+class ExtractedContent(NamedTuple):
+    """Main text of a page."""
+
+    text: str
+    word_count: int
+    # False when extraction stopped at the word limit before the page ended
+    complete: bool
+
+class _BodyCollector:
+    """Parser target collecting the text of a page's main body.
+
+    Text inside <article> or <main> is collected separately from the rest
+    of the page; the former wins when the page has one. Text inside
+    boilerplate elements is dropped.
+    """
+
+    def __init__(self, max_words: Optional[int] = None):
+        self.max_words = max_words
+        self.main: List[str] = []
+        self.fallback: List[str] = []
+        self.main_words = 0
+        self.fallback_words = 0
+        self.skip_depth = 0
+        self.main_depth = 0
+
+    @property
+    def word_count(self) -> int:
+        """Words collected so far in the text that would be returned."""
+        return self.main_words if self.main_words else self.fallback_words
+
+    @property
+    def done(self) -> bool:
+        """Whether enough words were collected to stop reading.
+
+        Only main-body words count: text outside <article> or <main> is
+        returned only when the page has no main body, which is not known
+        before the page ends, and long navigation or headers must not stop
+        extraction before the main body is reached.
+        """
+        return self.max_words is not None and self.main_words >= self.max_words
+
+    def start(self, tag: str, attrib: Optional[Dict[str, str]] = None):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in MAIN_TAGS:
+            self.main_depth += 1
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def end(self, tag: str):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in MAIN_TAGS:
+            self.main_depth = max(0, self.main_depth - 1)
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def data(self, data: str):
+        if self.skip_depth or not data.strip():
+            if data and not self.skip_depth:
+                self._append(' ', 0)
+            return
+        self._append(data, len(data.split()))
+
+    def comment(self, text: str):
+        pass
+
+    def close(self) -> ExtractedContent:
+        parts = self.main if self.main_words else self.fallback
+        lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+        text = '\n'.join(line for line in lines if line)
+        return ExtractedContent(text, len(text.split()), not self.done)
+
+    def _append(self, text: str, words: int):
+        if self.main_depth:
+            self.main.append(text)
+            self.main_words += words
+        self.fallback.append(text)
+        self.fallback_words += words
+
+    def _break(self):
+        self._append('\n', 0)
+
+class _StdlibParser(HTMLParser):
+    """html.parser front end feeding a collector."""
+
+    def __init__(self, collector: _BodyCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.collector.start(tag)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.collector.start(tag)
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag: str):
+        self.collector.end(tag)
+
+    def handle_data(self, data: str):
+        self.collector.data(data)
+
+class ContentExtractor:
+    """Extracts an article's main text from HTML fed in chunks.
+
+    Chunks are parsed as they arrive without building a document tree,
+    using lxml's parser when it is installed and html.parser otherwise.
+    With max_words set, done turns true as soon as that many words were
+    collected inside <article> or <main>, so callers can stop downloading
+    the rest of the page.
+    """
+
+    def __init__(self, max_words: Optional[int] = None):
+        """Initialize extractor.
+
+        Args:
+            max_words: Optional number of words after which extraction stops
+        """
+        self.collector = _BodyCollector(max_words)
+        if etree is not None:
+            self._parser = etree.HTMLParser(target=self.collector, recover=True)
+        else:
+            self._parser = _StdlibParser(self.collector)
+        self._result: Optional[ExtractedContent] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the word limit was reached."""
+        return self.collector.done
+
+    @property
+    def word_count(self) -> int:
+        """Words extracted so far."""
+        return self.collector.word_count
+
+    def feed(self, chunk: str):
+        """Parse the next chunk of the page.
+
+        Args:
+            chunk: Decoded HTML chunk
+        """
+        if not self.done:
+            self._parser.feed(chunk)
+
+    def close(self) -> ExtractedContent:
+        """Finish parsing and return the extracted text.
+
+        Returns:
+            Extracted content with its word count
+        """
+        if self._result is None:
+            if etree is not None:
+                self._result = self._parser.close()
+            else:
+                self._parser.close()
+                self._result = self.collector.close()
+        return self._result
+
+def extract_content(html: str, max_words: Optional[int] = None) -> ExtractedContent:
+    """Extract the main text of a complete HTML document.
+
+    Args:
+        html: HTML document
+        max_words: Optional number of words after which extraction stops
+
+    Returns:
+        Extracted content with its word count
+    """
+    extractor = ContentExtractor(max_words)
+    extractor.feed(html)
+    return extractor.close()
@@ -0,0 +1,302 @@
+"""
+Pooled, keep-alive HTTP session management shared by all agents.
+"""
+
+import codecs
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from src.utils.monitoring import HTTP_REQUEST_COUNT, record_pool_usage
+from src.utils.rate_limit import host_of
+
+try:
+    import httpx
+    import h2  # noqa: F401  # required by httpx for HTTP/2
+except ImportError:
+    httpx = None
+
+class HttpResponse:
+    """Fully read HTTP response, independent of the transport used."""
+
+    __slots__ = ('status', 'headers', 'body', 'url')
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, url: str):
+        """Initialize response.
+
+        Args:
+            status: HTTP status code
+            headers: Response headers
+            body: Raw response body
+            url: Final request URL
+        """
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        """Whether the status code is below 400."""
+        return self.status < 400
+
+    def header(self, name: str) -> Optional[str]:
+        """Look up a response header regardless of its case.
+
+        Args:
+            name: Header name
+
+        Returns:
+            Header value, or None if the header is absent
+        """
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """Seconds to wait before retrying, from the Retry-After header.
+
+        The header holds either a number of seconds or an HTTP date; None
+        when it is absent or malformed.
+        """
+        value = self.header('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def charset(self) -> str:
+        """Body encoding declared in the Content-Type header.
+
+        UTF-8 when none is declared or Python does not know the declared one.
+        """
+        content_type = self.header('Content-Type') or ''
+        for parameter in content_type.split(';')[1:]:
+            name, _, value = parameter.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"\'')
+                try:
+                    codecs.lookup(charset)
+                except LookupError:
+                    break
+                return charset
+        return 'utf-8'
+
+    @property
+    def text(self) -> str:
+        """Response body decoded with its declared charset."""
+        return self.body.decode(self.charset, errors='replace')
+
+    def json(self) -> Any:
+        """Decode the response body as JSON.
+
+        Returns:
+            Decoded JSON data
+        """
+        return json.loads(self.body)
+
+class StreamedResponse(HttpResponse):
+    """HTTP response whose body is read incrementally."""
+
+    __slots__ = ('chunks',)
+
+    def __init__(self, status: int, headers: Dict[str, str], url: str, chunks: AsyncIterator[bytes]):
+        """Initialize streamed response.
+
+        Args:
+            status: HTTP status code
+            headers: Response headers
+            url: Final request URL
+            chunks: Body chunks as they arrive
+        """
+        super().__init__(status, headers, b'', url)
+        self.chunks = chunks
+
+class SessionManager:
+    """Owner of the pooled client session used for all upstream requests.
+
+    The session is created lazily on first use, so the manager can be built
+    outside of a running event loop, and re-created after close().
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize session manager.
+
+        Args:
+            config: HTTP configuration dictionary
+        """
+        config = config or {}
+        self.max_connections = config.get('max_connections', 100)
+        self.max_connections_per_host = config.get('max_connections_per_host', 10)
+        self.dns_cache_ttl = config.get('dns_cache_ttl', 300)
+        self.keepalive_timeout = config.get('keepalive_timeout', 30)
+        self.timeout = config.get('timeout', 30)
+        self.user_agent = config.get('user_agent', 'devto-automation/0.1')
+        self.http2 = bool(config.get('http2', False)) and httpx is not None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._client = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared aiohttp session, creating it if needed.
+
+        Returns:
+            Client session backed by the pooled connector
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': self.user_agent}
+            )
+        return self._session
+
+    def _get_http2_client(self):
+        """Get the shared HTTP/2-capable httpx client, creating it if needed.
+
+        Returns:
+            httpx.AsyncClient negotiating HTTP/2 where the server supports it
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=self.timeout,
+                headers={'User-Agent': self.user_agent},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections_per_host,
+                    keepalive_expiry=self.keepalive_timeout
+                )
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, **kwargs) -> HttpResponse:
+        """Send a request over the pooled session and read the response.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments such as headers, params or json
+
+        Returns:
+            Fully read response
+        """
+        if self.http2:
+            response = await self._get_http2_client().request(method, url, **kwargs)
+            result = HttpResponse(
+                response.status_code,
+                dict(response.headers),
+                response.content,
+                str(response.url)
+            )
+        else:
+            session = await self.get_session()
+            async with session.request(method, url, **kwargs) as response:
+                result = HttpResponse(
+                    response.status,
+                    dict(response.headers),
+                    await response.read(),
+                    str(response.url)
+                )
+
+        HTTP_REQUEST_COUNT.labels(host=host_of(url), status=str(result.status)).inc()
+        record_pool_usage(self.pool_stats())
+        return result
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        chunk_size: int = 65536,
+        **kwargs
+    ) -> AsyncIterator[StreamedResponse]:
+        """Send a request over the pooled session and stream the response body.
+
+        Leaving the context before the body is read releases the connection,
+        so callers can stop downloading as soon as they have what they need.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            chunk_size: Maximum bytes per body chunk
+            **kwargs: Extra arguments such as headers, params or json
+
+        Yields:
+            Response with the body available as chunks
+        """
+        if self.http2:
+            async with self._get_http2_client().stream(method, url, **kwargs) as response:
+                HTTP_REQUEST_COUNT.labels(host=host_of(url), status=str(response.status_code)).inc()
+                yield StreamedResponse(
+                    response.status_code,
+                    dict(response.headers),
+                    str(response.url),
+                    response.aiter_bytes(chunk_size)
+                )
+        else:
+            session = await self.get_session()
+            async with session.request(method, url, **kwargs) as response:
+                HTTP_REQUEST_COUNT.labels(host=host_of(url), status=str(response.status)).inc()
+                yield StreamedResponse(
+                    response.status,
+                    dict(response.headers),
+                    str(response.url),
+                    response.content.iter_chunked(chunk_size)
+                )
+        record_pool_usage(self.pool_stats())
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Report connection pool usage.
+
+        Returns:
+            Dictionary with 'limit', 'acquired' and 'idle' connection counts
+        """
+        stats = {'limit': self.max_connections, 'acquired': 0, 'idle': 0}
+        if self._session is None or self._session.closed:
+            return stats
+
+        connector = self._session.connector
+        # aiohttp keeps no public pool counters; read them defensively
+        stats['acquired'] = len(getattr(connector, '_acquired', ()))
+        stats['idle'] = sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+        return stats
+
+    async def close(self):
+        """Close pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._session = None
+        self._client = None
+        record_pool_usage(self.pool_stats())
+
+    async def __aenter__(self) -> 'SessionManager':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,238 @@
+"""
+Durable per-article stage journal for resumable pipeline runs.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.serialization import dumps, loads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS stage_log (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    article_key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data BLOB,
+    completed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stage_log_position ON stage_log (run_id, position);
+"""
+
+# Status of an article that finished a stage and moves on
+DONE = 'done'
+# Status of an article a stage rejected; it is never resumed
+DROPPED = 'dropped'
+
+class StageJournal:
+    """Append-only SQLite log of the stages each article has finished.
+
+    Every stage completion is appended with a reference to the article as
+    the stage left it, such as the key of the record the stage saved, so
+    an interrupted run can be resumed from each article's last finished
+    stage without repeating scraping, research or writing.
+
+    Completions are buffered by record() and written in one transaction
+    by flush(). The connection may be used from any thread, one call at a
+    time, so callers can run the writes off the event loop.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = 3):
+        """Initialize journal.
+
+        Args:
+            path: SQLite database file
+            max_attempts: Attempts after which an unfinished run is abandoned
+                instead of resumed, so a persistent failure cannot block
+                new runs forever
+        """
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+        self._rows: List[Tuple[Any, ...]] = []
+        # Guards the buffered rows; the connection has a lock of its own so
+        # record() never waits for a write in progress
+        self._rows_lock = threading.Lock()
+        self._connection_lock = threading.Lock()
+
+    def start_run(self) -> Tuple[int, bool]:
+        """Resume the last run if it did not finish, otherwise start a new one.
+
+        Returns:
+            Tuple of (run id, whether the run is resumed)
+        """
+        with self._connection_lock:
+            return self._start_run()
+
+    def _start_run(self) -> Tuple[int, bool]:
+        row = self.connection.execute(
+            "SELECT id, finished_at, attempts FROM runs ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is not None and row[1] is None:
+            if row[2] < self.max_attempts:
+                self.connection.execute(
+                    "UPDATE runs SET attempts = attempts + 1 WHERE id = ?", (row[0],)
+                )
+                self.connection.commit()
+                return row[0], True
+            self._finish_run(row[0])
+
+        cursor = self.connection.execute(
+            "INSERT INTO runs (started_at) VALUES (?)", (time.time(),)
+        )
+        self.connection.commit()
+        return cursor.lastrowid, False
+
+    def finish_run(self, run_id: int):
+        """Mark a run as finished so it is not resumed.
+
+        Args:
+            run_id: Run id
+        """
+        with self._connection_lock:
+            self._finish_run(run_id)
+
+    def _finish_run(self, run_id: int):
+        self.connection.execute(
+            "UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id)
+        )
+        self.connection.commit()
+
+    def record(
+        self,
+        run_id: int,
+        stage: str,
+        entries: Iterable[Tuple[int, str, Any]],
+        status: str = DONE
+    ):
+        """Buffer stage completions until the next flush().
+
+        Args:
+            run_id: Run id
+            stage: Name of the finished stage
+            entries: (position, title, data) triples; position is the
+                article's index in the scraped batch, since titles need not
+                be unique, and data is what resuming the article needs,
+                such as the key of its saved record
+            status: DONE, or DROPPED for articles the stage rejected
+        """
+        now = time.time()
+        rows = [
+            (
+                run_id,
+                title,
+                stage,
+                status,
+                position,
+                dumps(data, default=str) if data is not None else None,
+                now
+            )
+            for position, title, data in entries
+        ]
+        with self._rows_lock:
+            self._rows.extend(rows)
+
+    @property
+    def buffered(self) -> int:
+        """Number of completions waiting for flush()."""
+        return len(self._rows)
+
+    def flush(self):
+        """Write the buffered completions in one transaction.
+
+        Rows that fail to write are kept for the next flush.
+        """
+        with self._connection_lock:
+            with self._rows_lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT INTO stage_log "
+                        "(run_id, article_key, stage, status, position, data, completed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+            except Exception:
+                with self._rows_lock:
+                    self._rows[:0] = rows
+                raise
+
+    def pending(self, run_id: int, final_stage: str) -> Dict[str, List[Tuple[int, Any]]]:
+        """Get the articles of a run that still have stages to go.
+
+        Args:
+            run_id: Run id
+            final_stage: Name of the last pipeline stage
+
+        Returns:
+            Mapping of last finished stage to (position, data) pairs
+        """
+        with self._connection_lock:
+            rows = self.connection.execute(
+                "SELECT stage, status, position, data FROM stage_log "
+                "WHERE run_id = ? ORDER BY rowid",
+                (run_id,)
+            ).fetchall()
+
+        latest: Dict[int, Tuple[str, str, int, Optional[bytes]]] = {}
+        for stage, status, position, data in rows:
+            latest[position] = (stage, status, position, data)
+
+        pending: Dict[str, List[Tuple[int, Any]]] = {}
+        for stage, status, position, data in latest.values():
+            if status == DONE and stage != final_stage:
+                pending.setdefault(stage, []).append((position, loads(data)))
+        for entries in pending.values():
+            entries.sort(key=lambda entry: entry[0])
+        return pending
+
+    def completed(self, run_id: int, stage: str) -> List[Tuple[int, Any]]:
+        """Get the data recorded for the articles that finished a stage in a run.
+
+        Args:
+            run_id: Run id
+            stage: Stage name
+
+        Returns:
+            (position, data) pairs in position order
+        """
+        with self._connection_lock:
+            rows = self.connection.execute(
+                "SELECT position, data FROM stage_log "
+                "WHERE run_id = ? AND stage = ? AND status = ? ORDER BY position",
+                (run_id, stage, DONE)
+            ).fetchall()
+        return [(position, loads(data)) for position, data in rows]
+
+    def published(self, run_id: int, final_stage: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """Get the results a run already produced in its final stage.
+
+        Args:
+            run_id: Run id
+            final_stage: Name of the last pipeline stage
+
+        Returns:
+            (position, result) pairs in position order
+        """
+        return self.completed(run_id, final_stage)
+
+    def close(self):
+        """Close the database connection; call flush() first to keep buffered completions."""
+        with self._connection_lock:
+            self.connection.close()
@@ -0,0 +1,195 @@
+"""
+Compiled multi-phrase matching with the Aho-Corasick automaton.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+class Match(NamedTuple):
+    """A single phrase occurrence."""
+
+    start: int
+    end: int
+    phrase: str
+    label: str
+
+class MatchResult:
+    """All phrase occurrences found in one text."""
+
+    def __init__(self, matches: List[Match]):
+        """Initialize match result.
+
+        Args:
+            matches: Phrase occurrences in text order
+        """
+        self.matches = matches
+        self.counts = Counter((match.label, match.phrase) for match in matches)
+
+    def count(self, label: str, phrase: Optional[str] = None) -> int:
+        """Count occurrences of a label, or of one phrase under it.
+
+        Args:
+            label: Phrase label, such as 'keyword' or 'spam'
+            phrase: Optional phrase to count
+
+        Returns:
+            Number of occurrences
+        """
+        if phrase is not None:
+            return self.counts.get((label, phrase.lower()), 0)
+        return sum(count for (match_label, _), count in self.counts.items() if match_label == label)
+
+    def phrases(self, label: Optional[str] = None) -> Counter:
+        """Count occurrences per phrase.
+
+        Args:
+            label: Optional label to restrict to
+
+        Returns:
+            Counter of phrase occurrences
+        """
+        return Counter({
+            phrase: count
+            for (match_label, phrase), count in self.counts.items()
+            if label is None or match_label == label
+        })
+
+    def positions(self, label: str, phrase: Optional[str] = None) -> List[Tuple[int, int]]:
+        """Get the spans of a label's occurrences.
+
+        Args:
+            label: Phrase label
+            phrase: Optional phrase to restrict to
+
+        Returns:
+            List of (start, end) offsets into the lower-cased text
+        """
+        return [
+            (match.start, match.end)
+            for match in self.matches
+            if match.label == label and (phrase is None or match.phrase == phrase.lower())
+        ]
+
+class PhraseMatcher:
+    """Finds many labelled phrases in a single linear pass over a text.
+
+    Phrases are compiled once into an Aho-Corasick automaton, so scanning
+    costs O(text length + matches) regardless of how many phrases there are.
+    Matching is case-insensitive; offsets refer to the lower-cased text.
+    """
+
+    def __init__(self, phrases: Optional[Dict[str, Iterable[str]]] = None, whole_words: bool = True):
+        """Initialize matcher.
+
+        Args:
+            phrases: Optional mapping of label to the phrases carrying it
+            whole_words: Only report matches not embedded in a longer word
+        """
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[List[Tuple[str, str]]] = [[]]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+        self._compiled = False
+        for label, label_phrases in (phrases or {}).items():
+            for phrase in label_phrases:
+                self.add(phrase, label)
+
+    def add(self, phrase: str, label: str):
+        """Add a phrase; the automaton is rebuilt on the next scan.
+
+        Args:
+            phrase: Phrase to find
+            label: Label reported with its matches
+        """
+        phrase = phrase.lower()
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._terminal.append([])
+            state = next_state
+        if (phrase, label) not in self._terminal[state]:
+            self._terminal[state].append((phrase, label))
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links breadth-first and merge outputs along them."""
+        self._fail = [0] * len(self._goto)
+        self._output = [list(outputs) for outputs in self._terminal]
+
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+        self._compiled = True
+
+    def find_all(self, text: str) -> List[Match]:
+        """Find all phrase occurrences in a text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches in the order they end in the text
+        """
+        if not self._compiled:
+            self.compile()
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            for phrase, label in output[state]:
+                start = end - len(phrase)
+                if self.whole_words and not _at_word_boundary(text, start, end):
+                    continue
+                matches.append(Match(start, end, phrase, label))
+        return matches
+
+    def scan(self, text: str) -> MatchResult:
+        """Scan a text and summarize its matches.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Match result with counts and positions
+        """
+        return MatchResult(self.find_all(text))
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def _at_word_boundary(text: str, start: int, end: int) -> bool:
+    """Check that a span is not embedded in a longer word.
+
+    Args:
+        text: Scanned text
+        start: Span start offset
+        end: Span end offset
+
+    Returns:
+        True if the characters around the span are not word characters
+    """
+    if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+        return False
+    if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+        return False
+    return True
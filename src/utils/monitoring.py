@@ -1,59 +1,318 @@
-"""
-Monitoring and logging utilities.
-"""
-
-import functools
-import logging
-import time
-from typing import Any, Callable
-from prometheus_client import Counter, Gauge, Histogram
-
-# Prometheus metrics
-REQUEST_COUNT = Counter('request_count', 'Number of requests', ['agent'])
-ERROR_COUNT = Counter('error_count', 'Number of errors', ['agent'])
-PROCESSING_TIME = Histogram('processing_time_seconds', 'Time spent processing', ['agent'])
-ACTIVE_REQUESTS = Gauge('active_requests', 'Number of active requests', ['agent'])
-
-def monitor(func: Callable) -> Callable:
-    """Decorator for monitoring agent functions.
-    
-    Args:
-        func: Function to monitor
-        
-    Returns:
-        Wrapped function with monitoring
-    """
-    @functools.wraps(func)
-    async def wrapper(self, *args, **kwargs):
-        agent_name = self.__class__.__name__
-        
-        REQUEST_COUNT.labels(agent=agent_name).inc()
-        ACTIVE_REQUESTS.labels(agent=agent_name).inc()
-        
-        start_time = time.time()
-        try:
-            result = await func(self, *args, **kwargs)
-            return result
-        except Exception as e:
-            ERROR_COUNT.labels(agent=agent_name).inc()
-            raise
-        finally:
-            PROCESSING_TIME.labels(agent=agent_name).observe(time.time() - start_time)
-            ACTIVE_REQUESTS.labels(agent=agent_name).dec()
-            
-    return wrapper
-
-def setup_logging(level: str = "INFO"):
-    """Setup logging configuration.
-    
-    Args:
-        level: Logging level
-    """
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('app.log')
-        ]
-    )
\ No newline at end of file
+"""
+Monitoring and logging utilities.
+"""
+
+import atexit
+import copy
+import functools
+import logging
+import queue
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from src.utils.serialization import dumps
+from src.utils.tracing import tracer
+
+# Prometheus metrics
+REQUEST_COUNT = Counter('request_count', 'Number of requests', ['agent'])
+ERROR_COUNT = Counter('error_count', 'Number of errors', ['agent'])
+PROCESSING_TIME = Histogram('processing_time_seconds', 'Time spent processing', ['agent'])
+ACTIVE_REQUESTS = Gauge('active_requests', 'Number of active requests', ['agent'])
+HTTP_REQUEST_COUNT = Counter('http_request_count', 'Number of upstream HTTP requests', ['host', 'status'])
+CACHE_REQUESTS = Counter('cache_requests', 'Number of cache lookups', ['cache', 'result'])
+HTTP_POOL_CONNECTIONS = Gauge('http_pool_connections', 'Pooled HTTP connections', ['state'])
+ARTICLES_PROCESSED = Counter('articles_processed', 'Articles returned by each agent', ['agent'])
+THROUGHPUT = Gauge('throughput_articles_per_second', 'Articles returned per second over the last minute', ['agent'])
+ITEMS_IN_FLIGHT = Gauge('items_in_flight', 'Articles being processed', ['agent'])
+QUEUE_DEPTH = Gauge('queue_depth', 'Articles waiting for a stage in streaming mode', ['stage'])
+CACHE_HIT_RATIO = Gauge('cache_hit_ratio', 'Fraction of lookups answered from the cache', ['cache'])
+RATE_LIMIT_WAIT = Histogram('rate_limit_wait_seconds', 'Time spent waiting for upstream rate limits', ['host'])
+BYTES_PERSISTED = Counter('bytes_persisted', 'Serialized bytes written by storage backends', ['backend'])
+
+class ThroughputMeter:
+    """Articles per second for each agent over a sliding window.
+    
+    Complements the articles_processed counter, whose rate Prometheus can
+    compute, for readers of the raw exporter output.
+    """
+
+    def __init__(self, window: float = 60.0):
+        """Initialize meter.
+        
+        Args:
+            window: Seconds of history the rate is computed over
+        """
+        self.window = window
+        self._calls: Dict[str, Deque[Tuple[float, float, int]]] = {}
+
+    def record(self, agent: str, count: int, started: float):
+        """Count articles returned by a finished call and update the gauge.
+        
+        Args:
+            agent: Agent name
+            count: Number of articles returned
+            started: perf_counter value when the call started
+        """
+        now = time.perf_counter()
+        calls = self._calls.setdefault(agent, deque())
+        calls.append((started, now, count))
+        while calls[0][1] < now - self.window:
+            calls.popleft()
+        begin = max(min(call[0] for call in calls), now - self.window)
+        THROUGHPUT.labels(agent=agent).set(sum(call[2] for call in calls) / max(now - begin, 1e-3))
+
+throughput = ThroughputMeter()
+
+def monitor(func: Callable) -> Callable:
+    """Decorator for monitoring agent functions.
+    
+    The call runs in a top-level tracing span named after the agent, so
+    spans opened while it runs are reported as steps of that agent.
+    
+    Args:
+        func: Function to monitor
+        
+    Returns:
+        Wrapped function with monitoring
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        agent_name = self.__class__.__name__
+        
+        REQUEST_COUNT.labels(agent=agent_name).inc()
+        ACTIVE_REQUESTS.labels(agent=agent_name).inc()
+        
+        start_time = time.perf_counter()
+        try:
+            with tracer.span(agent_name):
+                result = await func(self, *args, **kwargs)
+            if isinstance(result, list):
+                ARTICLES_PROCESSED.labels(agent=agent_name).inc(len(result))
+                throughput.record(agent_name, len(result), start_time)
+            return result
+        except Exception as e:
+            ERROR_COUNT.labels(agent=agent_name).inc()
+            raise
+        finally:
+            PROCESSING_TIME.labels(agent=agent_name).observe(time.perf_counter() - start_time)
+            ACTIVE_REQUESTS.labels(agent=agent_name).dec()
+            
+    return wrapper
+
+def record_pool_usage(stats: Dict[str, int]):
+    """Publish HTTP connection pool usage.
+    
+    Args:
+        stats: Connection counts keyed by state ('limit', 'acquired', 'idle')
+    """
+    for state, count in stats.items():
+        HTTP_POOL_CONNECTIONS.labels(state=state).set(count)
+
+def record_cache_lookup(cache: str, hit: bool, hit_ratio: float):
+    """Publish the outcome of a cache lookup.
+    
+    Args:
+        cache: Cache name
+        hit: Whether the lookup was answered from the cache
+        hit_ratio: Hit ratio of the cache including this lookup
+    """
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+    CACHE_HIT_RATIO.labels(cache=cache).set(hit_ratio)
+
+class MetricsServer:
+    """Async HTTP endpoint serving every registered metric to Prometheus."""
+
+    def __init__(self, port: int = 9090, host: str = '0.0.0.0'):
+        """Initialize metrics server.
+        
+        Args:
+            port: Port to listen on
+            host: Interface to bind
+        """
+        self.port = port
+        self.host = host
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        body = generate_latest()
+        return web.Response(body=body, headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+    async def start(self):
+        """Start serving /metrics."""
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get('/metrics', self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+class ThrottledLogger:
+    """Logger front end for per-article messages, capped at a rate.
+    
+    Messages take %-style arguments and are only formatted when they are
+    emitted, so a disabled level or a message over the cap costs nothing
+    beyond the call. The number of messages dropped by the cap is added
+    to the next one emitted.
+    """
+    
+    # Messages emitted per second by each throttled logger; set by setup_logging
+    per_second = 20.0
+    
+    def __init__(self, logger: logging.Logger):
+        """Initialize throttled logger.
+        
+        Args:
+            logger: Logger messages are emitted through
+        """
+        self.logger = logger
+        self.allowance = self.per_second
+        self.updated_at = time.monotonic()
+        self.suppressed = 0
+
+    def log(self, level: int, msg: str, *args: Any):
+        """Log a message unless the level is disabled or the cap is reached.
+        
+        Args:
+            level: Logging level
+            msg: Message with %-style placeholders
+            *args: Placeholder values
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        self.allowance = min(self.per_second, self.allowance + (now - self.updated_at) * self.per_second)
+        self.updated_at = now
+        if self.allowance < 1:
+            self.suppressed += 1
+            return
+        self.allowance -= 1
+        if self.suppressed:
+            msg = f"{msg} (%d similar messages suppressed)"
+            args = args + (self.suppressed,)
+            self.suppressed = 0
+        self.logger.log(level, msg, *args)
+
+    def debug(self, msg: str, *args: Any):
+        """Log a throttled message at DEBUG level."""
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args: Any):
+        """Log a throttled message at INFO level."""
+        self.log(logging.INFO, msg, *args)
+
+# Attributes every LogRecord has; anything else was passed through 'extra'
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including 'extra' fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return dumps(entry, default=str).decode('utf-8')
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback while the arguments are still
+        # live and leave the layout to the listener's formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# Listener writing queued records, replaced when logging is set up again
+_listener: Optional[QueueListener] = None
+
+def _stop_listener():
+    """Write the records still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def setup_logging(level: str = "INFO", config: Optional[Dict[str, Any]] = None):
+    """Setup logging configuration.
+    
+    Records are put on a queue by the logging call and written to the
+    console and a size-capped rotating file by a background thread, so
+    logging never blocks the event loop on I/O. When the queue is full,
+    records are dropped rather than waited for.
+    
+    Args:
+        level: Logging level
+        config: Optional logging configuration dictionary
+    """
+    config = config or {}
+    if config.get('json', False):
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+        
+    handlers = [
+        logging.StreamHandler(),
+        RotatingFileHandler(
+            config.get('file', 'app.log'),
+            maxBytes=config.get('max_bytes', 10 * 1024 * 1024),
+            backupCount=config.get('backup_count', 5),
+            encoding='utf-8'
+        )
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        
+    global _listener
+    _stop_listener()
+    log_queue = queue.Queue(config.get('queue_size', 10000))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_DroppingQueueHandler(log_queue))
+    root.setLevel(level)
+    ThrottledLogger.per_second = float(config.get('article_messages_per_second', 20))
+
+atexit.register(_stop_listener)
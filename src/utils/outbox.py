@@ -0,0 +1,219 @@
+"""
+Durable outbox of articles waiting to be published.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.utils.seen import content_hash
+from src.utils.serialization import dumps, loads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    article BLOB NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    in_doubt INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL,
+    result BLOB,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, not_before);
+"""
+
+# Status of an entry waiting for its schedule or its next attempt
+PENDING = 'pending'
+# Status of an entry the upstream accepted
+PUBLISHED = 'published'
+# Status of an entry the upstream rejected
+FAILED = 'failed'
+
+def idempotency_key(title: str, content: str) -> str:
+    """Identify a publication by its title and content.
+
+    Args:
+        title: Article title
+        content: Article body
+
+    Returns:
+        Hex digest that stays the same when the same article is submitted again
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(title.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(content_hash(content).encode('ascii'))
+    return digest.hexdigest()
+
+class OutboxEntry(NamedTuple):
+    """An article in the outbox and the state of its publication."""
+
+    key: str
+    article: Dict[str, Any]
+    status: str
+    attempts: int
+    in_doubt: bool
+    not_before: float
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+
+class PublishOutbox:
+    """SQLite queue of publications keyed by idempotency key.
+
+    An entry outlives the run that queued it: it keeps the article, the
+    attempts made so far and, once published, the upstream's result, so a
+    retried run returns the stored result instead of publishing twice. An
+    entry is in doubt while a request that may have created the article
+    has no recorded outcome; the publisher checks the upstream for the
+    article before sending it again.
+
+    The connection may be used from any thread, one call at a time, so the
+    publisher runs every query in a worker thread off the event loop.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize outbox.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+        self._lock = threading.Lock()
+
+    def enqueue(self, entries: Iterable[Tuple[str, Dict[str, Any]]], not_before: float):
+        """Queue articles for publishing in one transaction.
+
+        Published entries are left as they are. Pending entries take the
+        new schedule unless a failed attempt set a later retry time, and
+        failed entries are queued again with a fresh attempt count; both
+        stay in doubt if they were.
+
+        Args:
+            entries: (idempotency key, article data) pairs
+            not_before: Time before which the articles are not published
+        """
+        with self._lock:
+            now = time.time()
+            self.connection.executemany(
+                "INSERT INTO outbox (key, title, article, status, not_before, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "not_before = CASE WHEN status = ? AND attempts > 0 "
+                "THEN MAX(not_before, excluded.not_before) ELSE excluded.not_before END, "
+                "attempts = CASE WHEN status = ? THEN 0 ELSE attempts END, "
+                "status = excluded.status, updated_at = excluded.updated_at "
+                "WHERE status != ?",
+                [
+                    (key, article['title'], dumps(article, default=str), PENDING, not_before, now, PENDING, FAILED, PUBLISHED)
+                    for key, article in entries
+                ]
+            )
+            self.connection.commit()
+
+    def get(self, key: str) -> Optional[OutboxEntry]:
+        """Look up an entry.
+
+        Args:
+            key: Idempotency key
+
+        Returns:
+            The entry, or None if it was never queued
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT key, article, status, attempts, in_doubt, not_before, result, error "
+                "FROM outbox WHERE key = ?",
+                (key,)
+            ).fetchone()
+        return self._entry(row) if row is not None else None
+
+    def due(self, now: Optional[float] = None) -> List[OutboxEntry]:
+        """Get the pending entries whose time has come, oldest first.
+
+        Args:
+            now: Current time; defaults to time.time()
+
+        Returns:
+            Entries ready to be published
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT key, article, status, attempts, in_doubt, not_before, result, error "
+                "FROM outbox WHERE status = ? AND not_before <= ? ORDER BY not_before, rowid",
+                (PENDING, time.time() if now is None else now)
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def begin_attempt(self, key: str):
+        """Record that a request is about to be sent, putting the entry in doubt.
+
+        Args:
+            key: Idempotency key
+        """
+        with self._lock:
+            self.connection.execute(
+                "UPDATE outbox SET attempts = attempts + 1, in_doubt = 1, updated_at = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self.connection.commit()
+
+    def record_failure(self, key: str, error: str, in_doubt: bool, retry_at: Optional[float] = None):
+        """Record a failed attempt.
+
+        Args:
+            key: Idempotency key
+            error: Error message
+            in_doubt: Whether the request may still have created the article
+            retry_at: Time of the next attempt, or None when the upstream
+                rejected the entry
+        """
+        with self._lock:
+            self.connection.execute(
+                "UPDATE outbox SET status = ?, in_doubt = ?, not_before = COALESCE(?, not_before), "
+                "error = ?, updated_at = ? WHERE key = ?",
+                (PENDING if retry_at is not None else FAILED, int(in_doubt), retry_at, error, time.time(), key)
+            )
+            self.connection.commit()
+
+    def mark_published(self, key: str, result: Dict[str, Any]):
+        """Store the result of a successful publication.
+
+        Args:
+            key: Idempotency key
+            result: Publishing result
+        """
+        with self._lock:
+            self.connection.execute(
+                "UPDATE outbox SET status = ?, in_doubt = 0, result = ?, error = NULL, updated_at = ? "
+                "WHERE key = ?",
+                (PUBLISHED, dumps(result, default=str), time.time(), key)
+            )
+            self.connection.commit()
+
+    def _entry(self, row: Tuple[Any, ...]) -> OutboxEntry:
+        key, article, status, attempts, in_doubt, not_before, result, error = row
+        return OutboxEntry(
+            key,
+            loads(article),
+            status,
+            attempts,
+            bool(in_doubt),
+            not_before,
+            loads(result) if result is not None else None,
+            error
+        )
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,177 @@
+"""
+Token-bucket rate limiting shared across agents and concurrent tasks.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.utils.monitoring import RATE_LIMIT_WAIT
+
+class TokenBucket:
+    """Async token bucket allowing bursts up to its capacity."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens, i.e. the allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        """Add the tokens accumulated since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket, waiting until they are available.
+
+        Tokens are reserved before sleeping, so concurrent callers queue up
+        behind each other instead of racing for the same refill.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        self._refill()
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+
+        wait = -self.tokens / self.rate
+        await asyncio.sleep(wait)
+        return wait
+
+class RateLimiter:
+    """Registry of token buckets keyed by upstream host and API key."""
+
+    def __init__(self):
+        """Initialize an empty rate limiter registry."""
+        self._limits: Dict[str, Tuple[float, float]] = {}
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def configure(self, host: str, requests_per_minute: float, burst: Optional[float] = None):
+        """Set the rate limit for an upstream host.
+
+        Args:
+            host: Upstream host name
+            requests_per_minute: Sustained request rate
+            burst: Requests allowed back to back, defaults to one second's worth
+        """
+        burst = burst or max(1.0, requests_per_minute / 60)
+        self._limits[host] = (requests_per_minute, burst)
+        for key in [key for key in self._buckets if key[0] == host]:
+            del self._buckets[key]
+
+    def bucket(
+        self,
+        host: str,
+        api_key: Optional[str] = None,
+        requests_per_minute: Optional[float] = None,
+        burst: Optional[float] = None
+    ) -> Optional[TokenBucket]:
+        """Get the bucket for a host and API key, creating it if needed.
+
+        Args:
+            host: Upstream host name
+            api_key: Optional API key; each key gets its own quota
+            requests_per_minute: Fallback rate when the host is not configured
+            burst: Fallback burst when the host is not configured
+
+        Returns:
+            Token bucket, or None if the host is not rate limited
+        """
+        key = (host, _key_fingerprint(api_key))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if host in self._limits:
+                requests_per_minute, burst = self._limits[host]
+            if not requests_per_minute:
+                return None
+            burst = burst or max(1.0, requests_per_minute / 60)
+            bucket = TokenBucket(requests_per_minute / 60, burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(
+        self,
+        host: str,
+        api_key: Optional[str] = None,
+        requests_per_minute: Optional[float] = None,
+        burst: Optional[float] = None
+    ) -> float:
+        """Wait for a request slot on a host.
+
+        Args:
+            host: Upstream host name
+            api_key: Optional API key; each key gets its own quota
+            requests_per_minute: Fallback rate when the host is not configured
+            burst: Fallback burst when the host is not configured
+
+        Returns:
+            Seconds spent waiting
+        """
+        bucket = self.bucket(host, api_key, requests_per_minute, burst)
+        if bucket is None:
+            return 0.0
+        wait = await bucket.acquire()
+        RATE_LIMIT_WAIT.labels(host=host).observe(wait)
+        return wait
+
+    def reset(self):
+        """Drop all configured limits and buckets."""
+        self._limits.clear()
+        self._buckets.clear()
+
+def _key_fingerprint(api_key: Optional[str]) -> str:
+    """Derive a bucket key from an API key without keeping the secret.
+
+    Args:
+        api_key: API key or None
+
+    Returns:
+        Short hash of the key, or an empty string
+    """
+    if not api_key:
+        return ''
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+def host_of(url: str) -> str:
+    """Extract the host name used as rate limit key from a URL.
+
+    Args:
+        url: URL or bare host name
+
+    Returns:
+        Host name
+    """
+    return urlparse(url).hostname or url
+
+def configure_rate_limits(api_config: Dict[str, Dict]):
+    """Configure the shared rate limiter from the 'api' config section.
+
+    Args:
+        api_config: Mapping of API name to settings with 'base_url',
+            'rate_limit' (requests per minute) and optional 'burst'
+    """
+    for settings in (api_config or {}).values():
+        if not settings or not settings.get('rate_limit') or not settings.get('base_url'):
+            continue
+        rate_limiter.configure(
+            host_of(settings['base_url']),
+            settings['rate_limit'],
+            settings.get('burst')
+        )
+
+# Shared by every agent so concurrent tasks draw from the same quota
+rate_limiter = RateLimiter()
@@ -0,0 +1,148 @@
+"""
+Persistent index of fetched pages and scraped articles for incremental scraping.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    seen_at REAL NOT NULL
+);
+"""
+
+def content_hash(text: str) -> str:
+    """Fingerprint article text, ignoring whitespace differences.
+
+    Args:
+        text: Article text
+
+    Returns:
+        Hex digest of the text
+    """
+    normalized = ' '.join(text.split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+class SeenIndex:
+    """SQLite record of page validators and the articles already scraped.
+
+    Pages keep their ETag and Last-Modified values so they can be fetched
+    with conditional requests; articles keep a content hash so unchanged
+    ones are dropped before filtering while edited ones come through again.
+    The connection may be used from any thread, one call at a time, so
+    writes can run in a worker thread off the event loop.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize index.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build the validator headers for a conditional GET of a page.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            If-None-Match and If-Modified-Since headers for the stored
+            validators; empty for pages not fetched before
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def record_page(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """Store the validators of a fetched page.
+
+        Args:
+            url: Page URL
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        self.record_pages([(url, etag, last_modified)])
+
+    def record_pages(self, pages: Iterable[Tuple[str, Optional[str], Optional[str]]]):
+        """Store the validators of fetched pages in one transaction.
+
+        Args:
+            pages: (url, etag, last_modified) tuples
+        """
+        now = time.time()
+        rows = [(url, etag, last_modified, now) for url, etag, last_modified in pages]
+        if not rows:
+            return
+        with self._lock:
+            self.connection.executemany(
+                "INSERT INTO pages (url, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET "
+                "etag = COALESCE(excluded.etag, etag), "
+                "last_modified = COALESCE(excluded.last_modified, last_modified), "
+                "fetched_at = excluded.fetched_at",
+                rows
+            )
+            self.connection.commit()
+
+    def is_unchanged(self, key: str, digest: str) -> bool:
+        """Check whether an article was scraped before with the same content.
+
+        Args:
+            key: Article key, its URL or title
+            digest: Content hash of the article
+
+        Returns:
+            True if the article was seen with this content hash
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT content_hash FROM articles WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and row[0] == digest
+
+    def record_articles(self, entries: Iterable[Tuple[str, str]]):
+        """Remember scraped articles.
+
+        Args:
+            entries: (article key, content hash) pairs
+        """
+        now = time.time()
+        rows = [(key, digest, now) for key, digest in entries]
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO articles (key, content_hash, seen_at) VALUES (?, ?, ?)",
+                rows
+            )
+            self.connection.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.connection.close()
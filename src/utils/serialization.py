@@ -0,0 +1,184 @@
+"""
+Fast serialization with optional orjson, msgspec and msgpack backends.
+"""
+
+import json
+from typing import Any, Callable, Optional, Type, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Fastest JSON implementation available, stdlib json as the fallback
+JSON_BACKEND = 'orjson' if orjson is not None else 'msgspec' if msgspec is not None else 'json'
+
+# msgpack implementation available, if any
+MSGPACK_BACKEND = 'msgspec' if msgspec is not None else 'msgpack' if msgpack is not None else None
+
+def _encode_hook(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """Build the fallback conversion for objects the encoders do not support.
+
+    Records such as Article provide to_dict(), which is tried before the
+    caller's conversion.
+
+    Args:
+        default: Optional conversion for otherwise unsupported objects
+
+    Returns:
+        Conversion function
+    """
+    def hook(obj: Any) -> Any:
+        to_dict = getattr(obj, 'to_dict', None)
+        if to_dict is not None:
+            return to_dict()
+        if default is not None:
+            return default(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+    return hook
+
+def dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize an object to UTF-8 JSON.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+        default: Optional conversion for otherwise unsupported objects
+
+    Returns:
+        JSON document
+    """
+    default = _encode_hook(default)
+    if JSON_BACKEND == 'orjson':
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    if JSON_BACKEND == 'msgspec' and not indent:
+        return msgspec.json.encode(obj, enc_hook=default)
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':'),
+        ensure_ascii=False,
+        default=default
+    ).encode('utf-8')
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize a JSON document.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Deserialized object
+    """
+    if JSON_BACKEND == 'orjson':
+        return orjson.loads(data)
+    if JSON_BACKEND == 'msgspec':
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+def pack(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize an object to compact binary msgpack.
+
+    Args:
+        obj: Object to serialize
+        default: Optional conversion for otherwise unsupported objects
+
+    Returns:
+        msgpack document
+
+    Raises:
+        ImportError: If neither msgspec nor msgpack is installed
+    """
+    default = _encode_hook(default)
+    if MSGPACK_BACKEND == 'msgspec':
+        return msgspec.msgpack.encode(obj, enc_hook=default)
+    if MSGPACK_BACKEND == 'msgpack':
+        return msgpack.packb(obj, default=default, use_bin_type=True)
+    raise ImportError("msgspec or msgpack is required for the msgpack format")
+
+def unpack(data: bytes) -> Any:
+    """Deserialize a msgpack document.
+
+    Args:
+        data: msgpack document
+
+    Returns:
+        Deserialized object
+
+    Raises:
+        ImportError: If neither msgspec nor msgpack is installed
+    """
+    if MSGPACK_BACKEND == 'msgspec':
+        return msgspec.msgpack.decode(data)
+    if MSGPACK_BACKEND == 'msgpack':
+        return msgpack.unpackb(data, raw=False)
+    raise ImportError("msgspec or msgpack is required for the msgpack format")
+
+class Serializer:
+    """Encoder and decoder for one storage format.
+
+    With msgspec installed and a record type given, documents are decoded
+    straight into that type, validating them on the way.
+    """
+
+    # File extension per format
+    EXTENSIONS = {'json': '.json', 'msgpack': '.msgpack'}
+
+    def __init__(self, format: str = 'json', indent: bool = False, type: Optional[Type] = None):
+        """Initialize serializer.
+
+        Args:
+            format: 'json' or 'msgpack'
+            indent: Pretty-print JSON documents
+            type: Optional msgspec-supported type to decode into
+        """
+        if format not in self.EXTENSIONS:
+            raise ValueError(f"Unknown serialization format: {format}")
+        if format == 'msgpack' and MSGPACK_BACKEND is None:
+            raise ImportError("msgspec or msgpack is required for the msgpack format")
+        self.format = format
+        self.indent = indent
+        self.extension = self.EXTENSIONS[format]
+        self._decoder = None
+        if type is not None and msgspec is not None:
+            module = msgspec.json if format == 'json' else msgspec.msgpack
+            self._decoder = module.Decoder(type)
+
+    def encode(self, obj: Any) -> bytes:
+        """Serialize an object.
+
+        Args:
+            obj: Object to serialize
+
+        Returns:
+            Serialized document
+        """
+        if self.format == 'msgpack':
+            return pack(obj)
+        return dumps(obj, indent=self.indent)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Deserialize a document.
+
+        Args:
+            data: Serialized document
+
+        Returns:
+            Deserialized object
+        """
+        if self._decoder is not None:
+            return self._decoder.decode(data)
+        if self.format == 'msgpack':
+            return unpack(data)
+        return loads(data)
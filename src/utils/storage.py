@@ -0,0 +1,416 @@
+"""
+Storage backends for agent data with batched background writes.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.monitoring import BYTES_PERSISTED
+from src.utils.serialization import Serializer
+
+# Queue item telling the writer thread to exit
+_STOP = object()
+
+class StorageBackend(ABC):
+    """Base class for stores of serialized records grouped by subdirectory.
+
+    save() serializes the record right away, so later mutations of the
+    object do not leak into storage, and hands it to a background writer
+    thread that persists queued records in batches. Records not yet written
+    are served from memory, so a load always sees the latest save.
+
+    A batch that fails to write is retried; records still unwritten stay
+    in memory, are retried with later batches, and make flush() and
+    close() raise.
+    """
+
+    # Attempts per batch before its records are left for later batches
+    write_attempts = 3
+
+    def __init__(self, data_dir: Path, batch_size: int = 100, format: str = 'json'):
+        """Initialize storage backend.
+
+        Args:
+            data_dir: Root data directory
+            batch_size: Maximum number of records written per batch
+            format: Record encoding, 'json' or 'msgpack'
+        """
+        self.data_dir = Path(data_dir)
+        self.batch_size = batch_size
+        self.serializer = Serializer(format)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._pending: Dict[Tuple[str, str], bytes] = {}
+        self._unwritten: set = set()
+        self._write_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def serialize(self, data: Any) -> bytes:
+        """Serialize a record.
+
+        Args:
+            data: JSON-serializable record
+
+        Returns:
+            Serialized record
+        """
+        return self.serializer.encode(data)
+
+    def deserialize(self, payload: bytes) -> Any:
+        """Deserialize a record.
+
+        Args:
+            payload: Serialized record
+
+        Returns:
+            Record data
+        """
+        return self.serializer.decode(payload)
+
+    def save(self, subdir: str, key: str, data: Any):
+        """Queue a record for writing without blocking on disk I/O.
+
+        Args:
+            subdir: Record group, such as 'raw_content' or 'drafts'
+            key: Record key within the group
+            data: JSON-serializable record
+        """
+        payload = self.serialize(data)
+        with self._lock:
+            self._pending[(subdir, key)] = payload
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._write_loop,
+                    name=f"{self.__class__.__name__}-writer",
+                    daemon=True
+                )
+                self._thread.start()
+        self._queue.put((subdir, key))
+
+    def load(self, subdir: str, key: str) -> Any:
+        """Load a record.
+
+        Args:
+            subdir: Record group
+            key: Record key within the group
+
+        Returns:
+            Record data
+
+        Raises:
+            KeyError: If the record does not exist
+        """
+        with self._lock:
+            payload = self._pending.get((subdir, key))
+        if payload is None:
+            payload = self._read(subdir, key)
+        if payload is None:
+            raise KeyError(f"{subdir}/{key}")
+        return self.deserialize(payload)
+
+    def _write_loop(self):
+        """Write queued records in batches until stopped."""
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in items)
+            with self._lock:
+                # Records an earlier batch failed to write are retried too
+                keys = [item for item in items if item is not _STOP] + list(self._unwritten)
+                records = {item: self._pending[item] for item in keys if item in self._pending}
+            error = self._write_records(records)
+            with self._lock:
+                if error is None:
+                    for item, payload in records.items():
+                        self._unwritten.discard(item)
+                        # Keep records saved again while this batch was written
+                        if self._pending.get(item) is payload:
+                            del self._pending[item]
+                else:
+                    self._unwritten.update(records)
+                    self._write_error = error
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_records(self, records: Dict[Tuple[str, str], bytes]) -> Optional[Exception]:
+        """Write a batch, retrying failures with a short backoff.
+
+        Args:
+            records: Serialized records keyed by (subdir, key)
+
+        Returns:
+            The last error if every attempt failed, otherwise None
+        """
+        if not records:
+            return None
+        for attempt in range(self.write_attempts):
+            try:
+                self._write_batch([(subdir, key, payload) for (subdir, key), payload in records.items()])
+            except Exception as e:
+                self.logger.error(f"Error writing {len(records)} records (attempt {attempt + 1}): {str(e)}")
+                error = e
+                if attempt + 1 < self.write_attempts:
+                    time.sleep(0.1 * 2 ** attempt)
+                continue
+            BYTES_PERSISTED.labels(backend=self.__class__.__name__).inc(
+                sum(len(payload) for payload in records.values())
+            )
+            return None
+        return error
+
+    def _check_written(self):
+        """Raise if records could not be written.
+
+        Raises:
+            OSError: If some saved records are only held in memory
+        """
+        with self._lock:
+            unwritten = len(self._unwritten)
+        if unwritten:
+            raise OSError(f"{unwritten} records could not be written") from self._write_error
+
+    def flush(self):
+        """Block until every queued record is written.
+
+        Raises:
+            OSError: If some records could not be written
+        """
+        self._queue.join()
+        self._check_written()
+
+    def close(self):
+        """Write outstanding records and stop the writer thread.
+
+        The backend can be used again afterwards; the writer thread restarts
+        with the next save.
+
+        Raises:
+            OSError: If some records could not be written
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._thread = None
+        self._check_written()
+
+    @abstractmethod
+    def _write_batch(self, records: List[Tuple[str, str, bytes]]):
+        """Persist a batch of serialized records.
+
+        Args:
+            records: (subdir, key, payload) tuples
+        """
+        pass
+
+    @abstractmethod
+    def _read(self, subdir: str, key: str) -> Optional[bytes]:
+        """Read a persisted record.
+
+        Args:
+            subdir: Record group
+            key: Record key within the group
+
+        Returns:
+            Serialized record, or None if it does not exist
+        """
+        pass
+
+class FileStorage(StorageBackend):
+    """One file per record under data_dir/subdir; JSON is pretty-printed."""
+
+    def __init__(self, data_dir: Path, batch_size: int = 100, format: str = 'json'):
+        super().__init__(data_dir, batch_size, format)
+        self.serializer.indent = True
+
+    def _path(self, subdir: str, key: str) -> Path:
+        return self.data_dir / subdir / f"{key}{self.serializer.extension}"
+
+    def _write_batch(self, records: List[Tuple[str, str, bytes]]):
+        for subdir, key, payload in records:
+            path = self._path(subdir, key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(payload)
+
+    def _read(self, subdir: str, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(subdir, key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+class JsonlStorage(StorageBackend):
+    """Append-only JSON-lines file per subdir with an in-memory key index.
+
+    Each line holds the JSON-encoded key, a tab and the record, so the
+    index of latest offsets is rebuilt on start-up without decoding the
+    records. Saving a key again appends a new line that supersedes the old.
+    Records are always JSON, since binary encodings may contain newlines.
+    """
+
+    def __init__(self, data_dir: Path, batch_size: int = 100, format: str = 'json'):
+        if format != 'json':
+            raise ValueError(f"The jsonl storage backend does not support the {format} format")
+        super().__init__(data_dir, batch_size, format)
+        self._index: Dict[str, Dict[str, Tuple[int, int]]] = {}
+
+    def _path(self, subdir: str) -> Path:
+        return self.data_dir / f"{subdir}.jsonl"
+
+    def _subdir_index(self, subdir: str) -> Dict[str, Tuple[int, int]]:
+        """Get the offsets of a subdir's records, scanning its file once.
+
+        Args:
+            subdir: Record group
+
+        Returns:
+            Mapping of key to (offset, length) of its latest line
+        """
+        index = self._index.get(subdir)
+        if index is None:
+            index = {}
+            path = self._path(subdir)
+            if path.exists():
+                offset = 0
+                with open(path, 'rb') as f:
+                    for line in f:
+                        key, separator, _ = line.partition(b'\t')
+                        if separator and line.endswith(b'\n'):
+                            index[json.loads(key)] = (offset, len(line))
+                        offset += len(line)
+            self._index[subdir] = index
+        return index
+
+    def _write_batch(self, records: List[Tuple[str, str, bytes]]):
+        by_subdir: Dict[str, List[Tuple[str, bytes]]] = {}
+        for subdir, key, payload in records:
+            by_subdir.setdefault(subdir, []).append((key, payload))
+
+        for subdir, entries in by_subdir.items():
+            path = self._path(subdir)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                index = self._subdir_index(subdir)
+            updates = {}
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                for key, payload in entries:
+                    line = json.dumps(key).encode('utf-8') + b'\t' + payload + b'\n'
+                    f.write(line)
+                    updates[key] = (offset, len(line))
+                    offset += len(line)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                index.update(updates)
+
+    def _read(self, subdir: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            location = self._subdir_index(subdir).get(key)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self._path(subdir), 'rb') as f:
+            f.seek(offset)
+            line = f.read(length)
+        return line.partition(b'\t')[2]
+
+class SQLiteStorage(StorageBackend):
+    """Records in a single SQLite database written in batched transactions."""
+
+    def __init__(self, data_dir: Path, batch_size: int = 100, format: str = 'json'):
+        super().__init__(data_dir, batch_size, format)
+        self.path = self.data_dir / 'storage.db'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._reader_connection: Optional[sqlite3.Connection] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get the read connection, opening it and the schema on first use.
+
+        Callers other than the constructor hold the lock.
+        """
+        if self._reader_connection is None:
+            reader = sqlite3.connect(self.path, check_same_thread=False)
+            reader.execute("PRAGMA journal_mode=WAL")
+            reader.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "subdir TEXT NOT NULL, key TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (subdir, key))"
+            )
+            reader.commit()
+            self._reader_connection = reader
+        return self._reader_connection
+
+    def _write_batch(self, records: List[Tuple[str, str, bytes]]):
+        if self._writer is None:
+            # Only ever used by the writer thread, one at a time
+            self._writer = sqlite3.connect(self.path, check_same_thread=False)
+        with self._writer:
+            self._writer.executemany(
+                "INSERT OR REPLACE INTO records (subdir, key, data) VALUES (?, ?, ?)",
+                records
+            )
+
+    def _read(self, subdir: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._reader().execute(
+                "SELECT data FROM records WHERE subdir = ? AND key = ?", (subdir, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            with self._lock:
+                if self._reader_connection is not None:
+                    self._reader_connection.close()
+                    self._reader_connection = None
+
+# Backends selectable with the 'storage.backend' setting
+STORAGE_BACKENDS = {
+    'files': FileStorage,
+    'jsonl': JsonlStorage,
+    'sqlite': SQLiteStorage
+}
+
+def create_storage(config: Optional[Dict[str, Any]], data_dir: Path) -> StorageBackend:
+    """Create the storage backend selected in configuration.
+
+    Args:
+        config: Storage configuration dictionary
+        data_dir: Root data directory
+
+    Returns:
+        Storage backend, the per-file layout by default
+    """
+    config = config or {}
+    backend = config.get('backend', 'files')
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return STORAGE_BACKENDS[backend](
+        data_dir,
+        config.get('batch_size', 100),
+        config.get('format', 'json')
+    )
@@ -1,70 +1,419 @@
-"""
-Utility functions for text processing.
-"""
-
-from typing import Any, Dict, List
-import re
-
-def calculate_relevance(text: str, keywords: List[str]) -> float:
-    """Calculate relevance score based on keywords.
-    
-    Args:
-        text: Text to analyze
-        keywords: List of keywords to check
-        
-    Returns:
-        Relevance score between 0 and 1
-    """
-    # Implementation details removed for public version
-    return 0.0
-
-def clean_text(text: str) -> str:
-    """Clean and normalize text.
-    
-    Args:
-        text: Text to clean
-        
-    Returns:
-        Cleaned text
-    """
-    # Basic cleaning
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    return text.strip()
-
-def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
-    """Extract key phrases from text.
-    
-    Args:
-        text: Text to analyze
-        max_keywords: Maximum number of keywords to extract
-        
-    Returns:
-        List of extracted keywords
-    """
-    # Implementation details removed for public version
-    return []
-
-def generate_content(prompt: str) -> str:
-    """Generate text content from prompt.
-    
-    Args:
-        prompt: Input prompt
-        
-    Returns:
-        Generated content
-    """
-    # Implementation details removed for public version
-    return ""
-
-def check_plagiarism(text: str) -> bool:
-    """Check text for potential plagiarism.
-    
-    Args:
-        text: Text to check
-        
-    Returns:
-        True if plagiarism detected
-    """
-    # Implementation details removed for public version
+"""
+Utility functions for text processing.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import re
+import unicodedata
+
+import numpy as np
+
+from src.utils.cache import ContentStore, make_cache_key
+from src.utils.matcher import MatchResult, PhraseMatcher
+
+class KeywordRelevance:
+    """TF-IDF weighted keyword relevance scorer for batches of documents.
+    
+    Each document is tokenized once into a (documents x keywords) term
+    matrix and the whole batch is scored in one vectorized pass. Keyword
+    document frequencies are kept across batches and can be persisted, so
+    rare keywords weigh more than ones present in most of the corpus.
+    
+    A document scores the IDF-weighted mean of the saturated term
+    frequencies of its top_keywords best-matching keywords, so the scale
+    does not depend on how many keywords are configured. In an article of
+    average length a keyword mentioned once saturates to about 0.45, twice
+    to 0.62 and five times to 0.8; with equally weighted keywords, three
+    keywords mentioned once each score 0.45, and one keyword mentioned five
+    times alongside another mentioned once scores 0.42.
+    """
+
+    # BM25 term frequency saturation and length normalization
+    k1 = 1.2
+    b = 0.75
+    # Keywords a document is scored against, its best-matching ones
+    top_keywords = 3
+
+    def __init__(self, keywords: List[str], state_path: Optional[Path] = None):
+        """Initialize scorer.
+        
+        Args:
+            keywords: Keywords or multi-word phrases to score against
+            state_path: Optional JSON file persisting corpus statistics
+        """
+        self.keywords = keywords
+        self.state_path = Path(state_path) if state_path else None
+        self.vocabulary: Dict[str, int] = {}
+        for column, keyword in enumerate(keywords):
+            self.vocabulary.setdefault(' '.join(clean_text(keyword).split()), column)
+        # Columns of phrases as given, such as PhraseMatcher's lower-cased
+        # keywords, so counted phrases are normalized once rather than per document
+        self._phrase_columns: Dict[str, Optional[int]] = {
+            keyword.lower(): self.vocabulary[' '.join(clean_text(keyword).split())]
+            for keyword in keywords
+        }
+        self._unigrams = {phrase: column for phrase, column in self.vocabulary.items() if ' ' not in phrase}
+        self._phrases = [(f" {phrase} ", column) for phrase, column in self.vocabulary.items() if ' ' in phrase]
+        
+        self.doc_count = 0
+        self.total_length = 0
+        self.doc_freq = np.zeros(len(keywords), dtype=np.int64)
+        self._load_state()
+
+    def _load_state(self):
+        """Load persisted corpus statistics for the same keyword list."""
+        if self.state_path is None or not self.state_path.exists():
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('keywords') != list(self.keywords):
+            return
+        self.doc_count = state['doc_count']
+        self.total_length = state['total_length']
+        self.doc_freq = np.asarray(state['doc_freq'], dtype=np.int64)
+
+    def save_state(self):
+        """Persist corpus statistics."""
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, 'w') as f:
+            json.dump({
+                'keywords': list(self.keywords),
+                'doc_count': self.doc_count,
+                'total_length': self.total_length,
+                'doc_freq': self.doc_freq.tolist()
+            }, f)
+
+    def term_matrix(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Count keyword occurrences in every document.
+        
+        Args:
+            texts: Documents to tokenize
+            
+        Returns:
+            Tuple of the (documents x keywords) count matrix and the
+            document lengths in words
+        """
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[int] = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        
+        for row, text in enumerate(texts):
+            tokens = clean_text(text).split()
+            lengths[row] = len(tokens)
+            for token, count in Counter(tokens).items():
+                column = self._unigrams.get(token)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(count)
+            if self._phrases:
+                padded = f" {' '.join(tokens)} "
+                for phrase, column in self._phrases:
+                    count = padded.count(phrase)
+                    if count:
+                        rows.append(row)
+                        columns.append(column)
+                        values.append(count)
+        
+        return self._matrix(len(texts), rows, columns, values), lengths
+
+    def count_matrix(self, phrase_counts: List[Dict[str, int]]) -> np.ndarray:
+        """Build the term count matrix from precomputed phrase counts.
+        
+        Lets callers that already scanned the documents, for instance with a
+        PhraseMatcher, skip tokenizing them again.
+        
+        Args:
+            phrase_counts: Occurrences per phrase for every document
+            
+        Returns:
+            The (documents x keywords) count matrix
+        """
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[int] = []
+        for row, document_counts in enumerate(phrase_counts):
+            for phrase, count in document_counts.items():
+                column = self._phrase_column(phrase)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(count)
+        return self._matrix(len(phrase_counts), rows, columns, values)
+
+    def _phrase_column(self, phrase: str) -> Optional[int]:
+        """Get the term column of a phrase, normalizing phrases not seen before once."""
+        try:
+            return self._phrase_columns[phrase]
+        except KeyError:
+            column = self.vocabulary.get(' '.join(clean_text(phrase).split()))
+            self._phrase_columns[phrase] = column
+            return column
+
+    def _matrix(self, documents: int, rows: List[int], columns: List[int], values: List[int]) -> np.ndarray:
+        """Assemble a term count matrix from its non-zero entries.
+        
+        Args:
+            documents: Number of documents
+            rows: Document of every entry
+            columns: Keyword column of every entry
+            values: Count of every entry; repeated cells are summed
+            
+        Returns:
+            The (documents x keywords) count matrix
+        """
+        counts = np.zeros((documents, len(self.keywords)), dtype=np.int64)
+        np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), values)
+        return counts
+
+    def update(self, counts: np.ndarray, lengths: np.ndarray):
+        """Add a batch to the corpus statistics.
+        
+        Args:
+            counts: Term count matrix of the batch
+            lengths: Document lengths of the batch
+        """
+        self.doc_count += counts.shape[0]
+        self.total_length += int(lengths.sum())
+        self.doc_freq += (counts > 0).sum(axis=0)
+
+    def score_matrix(self, counts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Score documents from their term counts.
+        
+        Args:
+            counts: Term count matrix
+            lengths: Document lengths in words
+            
+        Returns:
+            Relevance scores between 0 and 1
+        """
+        if not self.keywords:
+            return np.ones(counts.shape[0])
+        
+        doc_count = max(self.doc_count, 1)
+        idf = np.log((1 + doc_count) / (1 + self.doc_freq)) + 1
+        # With no corpus yet every document counts as of average length
+        average_length = self.total_length / doc_count if self.total_length else np.maximum(lengths, 1)
+        norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        weighted = counts / (counts + norm[:, None]) * idf
+        if len(self.keywords) <= self.top_keywords:
+            return weighted.sum(axis=1) / idf.sum()
+        best = np.argpartition(-weighted, self.top_keywords - 1, axis=1)[:, :self.top_keywords]
+        rows = np.arange(weighted.shape[0])[:, None]
+        return weighted[rows, best].sum(axis=1) / idf[best].sum(axis=1)
+
+    def score(self, texts: List[str], update: bool = True) -> List[float]:
+        """Score a batch of documents.
+        
+        Args:
+            texts: Documents to score
+            update: Add the batch to the corpus statistics before scoring
+            
+        Returns:
+            Relevance score between 0 and 1 for every document
+        """
+        if not texts:
+            return []
+        counts, lengths = self.term_matrix(texts)
+        if update:
+            self.update(counts, lengths)
+        return self.score_matrix(counts, lengths).tolist()
+
+def scan_document(text: str, matcher: PhraseMatcher, relevance: KeywordRelevance) -> Tuple[MatchResult, np.ndarray]:
+    """Scan a document for phrases and count its keywords.
+    
+    Takes everything it needs as arguments, so it can run in a process
+    worker of the analysis executor.
+    
+    Args:
+        text: Document to scan
+        matcher: Compiled phrase matcher whose 'keyword' phrases are the
+            scorer's keywords
+        relevance: Keyword scorer mapping phrases to term columns
+        
+    Returns:
+        Tuple of the match result and the document's row of the term
+        count matrix
+    """
+    scan = matcher.scan(text)
+    return scan, relevance.count_matrix([scan.phrases('keyword')])[0]
+
+def calculate_relevance_batch(texts: List[str], keywords: List[str]) -> List[float]:
+    """Calculate keyword relevance for many texts in one vectorized pass.
+    
+    Args:
+        texts: Texts to analyze
+        keywords: List of keywords to check
+        
+    Returns:
+        Relevance scores between 0 and 1, one per text
+    """
+    return KeywordRelevance(keywords).score(texts)
+
+def calculate_relevance(text: str, keywords: List[str]) -> float:
+    """Calculate relevance score based on keywords.
+    
+    Args:
+        text: Text to analyze
+        keywords: List of keywords to check
+        
+    Returns:
+        Relevance score between 0 and 1
+    """
+    return calculate_relevance_batch([text], keywords)[0]
+
+# Punctuation clean_text removes: anything neither a word character nor whitespace
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+# The same characters within ASCII, deleted with bytes.translate
+_ASCII_PUNCTUATION = bytes(c for c in range(128) if _PUNCTUATION.match(chr(c)))
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text.
+    
+    Lower-cases the text and removes every character that is neither a
+    word character nor whitespace, then strips the ends. ASCII text, the
+    bulk of scraped articles, takes a bytes.translate fast path; other
+    text goes through the precompiled punctuation pattern.
+    
+    Args:
+        text: Text to clean
+        
+    Returns:
+        Cleaned text
+    """
+    text = text.lower()
+    if text.isascii():
+        return text.encode('ascii').translate(None, _ASCII_PUNCTUATION).decode('ascii').strip()
+    return _PUNCTUATION.sub('', text).strip()
+
+def normalize_text(text: str, form: Optional[str] = 'NFKC') -> str:
+    """Normalize text for matching and hashing.
+    
+    Applies Unicode normalization, cleans the text like clean_text and
+    collapses runs of whitespace to single spaces. Normalization is
+    skipped for ASCII text, which every form leaves unchanged.
+    
+    Args:
+        text: Text to normalize
+        form: Unicode normalization form, or None to skip it
+        
+    Returns:
+        Normalized text with single spaces between words
+    """
+    if form and not text.isascii():
+        text = unicodedata.normalize(form, text)
+    return ' '.join(clean_text(text).split())
+
+def normalize_stream(chunks: Iterable[str], form: Optional[str] = 'NFKC') -> Iterator[str]:
+    """Normalize a large document chunk by chunk.
+    
+    Each chunk is cut at its last whitespace and the remainder is carried
+    into the next one, so words split across chunks are normalized whole.
+    Joining the yielded pieces with single spaces gives the same result
+    as normalize_text on the whole document, without holding it in memory.
+    
+    Args:
+        chunks: Pieces of the document, in order
+        form: Unicode normalization form, or None to skip it
+        
+    Yields:
+        Normalized runs of words
+    """
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk
+        if len(text.rstrip()) < len(text):
+            carry = ''
+        else:
+            parts = text.rsplit(None, 1)
+            if len(parts) < 2:
+                carry = text
+                continue
+            carry = parts[1]
+        cut = len(text) - len(carry)
+        normalized = normalize_text(text[:cut], form)
+        if normalized:
+            yield normalized
+    normalized = normalize_text(carry, form)
+    if normalized:
+        yield normalized
+
+def extract_keywords(
+    text: str,
+    max_keywords: int = 10,
+    matcher: Optional[PhraseMatcher] = None
+) -> List[str]:
+    """Extract key phrases from text.
+    
+    Args:
+        text: Text to analyze
+        max_keywords: Maximum number of keywords to extract
+        matcher: Optional compiled phrase matcher; when given, the most
+            frequent of its phrases found in a single pass are returned
+        
+    Returns:
+        List of extracted keywords
+    """
+    if matcher is not None:
+        phrases = matcher.scan(text).phrases()
+        return [phrase for phrase, _ in phrases.most_common(max_keywords)]
+        
+    # Implementation details removed for public version
+    return []
+
+def generation_key(prompt: Any, **params: Any) -> str:
+    """Build the content address of a generation request.
+    
+    Args:
+        prompt: Prompt text or JSON-serializable prompt inputs
+        **params: Settings affecting the output, such as style, tone and
+            model parameters
+        
+    Returns:
+        Hex digest identifying the generated output
+    """
+    return make_cache_key('generation', prompt, params)
+
+def generate_content(prompt: str, cache: Optional[ContentStore] = None, **params: Any) -> str:
+    """Generate text content from prompt.
+    
+    Args:
+        prompt: Input prompt
+        cache: Optional content store; a previous output for the same prompt
+            and parameters is returned without generating again
+        **params: Model parameters
+        
+    Returns:
+        Generated content
+    """
+    key = generation_key(prompt, **params) if cache is not None else None
+    if key is not None:
+        content = cache.get(key)
+        if content is not None:
+            return content
+            
+    # Implementation details removed for public version
+    content = ""
+    
+    if key is not None:
+        cache.put(key, content)
+    return content
+
+def check_plagiarism(text: str) -> bool:
+    """Check text for potential plagiarism.
+    
+    Args:
+        text: Text to check
+        
+    Returns:
+        True if plagiarism detected
+    """
+    # Implementation details removed for public version
     return False
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Nested timing spans with profiling of slow items and trace file export.
+"""
+
+import asyncio
+import cProfile
+import itertools
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from prometheus_client import Histogram
+
+from src.utils.serialization import dumps
+
+STEP_TIME = Histogram('step_time_seconds', 'Time spent in traced steps', ['agent', 'step'])
+
+class Span:
+    """A timed operation, nested under the span that was open when it started."""
+
+    __slots__ = ('name', 'agent', 'parent', 'attributes', 'start', 'end')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.parent = parent
+        # Top-level span names the agent; steps are reported under it
+        self.agent = parent.agent if parent is not None else name
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end, or to now while the span is open."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+class Tracer:
+    """Records spans as Prometheus histograms and Chrome trace events.
+
+    Spans nest through a context variable, so a span opened in an agent
+    is the parent of spans opened in anything it awaits, including tasks
+    it starts. Every span is observed in STEP_TIME labelled by its
+    top-level span and its own name; with a trace file configured, spans
+    are also kept as trace events that chrome://tracing or Perfetto can
+    open, one track per asyncio task.
+
+    Spans opened with profile=True are sampled: a sampled span runs under
+    cProfile and its profile is saved when the span is slower than the
+    threshold. cProfile sees every task interleaved on the event loop
+    meanwhile, and only one span is profiled at a time.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize tracer.
+
+        Args:
+            config: Tracing configuration dictionary
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._origin = time.perf_counter()
+        # Tracks are keyed by the task object, so a finished task's entry goes
+        # with it and a later task reusing its id() does not share its track
+        self._task_tracks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._thread_tracks: Dict[int, int] = {}
+        self._track_numbers = itertools.count(1)
+        self._profiling = threading.Lock()
+        self._observers: List[Callable[[Span], None]] = []
+        self.configure(config)
+
+    def configure(self, config: Optional[Dict[str, Any]] = None):
+        """Apply configuration, discarding recorded trace events.
+
+        Args:
+            config: Tracing configuration dictionary
+        """
+        config = config or {}
+        profile = config.get('profile', {}) or {}
+        self.enabled = config.get('enabled', True)
+        self.trace_file = Path(config['trace_file']) if config.get('trace_file') else None
+        self.events: deque = deque(maxlen=int(config.get('max_events', 100000)))
+        self.sample_rate = float(profile.get('sample_rate', 0.0))
+        self.slow_threshold = float(profile.get('slow_threshold', 5.0))
+        self.profile_dir = Path(profile.get('output_dir', 'data/profiles'))
+
+    def add_observer(self, observer: Callable[[Span], None]):
+        """Call a function with every finished span.
+
+        Args:
+            observer: Function taking the span; it runs on the caller's
+                thread, so it should be quick
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: Callable[[Span], None]):
+        """Stop calling a function added with add_observer.
+
+        Args:
+            observer: Function to remove
+        """
+        self._observers.remove(observer)
+
+    @contextmanager
+    def span(self, name: str, profile: bool = False, **attributes: Any) -> Iterator[Span]:
+        """Time a block of code as a span.
+
+        Args:
+            name: Step name
+            profile: Whether the span may be sampled for profiling
+            **attributes: Details kept with the trace event, such as the article title
+
+        Yields:
+            The open span
+        """
+        span = Span(name, _current_span.get(), attributes)
+        if not self.enabled:
+            yield span
+            return
+
+        token = _current_span.set(span)
+        profiler = self._start_profile() if profile else None
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            if profiler is not None:
+                self._finish_profile(profiler, span)
+            STEP_TIME.labels(agent=span.agent, step=span.name).observe(span.duration)
+            if self.trace_file is not None:
+                self._record(span)
+            for observer in self._observers:
+                observer(span)
+
+    def _start_profile(self) -> Optional[cProfile.Profile]:
+        """Start profiling a sampled span unless another one is profiled.
+
+        Returns:
+            Running profiler, or None when the span is not profiled
+        """
+        if random.random() >= self.sample_rate or not self._profiling.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active on this thread
+            self._profiling.release()
+            return None
+        return profiler
+
+    def _finish_profile(self, profiler: cProfile.Profile, span: Span):
+        """Stop profiling and keep the profile of a slow span.
+
+        Args:
+            profiler: Profiler started for the span
+            span: Finished span
+        """
+        try:
+            profiler.disable()
+            if span.duration < self.slow_threshold:
+                return
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            path = self.profile_dir / f"{span.agent}-{span.name}-{stamp}-{id(span):x}.prof"
+            profiler.dump_stats(path)
+            self.logger.warning(
+                f"Slow {span.name} in {span.agent} took {span.duration:.2f}s "
+                f"{span.attributes}; profile saved to {path}"
+            )
+        finally:
+            self._profiling.release()
+
+    def _track(self) -> int:
+        """Number the trace track of the running asyncio task or thread."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            track = self._task_tracks.get(task)
+            if track is None:
+                track = self._task_tracks[task] = next(self._track_numbers)
+            return track
+        thread = threading.get_ident()
+        track = self._thread_tracks.get(thread)
+        if track is None:
+            track = self._thread_tracks[thread] = next(self._track_numbers)
+        return track
+
+    def _record(self, span: Span):
+        """Keep a finished span as a Chrome trace complete event.
+
+        Args:
+            span: Finished span
+        """
+        self.events.append({
+            'name': span.name,
+            'cat': span.agent,
+            'ph': 'X',
+            'ts': round((span.start - self._origin) * 1e6, 1),
+            'dur': round(span.duration * 1e6, 1),
+            'pid': 1,
+            'tid': self._track(),
+            'args': {key: str(value) for key, value in span.attributes.items()}
+        })
+
+    def save(self, path: Optional[Path] = None):
+        """Write the recorded spans as a Chrome trace file.
+
+        Args:
+            path: Output file; defaults to the configured trace file
+        """
+        path = Path(path) if path else self.trace_file
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(dumps({'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}))
+
+def configure_tracing(config: Optional[Dict[str, Any]]):
+    """Configure the shared tracer from the 'monitoring.tracing' config section.
+
+    Args:
+        config: Tracing configuration dictionary
+    """
+    tracer.configure(config)
+
+# Shared by every agent so all spans land in one trace
+tracer = Tracer()
+
+def span(name: str, profile: bool = False, **attributes: Any):
+    """Time a block of code as a span of the shared tracer.
+
+    Args:
+        name: Step name
+        profile: Whether the span may be sampled for profiling
+        **attributes: Details kept with the trace event
+
+    Returns:
+        Context manager yielding the open span
+    """
+    return tracer.span(name, profile, **attributes)
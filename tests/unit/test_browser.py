@@ -0,0 +1,193 @@
+"""
+Tests for the pool of headless-browser contexts.
+"""
+
+import asyncio
+from typing import Any, List
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from src.utils import browser
+from src.utils.browser import BrowserPool
+
+class FakePage:
+    async def goto(self, url: str, wait_until: str = None):
+        self.url = url
+
+    async def content(self) -> str:
+        return f"<html>{self.url}</html>"
+
+class FakeContext:
+    def __init__(self, owner: 'FakeBrowser'):
+        self.owner = owner
+        self.closed = False
+
+    def set_default_timeout(self, timeout: float):
+        pass
+
+    async def route(self, pattern: str, handler: Any):
+        pass
+
+    async def new_page(self) -> FakePage:
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    """Browser whose new contexts fail while `failing` is set."""
+
+    def __init__(self):
+        self.failing = False
+        self.contexts: List[FakeContext] = []
+        self.closed = False
+
+    async def new_context(self, **options: Any) -> FakeContext:
+        if self.failing:
+            raise RuntimeError('browser crashed')
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+class FakePlaywright:
+    def __init__(self, launches: List[FakeBrowser]):
+        self.launches = launches
+
+    @property
+    def chromium(self) -> 'FakePlaywright':
+        return self
+
+    async def launch(self, headless: bool = True) -> FakeBrowser:
+        fake = FakeBrowser()
+        self.launches.append(fake)
+        return fake
+
+    async def stop(self):
+        pass
+
+@pytest.fixture
+def launches(monkeypatch) -> List[FakeBrowser]:
+    """Replace Playwright with fakes and collect the browsers launched."""
+    launched: List[FakeBrowser] = []
+
+    class Starter:
+        async def start(self) -> FakePlaywright:
+            return FakePlaywright(launched)
+
+    monkeypatch.setattr(browser, 'async_playwright', Starter)
+    return launched
+
+async def fail_render(pool: BrowserPool, waiting_url: str = None) -> asyncio.Future:
+    """Break a borrowed page, optionally while another render waits for one."""
+    waiter = None
+    with pytest.raises(ValueError):
+        async with pool.page():
+            if waiting_url is not None:
+                waiter = asyncio.ensure_future(pool.render(waiting_url))
+                await asyncio.sleep(0)
+            raise ValueError('page crashed')
+    return waiter
+
+@pytest.mark.asyncio
+async def test_spent_contexts_are_replaced(launches):
+    pool = BrowserPool({'pool_size': 2, 'pages_per_context': 1})
+    try:
+        for index in range(5):
+            assert await pool.render(f"https://example.com/{index}") == f"<html>https://example.com/{index}</html>"
+        assert len(pool._contexts) == 2
+        assert len(launches[0].contexts) == 7
+        assert sum(context.closed for context in launches[0].contexts) == 5
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_failed_replacement_shrinks_pool(launches):
+    pool = BrowserPool({'pool_size': 2})
+    try:
+        await pool.start()
+        launches[0].failing = True
+        await fail_render(pool)
+        assert len(pool._contexts) == 1
+        assert pool._idle.qsize() == 1
+
+        # The remaining context keeps serving pages
+        launches[0].failing = False
+        assert await pool.render('https://example.com/a') == '<html>https://example.com/a</html>'
+        assert await pool.render('https://example.com/b') == '<html>https://example.com/b</html>'
+        assert len(pool._contexts) == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_browser_restarts_when_no_context_is_left(launches):
+    pool = BrowserPool({'pool_size': 1})
+    try:
+        await pool.start()
+        launches[0].failing = True
+        waiter = await fail_render(pool, 'https://example.com/waiting')
+        assert len(launches) == 2
+        assert launches[0].closed
+        assert await waiter == '<html>https://example.com/waiting</html>'
+        assert len(pool._contexts) == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_failed_restart_wakes_waiting_tasks(launches, monkeypatch):
+    pool = BrowserPool({'pool_size': 1})
+    try:
+        await pool.start()
+        launches[0].failing = True
+
+        async def no_launch(headless: bool = True):
+            raise RuntimeError('no browser')
+        monkeypatch.setattr(FakePlaywright, 'launch', staticmethod(no_launch))
+        waiter = None
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                waiter = asyncio.ensure_future(pool.render('https://example.com/waiting'))
+                await asyncio.sleep(0)
+                raise ValueError('page crashed')
+        with pytest.raises(RuntimeError, match='could not restart'):
+            await waiter
+    finally:
+        await pool.close()
+
+PAGE = """<html><body><article id="body">static text</article>
+<script>document.getElementById('body').textContent = 'rendered by script';</script>
+</body></html>"""
+
+@pytest_asyncio.fixture
+async def static_server():
+    app = web.Application()
+
+    async def article(request: web.Request) -> web.Response:
+        return web.Response(text=PAGE, content_type='text/html')
+
+    app.router.add_get('/article', article)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    yield f"http://127.0.0.1:{runner.addresses[0][1]}"
+    await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_renders_against_local_server(static_server):
+    pytest.importorskip('playwright.async_api')
+    pool = BrowserPool({'pool_size': 2, 'pages_per_context': 2})
+    try:
+        try:
+            await pool.start()
+        except Exception as e:
+            pytest.skip(f"browser unavailable: {e}")
+        pages = await asyncio.gather(*(pool.render(f"{static_server}/article") for _ in range(5)))
+        assert all('rendered by script' in html for html in pages)
+        assert len(pool._contexts) == 2
+    finally:
+        await pool.close()
@@ -0,0 +1,89 @@
+"""
+Tests for back-filling the tiers of the tiered cache.
+"""
+
+import pytest
+
+from src.utils import cache
+from src.utils.cache import DiskCache, LRUCache, TieredCache
+
+class Clock:
+    """Stand-in for the time module that only moves when advanced."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+def expiry(tier: LRUCache, key: str):
+    """Get the expiry time an in-memory tier stores for a key."""
+    return tier._entries[key][0]
+
+@pytest.mark.asyncio
+async def test_back_fill_keeps_the_remaining_ttl(tmp_path, clock):
+    memory = LRUCache(ttl=100)
+    tiered = TieredCache('test', [memory, DiskCache(tmp_path, ttl=100)])
+    await tiered.set('key', {'value': 1})
+    stored_at = clock.now
+    memory._entries.clear()
+
+    clock.advance(60)
+    assert await tiered.get('key') == {'value': 1}
+    assert expiry(memory, 'key') == stored_at + 100
+
+    clock.advance(41)
+    assert await memory.get('key') is None
+    assert await tiered.get('key') is None
+    assert tiered.stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+@pytest.mark.asyncio
+async def test_back_fill_reaches_every_faster_tier(tmp_path, clock):
+    first, second = LRUCache(ttl=100), LRUCache(ttl=100)
+    disk = DiskCache(tmp_path, ttl=100)
+    tiered = TieredCache('test', [first, second, disk])
+    await disk.set('key', 'value')
+    stored_at = clock.now
+
+    clock.advance(30)
+    assert await tiered.get('key') == 'value'
+    assert expiry(first, 'key') == expiry(second, 'key') == stored_at + 100
+
+    # A later hit in the fastest tier does not extend the entry either
+    clock.advance(30)
+    assert await tiered.get('key') == 'value'
+    assert expiry(first, 'key') == stored_at + 100
+
+@pytest.mark.asyncio
+async def test_back_fill_does_not_outlive_a_shorter_slower_ttl(tmp_path, clock):
+    memory = LRUCache(ttl=1000)
+    tiered = TieredCache('test', [memory, DiskCache(tmp_path, ttl=10)])
+    await tiered.set('key', 'value')
+    stored_at = clock.now
+    memory._entries.clear()
+
+    clock.advance(5)
+    assert await tiered.get('key') == 'value'
+    assert expiry(memory, 'key') == stored_at + 10
+    clock.advance(6)
+    assert await tiered.get('key') is None
+
+@pytest.mark.asyncio
+async def test_back_fill_of_an_entry_without_expiry(tmp_path, clock):
+    memory = LRUCache(ttl=None)
+    tiered = TieredCache('test', [memory, DiskCache(tmp_path, ttl=None)])
+    await tiered.set('key', 'value')
+    memory._entries.clear()
+
+    clock.advance(10 ** 6)
+    assert await tiered.get('key') == 'value'
+    assert expiry(memory, 'key') is None
@@ -0,0 +1,98 @@
+"""
+Tests for the filter agent's check cascade.
+"""
+
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from src.agents.filter import FilterAgent
+from src.models import Article
+
+CONFIG = {
+    'keywords': ['python', 'asyncio', 'numpy', 'rust'],
+    'min_word_count': 20,
+    'exclude_domains': ['spam.example'],
+    'max_duplicates': None,
+    'checks': [
+        'word_count',
+        {'name': 'excluded_domain', 'cost': 4},
+        {'name': 'spam', 'cost': 4},
+        {'name': 'relevance', 'cost': 5}
+    ]
+}
+
+# Counts that make relevance look most selective and word_count least
+REVERSING_STATS = {
+    'word_count': {'evaluated': 1000, 'rejected': 0},
+    'excluded_domain': {'evaluated': 1000, 'rejected': 100},
+    'spam': {'evaluated': 1000, 'rejected': 500},
+    'relevance': {'evaluated': 1000, 'rejected': 999}
+}
+
+def make_batch(seed: int, size: int = 40) -> List[Dict[str, Any]]:
+    """Generate articles of varied length, keyword density, spam and domain."""
+    rnd = random.Random(seed)
+    vocabulary = CONFIG['keywords'] + [f"word{index}" for index in range(60)]
+    articles = []
+    for index in range(size):
+        words = [rnd.choice(vocabulary) for _ in range(rnd.randint(5, 80))]
+        if rnd.random() < 0.3:
+            words += ['buy', 'now', 'click', 'here', 'casino']
+        host = 'spam.example' if rnd.random() < 0.2 else 'blog.example'
+        articles.append({
+            'title': f"Article {seed}-{index}",
+            'url': f"https://{host}/{seed}/{index}",
+            'content': ' '.join(words)
+        })
+    return articles
+
+def make_agent(tmp_path, name: str, adaptive: bool, threshold: float) -> FilterAgent:
+    """Create a filter agent with its own data directory."""
+    data_dir = tmp_path / name
+    if adaptive:
+        stats_path = data_dir / 'index' / 'filter_stats.json'
+        stats_path.parent.mkdir(parents=True)
+        stats_path.write_text(json.dumps(REVERSING_STATS))
+    return FilterAgent({**CONFIG, 'adaptive_order': adaptive, 'min_relevance_score': threshold}, data_dir)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('threshold', [0.3, 0.4, 0.5])
+async def test_adaptive_order_accepts_the_same_articles_as_fixed_order(tmp_path, threshold):
+    adaptive = make_agent(tmp_path, 'adaptive', True, threshold)
+    fixed = make_agent(tmp_path, 'fixed', False, threshold)
+    try:
+        assert [check.name for check in adaptive.cascade.order()][0] == 'relevance'
+        assert [check.name for check in fixed.cascade.order()][-1] == 'relevance'
+
+        accepted_counts = []
+        for seed in range(4):
+            batch = make_batch(seed)
+            accepted = await adaptive.process_batch([Article.of(article) for article in batch])
+            expected = await fixed.process_batch([Article.of(article) for article in batch])
+            assert [article.title for article in accepted] == [article.title for article in expected]
+            accepted_counts.append(len(accepted))
+        # Each batch mixes accepted and rejected articles
+        assert all(0 < count < 40 for count in accepted_counts)
+        assert adaptive.relevance.doc_count == fixed.relevance.doc_count == sum(accepted_counts)
+    finally:
+        await adaptive.close()
+        await fixed.close()
+
+@pytest.mark.asyncio
+async def test_relevance_score_does_not_depend_on_the_rest_of_the_batch(tmp_path):
+    agent = FilterAgent({**CONFIG, 'min_relevance_score': 0.4}, tmp_path)
+    try:
+        batch = [Article.of(article) for article in make_batch(0)]
+        await agent.scan_batch(batch)
+        agent.score_batch(batch)
+        together = [article.relevance_score for article in batch]
+
+        for article, score in zip(batch, together):
+            article.relevance_score = None
+            agent.score_batch([article])
+            assert article.relevance_score == pytest.approx(score)
+    finally:
+        await agent.close()
@@ -0,0 +1,195 @@
+"""
+Tests for the stage journal and resuming interrupted pipeline runs.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Optional
+
+import pytest
+import yaml
+
+from src.models import Article
+from src.pipeline import Pipeline
+from src.utils.journal import DONE, DROPPED, StageJournal
+
+TITLES = ['First article', 'Second article', 'Third article', 'Fourth article']
+
+def make_pipeline(
+    tmp_path,
+    mode: str,
+    calls: Counter,
+    hang_in: Optional[str] = None,
+    publish_fails: bool = False,
+    **pipeline_config: Any
+) -> Pipeline:
+    """Build a pipeline whose agents work offline and count finished stages.
+
+    Args:
+        tmp_path: Directory for configuration and data
+        mode: 'batch' or 'streaming'
+        calls: Counter of (stage, title) completions, shared between runs
+        hang_in: Stage that blocks forever on the first article, so the
+            run can be killed while the article is in it
+        publish_fails: Whether every publishing request fails
+        **pipeline_config: Extra 'pipeline' settings
+    """
+    config = {
+        'pipeline': {'mode': mode, **pipeline_config},
+        'monitoring': {'logging': {'file': str(tmp_path / 'app.log')}},
+        'scraper': {'sources': ['devto'], 'incremental': False},
+        'filter': {'min_word_count': 1, 'min_relevance_score': 0, 'max_duplicates': None},
+        'research': {'cache': {'enabled': False}},
+        'publisher': {'retry_attempts': 1, 'max_backoff': 0.01}
+    }
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(config))
+    pipeline = Pipeline(str(config_path), tmp_path / 'data')
+
+    async def scrape_source(source: Any):
+        articles = [
+            Article(title=title, url=f"https://example.com/{index}", content=f"{title} body " * 20, tags=['python'])
+            for index, title in enumerate(TITLES)
+        ]
+        await pipeline.scraper.save_raw_content(articles)
+        calls.update(('scrape', article.title) for article in articles)
+        return articles
+    pipeline.scraper.scrape_source = scrape_source
+
+    async def unlimited(*args: Any, **kwargs: Any) -> float:
+        return 0.0
+
+    async def fetch_research(topic: str):
+        return [{'summary': topic}]
+    pipeline.researcher.fetch_research = fetch_research
+
+    async def generate_article(research_data: Any) -> str:
+        return f"Generated from {research_data}"
+    pipeline.writer.generate_article = generate_article
+
+    async def unchanged(content: str) -> str:
+        return content
+    pipeline.writer.apply_writing_style = unchanged
+    pipeline.writer.adjust_content_tone = unchanged
+
+    async def publish_to_devto(article: Article):
+        if publish_fails:
+            raise RuntimeError('upstream down')
+        return {'title': article.title, 'id': TITLES.index(article.title) + 1}
+    pipeline.publisher.publish_to_devto = publish_to_devto
+
+    async def find_on_devto(article: Article):
+        return None
+    pipeline.publisher.find_on_devto = find_on_devto
+
+    for name, agent in pipeline.stages:
+        agent.rate_limit = unlimited
+        counted(agent, name, calls, name == hang_in)
+    return pipeline
+
+def counted(agent: Any, name: str, calls: Counter, hang: bool):
+    """Count the articles an agent finishes, optionally hanging on the first."""
+    process = agent.process
+
+    async def process_counted(articles: Any):
+        if hang and any(article['title'] == TITLES[0] for article in articles):
+            agent.hanging.set()
+            await asyncio.Event().wait()
+        results = await process(articles)
+        calls.update((name, result['title']) for result in results)
+        return results
+    agent.process = process_counted
+    agent.hanging = asyncio.Event()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('mode', ['batch', 'streaming'])
+async def test_killed_run_resumes_without_repeating_stages(tmp_path, mode):
+    calls = Counter()
+    pipeline = make_pipeline(tmp_path, mode, calls, hang_in='writer')
+    run = asyncio.ensure_future(pipeline.run())
+    await asyncio.wait_for(pipeline.writer.hanging.wait(), 10)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    assert not any(stage == 'publisher' for stage, _ in calls)
+
+    results = await make_pipeline(tmp_path, mode, calls).run()
+    assert [result['title'] for result in results] == TITLES
+    stages = ['scrape', 'filter', 'research', 'writer', 'publisher']
+    assert calls == Counter({(stage, title): 1 for stage in stages for title in TITLES})
+
+@pytest.mark.asyncio
+async def test_resumed_articles_are_rebuilt_from_saved_records(tmp_path):
+    calls = Counter()
+    pipeline = make_pipeline(tmp_path, 'batch', calls, hang_in='publisher')
+    run = asyncio.ensure_future(pipeline.run())
+    await asyncio.wait_for(pipeline.publisher.hanging.wait(), 10)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    pipeline = make_pipeline(tmp_path, 'batch', calls)
+    run_id, pending = await pipeline._start_run()
+    try:
+        assert list(pending) == ['writer']
+        article = pending['writer'][0][1]
+        assert article.title == TITLES[0]
+        assert article.content.startswith('Generated from')
+        assert article.research_data == [{'summary': TITLES[0]}]
+    finally:
+        await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_failing_run_is_abandoned_after_max_resume_attempts(tmp_path):
+    calls = Counter()
+    for _ in range(3):
+        await make_pipeline(tmp_path, 'batch', calls, publish_fails=True, max_resume_attempts=2).run()
+        await asyncio.sleep(0.02)
+    # The second run resumed the first; the third started over
+    assert all(calls[('scrape', title)] == 2 for title in TITLES)
+    assert all(calls[('filter', title)] == 2 for title in TITLES)
+
+def test_record_is_buffered_until_flush(tmp_path):
+    journal = StageJournal(tmp_path / 'journal.db')
+    try:
+        run_id, resumed = journal.start_run()
+        assert not resumed
+        journal.record(run_id, 'scrape', [(0, 'A', 'a_key'), (1, 'B', 'b_key')])
+        journal.record(run_id, 'filter', [(1, 'B', None)], DROPPED)
+        assert journal.buffered == 3
+        assert journal.completed(run_id, 'scrape') == []
+
+        journal.flush()
+        assert journal.buffered == 0
+        assert journal.completed(run_id, 'scrape') == [(0, 'a_key'), (1, 'b_key')]
+        assert journal.pending(run_id, 'publisher') == {'scrape': [(0, 'a_key')]}
+    finally:
+        journal.close()
+
+def test_pending_follows_each_article_to_its_last_stage(tmp_path):
+    journal = StageJournal(tmp_path / 'journal.db')
+    try:
+        run_id, _ = journal.start_run()
+        journal.record(run_id, 'scrape', [(0, 'A', 'a_key'), (1, 'B', 'b_key'), (2, 'C', 'c_key')])
+        journal.record(run_id, 'filter', [(0, 'A', 'a_key'), (2, 'C', 'c_key')], DONE)
+        journal.record(run_id, 'publisher', [(2, 'C', {'title': 'C', 'id': 7})])
+        journal.flush()
+        assert journal.pending(run_id, 'publisher') == {'scrape': [(1, 'b_key')], 'filter': [(0, 'a_key')]}
+        assert journal.published(run_id, 'publisher') == [(2, {'title': 'C', 'id': 7})]
+    finally:
+        journal.close()
+
+def test_unfinished_run_is_abandoned_after_max_attempts(tmp_path):
+    journal = StageJournal(tmp_path / 'journal.db', max_attempts=2)
+    try:
+        run_id, resumed = journal.start_run()
+        assert not resumed
+        assert journal.start_run() == (run_id, True)
+        next_id, resumed = journal.start_run()
+        assert next_id != run_id
+        assert not resumed
+
+        journal.finish_run(next_id)
+        assert journal.start_run() == (next_id + 1, False)
+    finally:
+        journal.close()
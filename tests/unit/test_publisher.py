@@ -0,0 +1,204 @@
+"""
+Tests for the publisher agent against a local Dev.to API stub.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from src.agents.publisher import PublisherAgent, PublishError
+from src.models import Article
+from src.utils.outbox import FAILED, PENDING, PUBLISHED, idempotency_key
+
+class DevtoStub:
+    """Dev.to articles API that fails requests as scripted.
+
+    Each entry of `failures` answers one POST to /api/articles with its
+    status and headers before the stub starts accepting articles. A
+    failure with `create` set stores the article before failing, like a
+    server error raised after the write.
+    """
+
+    def __init__(self):
+        self.failures: List[Tuple[int, Dict[str, str], bool]] = []
+        self.articles: List[Dict[str, Any]] = []
+        self.posts = 0
+        self.lookups = 0
+
+    def fail(self, status: int, times: int = 1, headers: Dict[str, str] = None, create: bool = False):
+        self.failures.extend([(status, headers or {}, create)] * times)
+
+    async def publish(self, request: web.Request) -> web.Response:
+        self.posts += 1
+        body = await request.json()
+        failure = self.failures.pop(0) if self.failures else None
+        if failure is None or failure[2]:
+            record = {
+                'id': len(self.articles) + 1,
+                'title': body['article']['title'],
+                'url': f"https://dev.to/stub/{len(self.articles) + 1}",
+                'published': body['article']['published']
+            }
+            self.articles.append(record)
+        if failure is not None:
+            status, headers, _ = failure
+            return web.Response(status=status, headers=headers, text='stub failure')
+        return web.json_response(record, status=201)
+
+    async def my_articles(self, request: web.Request) -> web.Response:
+        self.lookups += 1
+        return web.json_response(self.articles[::-1])
+
+@pytest_asyncio.fixture
+async def devto():
+    stub = DevtoStub()
+    app = web.Application()
+    app.router.add_post('/api/articles', stub.publish)
+    app.router.add_get('/api/articles/me/all', stub.my_articles)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    stub.base_url = f"http://127.0.0.1:{port}/api"
+    yield stub
+    await runner.cleanup()
+
+def make_publisher(devto: DevtoStub, tmp_path, **config: Any) -> PublisherAgent:
+    config = {
+        'api': {'base_url': devto.base_url, 'api_key': 'test-key'},
+        'retry_attempts': 3,
+        'retry_backoff': 0.01,
+        'max_backoff': 0.05,
+        **config
+    }
+    return PublisherAgent(config, data_dir=tmp_path)
+
+def make_article(title: str = 'Async Python') -> Article:
+    return Article(title=title, url=f"https://example.com/{title}", content='Body text', tags=['python'])
+
+def outbox_entry(publisher: PublisherAgent, article: Article):
+    return publisher.outbox.get(idempotency_key(article.title, article.content))
+
+@pytest.mark.asyncio
+async def test_publishes_through_outbox(devto, tmp_path):
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        results = await publisher.process([make_article()])
+        assert [result['id'] for result in results] == [1]
+        assert outbox_entry(publisher, make_article()).status == PUBLISHED
+    finally:
+        await publisher.close()
+
+@pytest.mark.asyncio
+async def test_published_article_is_not_sent_again(devto, tmp_path):
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        first = await publisher.process([make_article(), make_article()])
+    finally:
+        await publisher.close()
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        second = await publisher.process([make_article()])
+    finally:
+        await publisher.close()
+    assert devto.posts == 1
+    assert first == [first[0], first[0]]
+    assert second == [first[0]]
+
+@pytest.mark.asyncio
+async def test_server_error_checks_upstream_before_resending(devto, tmp_path):
+    devto.fail(502, create=True)
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        results = await publisher.process([make_article()])
+    finally:
+        await publisher.close()
+    assert devto.posts == 1
+    assert devto.lookups == 1
+    assert len(devto.articles) == 1
+    assert results[0]['id'] == devto.articles[0]['id']
+
+@pytest.mark.asyncio
+async def test_throttled_request_is_retried(devto, tmp_path):
+    devto.fail(429, times=2, headers={'Retry-After': '0'})
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        results = await publisher.process([make_article()])
+    finally:
+        await publisher.close()
+    assert devto.posts == 3
+    assert devto.lookups == 0
+    assert len(results) == 1
+
+@pytest.mark.asyncio
+async def test_rejected_article_fails_without_retry(devto, tmp_path):
+    devto.fail(422)
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        assert await publisher.process([make_article()]) == []
+        entry = outbox_entry(publisher, make_article())
+        assert entry.status == FAILED
+        assert entry.attempts == 1
+        assert publisher.outbox.due() == []
+    finally:
+        await publisher.close()
+    assert devto.posts == 1
+
+@pytest.mark.asyncio
+async def test_exhausted_attempts_stay_pending(devto, tmp_path):
+    devto.fail(503, times=3)
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        assert await publisher.process([make_article()]) == []
+        entry = outbox_entry(publisher, make_article())
+        assert entry.status == PENDING
+        assert entry.in_doubt
+        assert entry.not_before > time.time()
+
+        # Until its retry time the article is reported as failed, not sent
+        assert await publisher.process([make_article()]) == []
+        assert devto.posts == 3
+
+        # The next run finds the entry due once its retry time has passed
+        await asyncio.sleep(entry.not_before - time.time() + 0.01)
+        results = await publisher.publish_due()
+    finally:
+        await publisher.close()
+    assert [result['id'] for result in results] == [1]
+    assert devto.posts == 4
+
+@pytest.mark.asyncio
+async def test_long_retry_after_is_deferred(devto, tmp_path):
+    devto.fail(429, headers={'Retry-After': '120'})
+    publisher = make_publisher(devto, tmp_path)
+    try:
+        started = time.time()
+        assert await publisher.process([make_article(), make_article('Other')]) == []
+        assert time.time() - started < 5
+        for article in (make_article(), make_article('Other')):
+            entry = outbox_entry(publisher, article)
+            assert entry.status == PENDING
+            assert entry.not_before >= started + 120
+
+        # Queuing the articles again keeps the later retry time
+        publisher.enqueue([make_article()])
+        assert outbox_entry(publisher, make_article()).not_before >= started + 120
+    finally:
+        await publisher.close()
+    assert devto.posts == 1
+
+def test_retry_delay_is_capped(tmp_path):
+    publisher = PublisherAgent({'retry_backoff': 1.0, 'max_backoff': 5.0}, data_dir=tmp_path)
+    assert publisher.retry_delay(10) <= 5.0
+    assert publisher.retry_delay(1, retry_after=300) == 5.0
+    assert 2.0 <= publisher.retry_delay(1, retry_after=2) <= 3.0
+
+def test_publish_error_defaults_to_final():
+    error = PublishError('HTTP 400')
+    assert not error.retryable
+    assert error.retry_after is None
@@ -0,0 +1,179 @@
+"""
+Tests for the batched storage backends.
+"""
+
+import threading
+from typing import Any, List, Tuple
+
+import pytest
+
+from src.utils.serialization import MSGPACK_BACKEND
+from src.utils.storage import FileStorage, JsonlStorage, StorageBackend, create_storage
+
+RECORD = {
+    'title': 'Ünïcode title',
+    'content': 'First line\nsecond line\twith a tab',
+    'tags': ['python', 'async'],
+    'score': 0.75,
+    'published': None,
+    'nested': {'sources': [{'url': 'https://example.com', 'rank': 1}]}
+}
+
+msgpack_required = pytest.mark.skipif(MSGPACK_BACKEND is None, reason='msgspec or msgpack is not installed')
+
+BACKEND_FORMATS = [
+    ('files', 'json'),
+    pytest.param('files', 'msgpack', marks=msgpack_required),
+    ('jsonl', 'json'),
+    ('sqlite', 'json'),
+    pytest.param('sqlite', 'msgpack', marks=msgpack_required)
+]
+
+def make_storage(tmp_path, backend: str, format: str = 'json', batch_size: int = 100) -> StorageBackend:
+    """Create a backend under tmp_path with the given settings."""
+    return create_storage({'backend': backend, 'format': format, 'batch_size': batch_size}, tmp_path / 'data')
+
+def gated(storage: StorageBackend) -> Tuple[List[Tuple[str, List[str]]], threading.Event, threading.Event]:
+    """Record every batch a backend writes and hold its first write.
+
+    Args:
+        storage: Backend to instrument
+
+    Returns:
+        (thread name, keys) per written batch, an event set once the first
+        write started, and the event that releases it
+    """
+    batches: List[Tuple[str, List[str]]] = []
+    started = threading.Event()
+    release = threading.Event()
+    write_batch = storage._write_batch
+
+    def write_gated(records: List[Tuple[str, str, bytes]]):
+        if not batches:
+            started.set()
+            release.wait(10)
+        batches.append((threading.current_thread().name, [key for _, key, _ in records]))
+        write_batch(records)
+    storage._write_batch = write_gated
+    return batches, started, release
+
+@pytest.mark.parametrize('backend, format', BACKEND_FORMATS)
+def test_records_round_trip_through_a_reopened_backend(tmp_path, backend, format):
+    storage = make_storage(tmp_path, backend, format)
+    storage.save('drafts', 'first', RECORD)
+    storage.save('drafts', 'second', [RECORD, 'plain'])
+    storage.save('raw_content', 'first', {'title': 'Other group'})
+    storage.close()
+
+    reopened = make_storage(tmp_path, backend, format)
+    try:
+        assert reopened.load('drafts', 'first') == RECORD
+        assert reopened.load('drafts', 'second') == [RECORD, 'plain']
+        assert reopened.load('raw_content', 'first') == {'title': 'Other group'}
+        with pytest.raises(KeyError):
+            reopened.load('drafts', 'missing')
+    finally:
+        reopened.close()
+
+@pytest.mark.parametrize('backend, format', BACKEND_FORMATS)
+def test_saving_again_replaces_the_record(tmp_path, backend, format):
+    storage = make_storage(tmp_path, backend, format)
+    storage.save('drafts', 'key', {'version': 1})
+    storage.flush()
+    storage.save('drafts', 'key', {'version': 2})
+    storage.close()
+
+    reopened = make_storage(tmp_path, backend, format)
+    try:
+        assert reopened.load('drafts', 'key') == {'version': 2}
+    finally:
+        reopened.close()
+
+@pytest.mark.parametrize('backend', ['files', 'jsonl', 'sqlite'])
+def test_records_are_written_in_batches_on_the_writer_thread(tmp_path, backend):
+    storage = make_storage(tmp_path, backend, batch_size=4)
+    batches, started, release = gated(storage)
+    try:
+        storage.save('drafts', 'key0', {'index': 0})
+        assert started.wait(10)
+        for index in range(1, 10):
+            storage.save('drafts', f"key{index}", {'index': index})
+        # Records waiting for the writer are served from memory
+        assert storage.load('drafts', 'key9') == {'index': 9}
+
+        release.set()
+        storage.flush()
+        assert [len(keys) for _, keys in batches] == [1, 4, 4, 1]
+        assert [key for _, keys in batches for key in keys] == [f"key{index}" for index in range(10)]
+        assert all(name == f"{type(storage).__name__}-writer" for name, _ in batches)
+        assert threading.current_thread().name not in {name for name, _ in batches}
+        assert storage._pending == {}
+    finally:
+        release.set()
+        storage.close()
+
+@pytest.mark.parametrize('backend', ['files', 'jsonl', 'sqlite'])
+def test_close_writes_outstanding_records(tmp_path, backend):
+    storage = make_storage(tmp_path, backend, batch_size=2)
+    batches, started, release = gated(storage)
+    storage.save('drafts', 'key0', {'index': 0})
+    assert started.wait(10)
+    for index in range(1, 7):
+        storage.save('drafts', f"key{index}", {'index': index})
+    release.set()
+    storage.close()
+    assert storage._thread is None
+    assert sum(len(keys) for _, keys in batches) == 7
+
+    reopened = make_storage(tmp_path, backend)
+    try:
+        assert [reopened.load('drafts', f"key{index}") for index in range(7)] == [
+            {'index': index} for index in range(7)
+        ]
+    finally:
+        reopened.close()
+
+@pytest.mark.parametrize('backend', ['files', 'jsonl', 'sqlite'])
+def test_backend_is_usable_after_close(tmp_path, backend):
+    storage = make_storage(tmp_path, backend)
+    storage.save('drafts', 'before', {'closed': False})
+    storage.close()
+    storage.save('drafts', 'after', {'closed': True})
+    storage.close()
+
+    reopened = make_storage(tmp_path, backend)
+    try:
+        assert reopened.load('drafts', 'before') == {'closed': False}
+        assert reopened.load('drafts', 'after') == {'closed': True}
+    finally:
+        reopened.close()
+
+def test_failed_writes_make_flush_raise_and_are_retried(tmp_path):
+    storage = make_storage(tmp_path, 'files')
+    storage.write_attempts = 1
+    write_batch = storage._write_batch
+    failing = [True]
+
+    def write_failing(records: Any):
+        if failing[0]:
+            raise OSError('disk full')
+        write_batch(records)
+    storage._write_batch = write_failing
+
+    storage.save('drafts', 'first', {'index': 1})
+    with pytest.raises(OSError):
+        storage.flush()
+    assert storage.load('drafts', 'first') == {'index': 1}
+
+    failing[0] = False
+    storage.save('drafts', 'second', {'index': 2})
+    storage.close()
+    assert FileStorage(tmp_path / 'data').load('drafts', 'first') == {'index': 1}
+
+def test_jsonl_backend_rejects_binary_formats(tmp_path):
+    with pytest.raises(ValueError):
+        JsonlStorage(tmp_path, format='msgpack')
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_storage({'backend': 'redis'}, tmp_path)
@@ -0,0 +1,60 @@
+"""
+Tests for chunked text normalization.
+"""
+
+import random
+from typing import List
+
+import pytest
+
+from src.utils.text import normalize_stream, normalize_text
+
+# Letters, digits, punctuation, ASCII and Unicode whitespace, combining
+# marks and characters NFKC rewrites, some of them into several characters
+ALPHABET = (
+    list("abcXYZ019_ .,!?-'\"\t\n\r")
+    + [' ', ' ', '　', ' ', '\x1c', '\x85']
+    + ['́', '̈', 'é', 'é', '¨', '´']
+    + ['ﬁ', 'Ａ', '①', '⑴', '㏂', '\U0001d400']
+    + ['Σ', 'İ', 'ß', 'ẞ', 'ǅ', '​', '﻿']
+)
+
+def split_at(text: str, cuts: List[int]) -> List[str]:
+    """Split text at the given offsets, keeping empty chunks."""
+    bounds = [0] + cuts + [len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+def random_cases(seed: int, count: int):
+    """Generate (text, chunks) pairs with arbitrary chunk boundaries."""
+    rnd = random.Random(seed)
+    for _ in range(count):
+        text = ''.join(rnd.choice(ALPHABET) for _ in range(rnd.randint(0, 40)))
+        cuts = sorted(rnd.choices(range(len(text) + 1), k=rnd.randint(0, 8)))
+        yield text, split_at(text, cuts)
+
+@pytest.mark.parametrize('form', ['NFKC', 'NFC', None])
+def test_stream_matches_whole_text_for_arbitrary_chunk_boundaries(form):
+    for text, chunks in random_cases(seed=20, count=3000):
+        assert ' '.join(normalize_stream(chunks, form)) == normalize_text(text, form), chunks
+
+@pytest.mark.parametrize('text', [
+    'Hello, World!  Streaming   normalization',
+    '  leading and trailing whitespace  ',
+    'Café café ﬁsh ＡＢＣ ① OΔΟΣ.',
+    'tabs\tand\nnew\r\nlines and spaces',
+    '!!! ... ---',
+    ''
+])
+def test_stream_matches_whole_text_at_every_single_boundary(text):
+    expected = normalize_text(text)
+    for cut in range(len(text) + 1):
+        assert ' '.join(normalize_stream(split_at(text, [cut]))) == expected, cut
+    assert ' '.join(normalize_stream(list(text))) == expected
+
+def test_words_split_across_chunks_are_normalized_whole():
+    assert list(normalize_stream(['Stre', 'am', 'ing TE', 'XT'])) == ['streaming', 'text']
+    assert list(normalize_stream(['cafe', '́ bar'])) == ['café', 'bar']
+
+def test_stream_yields_no_empty_pieces():
+    pieces = list(normalize_stream(['', '  ', '!!', ' ', '', 'word', '  ', '...']))
+    assert pieces == ['word']